@@ -6,9 +6,11 @@ import sqlite3
 from decimal import Decimal
 
 from finadviser.config import AppConfig
+from finadviser.db.ledger_cache import LedgerCache
 from finadviser.db.models import AccountType
 from finadviser.db.repositories import AccountRepo, JournalRepo, PropertyRepo
-from finadviser.properties.equity_calculator import EquityCalculator
+from finadviser.properties.portfolio import PortfolioEquity
+from finadviser.properties.snapshots import EquitySnapshots
 from finadviser.utils.formatting import format_currency
 
 
@@ -24,7 +26,7 @@ class DataPreparer:
         self.account_repo = AccountRepo(conn)
         self.journal_repo = JournalRepo(conn)
         self.prop_repo = PropertyRepo(conn)
-        self.equity_calc = EquityCalculator(conn)
+        self.ledger = LedgerCache.for_connection(conn)
 
     def prepare_context(self, query: str) -> str:
         """Prepare relevant financial context based on the user's query."""
@@ -42,6 +44,7 @@ class DataPreparer:
         # Include property data for property/equity queries
         if any(kw in query_lower for kw in ("property", "properties", "equity", "mortgage", "house", "home", "real estate", "owner")):
             sections.append(self._property_summary())
+            sections.append(self._equity_history())
 
         # Include net worth for financial health queries
         if any(kw in query_lower for kw in ("net worth", "financial", "health", "wealth", "overview", "summary", "total")):
@@ -55,23 +58,23 @@ class DataPreparer:
         return "\n\n".join(filter(None, sections))
 
     def _account_summary(self) -> str:
-        balances = self.account_repo.get_balances()
+        balances = self.ledger.account_balances(rollup=True)
         if not balances:
             return "ACCOUNT BALANCES: No accounts set up yet."
 
         currency = self.config.currency_symbol
-        lines = ["ACCOUNT BALANCES:"]
+        lines = ["ACCOUNT BALANCES:", "  (a parent account's balance includes its sub-accounts)"]
         for b in balances:
             lines.append(f"  {b.account_name} ({b.account_type.value}): {format_currency(b.balance, currency)}")
         return "\n".join(lines)
 
     def _spending_summary(self) -> str:
-        spending = self.journal_repo.get_monthly_spending()
+        spending = self.ledger.monthly_spending(rollup=True)
         if not spending:
             return "MONTHLY SPENDING: No spending data available."
 
         currency = self.config.currency_symbol
-        lines = ["MONTHLY SPENDING BY CATEGORY:"]
+        lines = ["MONTHLY SPENDING BY CATEGORY:", "  (a parent category's total includes its subcategories)"]
 
         # Group by month
         by_month: dict[str, list] = {}
@@ -98,15 +101,17 @@ class DataPreparer:
 
         for entry in entries:
             cat = entry.get("category_name") or "Uncategorized"
+            amount = entry.get("primary_amount")
+            amount_str = format_currency(amount, currency) if amount is not None else "-"
             lines.append(
                 f"  {entry.get('date', '')} | {entry.get('description', '')[:40]} | "
-                f"{cat} | {entry.get('entries_summary', '')}"
+                f"{cat} | {entry.get('primary_account_name') or '-'} {amount_str}"
             )
 
         return "\n".join(lines)
 
     def _property_summary(self) -> str:
-        properties = self.prop_repo.list_properties()
+        properties = PortfolioEquity(self.conn).properties()
         if not properties:
             return "PROPERTIES: No properties recorded."
 
@@ -114,21 +119,18 @@ class DataPreparer:
         lines = ["PROPERTY EQUITY SUMMARY:"]
 
         for prop in properties:
-            pid = prop["id"]
             lines.append(f"\n  {prop['name']}:")
             lines.append(f"    Address: {prop.get('address', 'N/A')}")
             lines.append(f"    Purchase Price: {format_currency(prop.get('purchase_price', 0), currency)}")
 
-            valuation = self.prop_repo.get_latest_valuation(pid)
+            valuation = prop["valuation"]
             if valuation:
                 lines.append(f"    Current Valuation: {format_currency(valuation['valuation'], currency)} ({valuation['valuation_date']})")
 
-            mortgages = self.prop_repo.get_mortgages(pid)
-            for m in mortgages:
-                balance = self.prop_repo.get_mortgage_balance(m["id"])
-                lines.append(f"    Mortgage ({m['lender']}): Balance {format_currency(abs(balance), currency)}")
+            for m in prop["mortgages"]:
+                lines.append(f"    Mortgage ({m['lender']}): Balance {format_currency(abs(m['balance']), currency)}")
 
-            equity_data = self.equity_calc.calculate(pid)
+            equity_data = prop["equity"]
             if equity_data:
                 lines.append("    Owner Equity:")
                 for e in equity_data:
@@ -139,8 +141,31 @@ class DataPreparer:
 
         return "\n".join(lines)
 
+    def _equity_history(self, points: int = 6) -> str:
+        """Recent owner equity per property, as stored in the snapshot cache.
+
+        Reads without refreshing: the properties screen's worker keeps the
+        snapshots current, so nothing is written on the caller's thread.
+        """
+        snapshots = EquitySnapshots(self.conn, self.config.equity_snapshot_cadence).history(refresh=False)
+        if not snapshots:
+            return ""
+
+        currency = self.config.currency_symbol
+        series: dict[tuple[str, str], list[dict]] = {}
+        for row in snapshots:
+            series.setdefault((row["property_name"], row["owner_name"]), []).append(row)
+
+        lines = [f"EQUITY HISTORY ({self.config.equity_snapshot_cadence}, last {points} snapshots):"]
+        for (property_name, owner_name), rows in series.items():
+            points_str = ", ".join(
+                f"{r['snapshot_date']} {format_currency(r['equity_amount'], currency)}" for r in rows[-points:]
+            )
+            lines.append(f"  {property_name} / {owner_name}: {points_str}")
+        return "\n".join(lines)
+
     def _net_worth_summary(self) -> str:
-        balances = self.account_repo.get_balances()
+        balances = self.ledger.account_balances()
         currency = self.config.currency_symbol
 
         assets = sum(
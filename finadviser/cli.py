@@ -2,23 +2,46 @@
 
 from __future__ import annotations
 
-import click
+import time
 
-from finadviser.config import load_config
+# Taken before anything else is imported, for --startup-profile
+_STARTED = time.perf_counter()
+
+import click  # noqa: E402
 
 
 @click.group(invoke_without_command=True)
+@click.option(
+    "--profile-sql",
+    type=click.Path(dir_okay=False),
+    envvar="FINADVISER_PROFILE_SQL",
+    help="Profile every SQL statement and write a report to this file on exit",
+)
+@click.option("--startup-profile", is_flag=True, help="Print startup timings when the app exits")
 @click.pass_context
-def main(ctx: click.Context) -> None:
+def main(ctx: click.Context, profile_sql: str | None, startup_profile: bool) -> None:
     """Personal financial adviser TUI application."""
+    if profile_sql:
+        import os
+
+        os.environ["FINADVISER_PROFILE_SQL"] = profile_sql
     ctx.ensure_object(dict)
-    ctx.obj["config"] = load_config()
 
     if ctx.invoked_subcommand is None:
+        from finadviser.utils import startup
+
+        if startup_profile:
+            startup.enable(_STARTED)
+            startup.mark("cli ready")
+        from finadviser.config import load_config
         from finadviser.ui.app import FinAdviserApp
 
+        startup.mark("app imported")
+        ctx.obj["config"] = load_config()
         app = FinAdviserApp(config=ctx.obj["config"])
         app.run()
+        if startup_profile:
+            click.echo(startup.report(), err=True)
 
 
 @main.command()
@@ -29,21 +52,180 @@ def import_csv(csv_path: str, bank: str, account: str) -> None:
     """Import transactions from a CSV file."""
     from pathlib import Path
 
+    from finadviser.config import load_config
+    from finadviser.db.archive import attach_archive
     from finadviser.db.connection import get_connection, initialize_database
     from finadviser.importing.import_pipeline import ImportPipeline
 
     config = load_config()
     conn = get_connection(config.db_path)
     initialize_database(conn)
+    if config.archive_path.exists():
+        attach_archive(conn, config.archive_path)
 
     pipeline = ImportPipeline(conn, config)
     result = pipeline.run(Path(csv_path), bank_config_name=bank, account_name=account)
     click.echo(f"Imported {result.imported_count} transactions ({result.duplicate_count} duplicates skipped)")
+    for error in result.errors:
+        click.echo(f"Skipped {error}", err=True)
+
+
+@main.command("match-mortgages")
+@click.option("--start", "start", required=True, type=click.DateTime(["%Y-%m-%d"]), help="First date to scan")
+@click.option("--end", "end", required=True, type=click.DateTime(["%Y-%m-%d"]), help="Last date to scan")
+@click.option("--payer", default=None, help="Owner paying for the shared properties they hold")
+@click.option("--dry-run", is_flag=True, help="List matches without posting them")
+def match_mortgages(start, end, payer: str | None, dry_run: bool) -> None:
+    """Post imported bank debits that match scheduled mortgage payments."""
+    from finadviser.config import load_config
+    from finadviser.db.archive import attach_archive
+    from finadviser.db.connection import get_connection, initialize_database
+    from finadviser.properties.mortgage_tracker import MortgageTracker
+
+    config = load_config()
+    conn = get_connection(config.db_path)
+    initialize_database(conn)
+    if config.archive_path.exists():
+        attach_archive(conn, config.archive_path)
+
+    payer_id = None
+    if payer:
+        row = conn.execute("SELECT id FROM owners WHERE name = ?", (payer,)).fetchone()
+        if row is None:
+            raise click.ClickException(f"Unknown owner: {payer}")
+        payer_id = row["id"]
+
+    tracker = MortgageTracker(conn)
+    try:
+        if dry_run:
+            matches = tracker.find_imported_payments(start.date(), end.date())
+        else:
+            matches = tracker.ingest_imported_payments(start.date(), end.date(), payer_owner_id=payer_id)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+    conn.close()
+
+    for m in matches:
+        click.echo(
+            f"{m['payment_date']}  {m['description'][:40]:40}  {m['total_amount']:>10}  "
+            f"principal {m['principal_amount']}  interest {m['interest_amount']}"
+        )
+    click.echo(f"{'Found' if dry_run else 'Posted'} {len(matches)} mortgage payments")
+
+
+@main.command()
+@click.option("--scenarios", default=10_000, show_default=True, help="Number of scenarios")
+@click.option("--years", default=25, show_default=True, help="Horizon in years")
+@click.option("--seed", "random_seed", type=int, default=None, help="Random seed for repeatable runs")
+@click.option("--workers", default=1, show_default=True, help="Processes to spread scenarios over")
+def simulate(scenarios: int, years: int, random_seed: int | None, workers: int) -> None:
+    """Monte Carlo bands for owner equity, LTV and net worth."""
+    from finadviser.config import load_config
+    from finadviser.db.archive import attach_archive
+    from finadviser.db.connection import get_connection, initialize_database
+    from finadviser.properties.simulation import MonteCarloEngine
+
+    config = load_config()
+    conn = get_connection(config.db_path)
+    initialize_database(conn)
+    if config.archive_path.exists():
+        attach_archive(conn, config.archive_path)
+    result = MonteCarloEngine(conn).run(scenarios, years, seed=random_seed, workers=workers)
+    conn.close()
+
+    columns = sorted({0, min(5, years), min(10, years), years})
+    header = "".join(f"{str(result.dates[c])[:4]:>30}" for c in columns)
+    shown = [result.percentiles[i] for i in (0, len(result.percentiles) // 2, -1)]
+    click.echo(f"{scenarios} scenarios; percentiles {'/'.join(map(str, shown))}; amounts in thousands, LTV in %")
+    click.echo(f"{'':24}{header}")
+
+    def row(label: str, band, fmt: str) -> None:
+        cells = "".join(f"{'/'.join(format(v, fmt) for v in band[[0, len(band) // 2, -1], c]):>30}" for c in columns)
+        click.echo(f"{label[:24]:24}{cells}")
+
+    for owner_id, name in result.owners.items():
+        row(f"Equity {name}", result.owner_equity[owner_id] / 1000, ",.0f")
+    for property_id, name in result.properties.items():
+        row(f"LTV {name}", result.ltv[property_id] * 100, ".0f")
+    row("Net worth", result.net_worth / 1000, ",.0f")
+
+
+@main.command()
+@click.argument("mortgage_id", type=int)
+@click.argument("products_csv", type=click.Path(exists=True, dir_okay=False))
+@click.option("--horizon", type=int, default=None, help="Months to compare over (default: longest fixed period)")
+@click.option("--erc", type=float, default=0.0, show_default=True, help="Early repayment charge for leaving the current deal")
+def remortgage(mortgage_id: int, products_csv: str, horizon: int | None, erc: float) -> None:
+    """Rank the remortgage products in PRODUCTS_CSV against staying on MORTGAGE_ID."""
+    from decimal import Decimal
+    from pathlib import Path
+
+    from finadviser.config import load_config
+    from finadviser.db.archive import attach_archive
+    from finadviser.db.connection import get_connection, initialize_database
+    from finadviser.properties.remortgage import RemortgageEngine, parse_products
+
+    config = load_config()
+    conn = get_connection(config.db_path)
+    initialize_database(conn)
+    if config.archive_path.exists():
+        attach_archive(conn, config.archive_path)
+
+    try:
+        products = parse_products(Path(products_csv).read_text())
+        result = RemortgageEngine(conn).compare(mortgage_id, products, horizon_months=horizon, current_erc=Decimal(str(erc)))
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+    conn.close()
+
+    click.echo(f"Over {len(result.dates)} months from {result.as_of}")
+    click.echo(f"{'#':>2}  {'Product':24}{'Payment':>12}{'Interest':>12}{'Fees':>10}{'ERC':>10}{'Total cost':>14}{'Equity':>14}")
+    for row in result.summary:
+        click.echo(
+            f"{row['rank']:>2}  {row['name'][:24]:24}{row['initial_payment']:>12,.2f}{row['interest']:>12,.2f}"
+            f"{row['fees']:>10,.2f}{row['erc']:>10,.2f}{row['total_cost']:>14,.2f}{row['end_equity']:>14,.2f}"
+        )
+
+
+@main.command()
+@click.option("--index", "index_path", type=click.Path(exists=True, dir_okay=False), help="House price index CSV (default from config)")
+@click.option("--as-of", "as_of", type=click.DateTime(["%Y-%m-%d"]), default=None, help="Valuation date (default: today)")
+@click.option("--region", "default_region", default=None, help="Index region for properties without one")
+def revalue(index_path: str | None, as_of, default_region: str | None) -> None:
+    """Estimate every property's value from a regional house price index."""
+    from pathlib import Path
+
+    from finadviser.config import load_config
+    from finadviser.db.connection import get_connection, initialize_database
+    from finadviser.properties.revaluation import HousePriceIndex, RevaluationJob
+
+    config = load_config()
+    path = Path(index_path) if index_path else config.house_price_index_path
+    if not path.exists():
+        raise click.ClickException(f"No house price index at {path}")
+    conn = get_connection(config.db_path)
+    initialize_database(conn)
+
+    try:
+        index = HousePriceIndex.from_csv(path)
+        estimates = RevaluationJob(conn, index).run(as_of.date() if as_of else None, default_region=default_region)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+    total = conn.execute("SELECT COUNT(*) FROM properties").fetchone()[0]
+    conn.close()
+
+    for e in estimates:
+        click.echo(
+            f"{e['name'][:30]:30}  {e['region'][:20]:20}  {e['base_value']:>12,.2f} ({e['base_date']})"
+            f"  -> {e['valuation']:>12,.2f}"
+        )
+    click.echo(f"Revalued {len(estimates)} of {total} properties")
 
 
 @main.command()
 def seed():
     """Seed the database with property data (20 Denbigh Road & 249 Francis Road)."""
+    from finadviser.config import load_config
     from finadviser.db.connection import get_connection
     from finadviser.db.connection import initialize_database
     from finadviser.seed_properties import seed_properties
@@ -55,5 +237,126 @@ def seed():
     conn.close()
 
 
+@main.command("close-year")
+@click.argument("year", type=int)
+@click.option("--vacuum", is_flag=True, help="Compact the live database afterwards")
+def close_year(year: int, vacuum: bool) -> None:
+    """Move journals up to the end of YEAR into the archive database."""
+    from finadviser.config import load_config
+    from finadviser.db.archive import attach_archive
+    from finadviser.db.connection import get_connection, initialize_database
+    from finadviser.db.period_close import PeriodCloser
+
+    config = load_config()
+    conn = get_connection(config.db_path)
+    initialize_database(conn)
+    attach_archive(conn, config.archive_path)
+
+    try:
+        result = PeriodCloser(conn).close_year(year)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+    if vacuum:
+        conn.execute("VACUUM main")
+    conn.close()
+    click.echo(
+        f"Archived {result['journal_count']} journals through {result['cutoff']} to {config.archive_path}"
+    )
+
+
+@main.command()
+@click.argument("path", type=click.Path(dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), help="Defaults to the file extension")
+@click.option("--gzip/--no-gzip", "compress", default=None, help="Defaults to on for .gz file names")
+def export(path: str, fmt: str | None, compress: bool | None) -> None:
+    """Export every journal and book entry to PATH (.csv, .ndjson, optionally .gz)."""
+    from pathlib import Path
+
+    from finadviser.config import load_config
+    from finadviser.db.archive import attach_archive
+    from finadviser.db.connection import get_connection, initialize_database
+    from finadviser.exporting.ledger_export import LedgerExporter
+
+    config = load_config()
+    conn = get_connection(config.db_path)
+    initialize_database(conn)
+    if config.archive_path.exists():
+        attach_archive(conn, config.archive_path)
+
+    count = LedgerExporter(conn).export(Path(path), fmt=fmt, compress=compress)
+    conn.close()
+    click.echo(f"Exported {count} journals to {path}")
+
+
+@main.command()
+@click.option("--keep", type=int, help="Number of snapshots to keep (default from config)")
+def backup(keep: int | None) -> None:
+    """Take a verified snapshot of the database, safe while the app is running."""
+    from finadviser.config import load_config
+    from finadviser.db.archive import attach_archive
+    from finadviser.db.backup import BackupManager
+    from finadviser.db.connection import get_connection
+
+    config = load_config()
+    conn = get_connection(config.db_path)
+    if config.archive_path.exists():
+        attach_archive(conn, config.archive_path)
+
+    manager = BackupManager(config.backup_dir, keep=keep or config.backup_keep)
+    with click.progressbar(length=100, label="Backing up") as bar:
+        snapshot = manager.backup(conn, progress=_progress_to(bar))
+    conn.close()
+    click.echo(f"Snapshot written to {snapshot}")
+
+
+@main.command()
+@click.argument("snapshot", required=False)
+@click.option("--list", "list_only", is_flag=True, help="List available snapshots")
+@click.option("--yes", is_flag=True, help="Do not ask for confirmation")
+def restore(snapshot: str | None, list_only: bool, yes: bool) -> None:
+    """Restore the database from SNAPSHOT (default: the latest). Close the app first."""
+    from pathlib import Path
+
+    from finadviser.config import load_config
+    from finadviser.db.backup import BackupManager
+
+    config = load_config()
+    manager = BackupManager(config.backup_dir)
+    snapshots = manager.snapshots()
+    if list_only:
+        for path in snapshots:
+            click.echo(path.name)
+        return
+
+    if snapshot:
+        path = Path(snapshot)
+        if not path.exists():
+            path = config.backup_dir / snapshot
+    elif snapshots:
+        path = snapshots[-1]
+    else:
+        raise click.ClickException(f"No snapshots in {config.backup_dir}")
+
+    if not yes:
+        click.confirm(f"Overwrite {config.db_path} with {path.name}?", abort=True)
+    try:
+        with click.progressbar(length=100, label="Restoring") as bar:
+            moved = manager.restore(path, config.db_path, archive_path=config.archive_path, progress=_progress_to(bar))
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+    click.echo(f"Restored {config.db_path} from {path.name}")
+    if moved:
+        click.echo(f"{path.name} has no archive; moved the existing archive aside to {moved}", err=True)
+
+
+def _progress_to(bar):
+    """Backup progress callback advancing a 0-100 click progress bar, never backwards."""
+    def progress(remaining: int, total: int) -> None:
+        if total:
+            bar.update(max(int(100 * (total - remaining) / total) - bar.pos, 0))
+
+    return progress
+
+
 if __name__ == "__main__":
     main()
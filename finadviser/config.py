@@ -17,6 +17,11 @@ class AppConfig(BaseModel):
 
     data_dir: Path = Field(default_factory=_default_data_dir)
     db_path: Path | None = None
+    archive_path: Path | None = None
+    backup_dir: Path | None = None
+    backup_keep: int = 7
+    house_price_index_path: Path | None = None
+    equity_snapshot_cadence: str = "monthly"
     bank_configs_dir: Path | None = None
     anthropic_api_key: str = ""
     currency_symbol: str = "£"
@@ -24,6 +29,12 @@ class AppConfig(BaseModel):
     def model_post_init(self, __context: object) -> None:
         if self.db_path is None:
             self.db_path = self.data_dir / "finadviser.db"
+        if self.archive_path is None:
+            self.archive_path = self.data_dir / "finadviser-archive.db"
+        if self.backup_dir is None:
+            self.backup_dir = self.data_dir / "backups"
+        if self.house_price_index_path is None:
+            self.house_price_index_path = self.data_dir / "house_price_index.csv"
         if self.bank_configs_dir is None:
             self.bank_configs_dir = self.data_dir / "bank_configs"
 
@@ -39,7 +50,11 @@ def load_config() -> AppConfig:
     config = AppConfig(
         anthropic_api_key=os.environ.get("ANTHROPIC_API_KEY", ""),
         db_path=Path(p) if (p := os.environ.get("FINADVISER_DB_PATH")) else None,
+        archive_path=Path(p) if (p := os.environ.get("FINADVISER_ARCHIVE_PATH")) else None,
+        backup_dir=Path(p) if (p := os.environ.get("FINADVISER_BACKUP_DIR")) else None,
+        house_price_index_path=Path(p) if (p := os.environ.get("FINADVISER_HOUSE_PRICE_INDEX")) else None,
         bank_configs_dir=Path(p) if (p := os.environ.get("FINADVISER_BANK_CONFIGS_DIR")) else None,
+        equity_snapshot_cadence=os.environ.get("FINADVISER_EQUITY_SNAPSHOT_CADENCE", "monthly"),
     )
     config.ensure_dirs()
     return config
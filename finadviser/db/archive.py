@@ -0,0 +1,107 @@
+"""Attached archive database holding journals from closed periods."""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+ARCHIVE_SCHEMA = "archive"
+
+# Journals posted by a year-end close carry this reference prefix.
+OPENING_BALANCE_REFERENCE = "opening-balance"
+
+ARCHIVE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS archive.journal_entries (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    reference TEXT,
+    category_id INTEGER,
+    import_batch_id INTEGER,
+    created_at TEXT NOT NULL,
+    leg_count INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS archive.book_entries (
+    id INTEGER PRIMARY KEY,
+    journal_entry_id INTEGER NOT NULL,
+    account_id INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS archive.transaction_fingerprints (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    account_id INTEGER NOT NULL,
+    journal_entry_id INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    UNIQUE(fingerprint, account_id)
+);
+
+CREATE TABLE IF NOT EXISTS archive.account_daily_balances (
+    account_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    balance REAL NOT NULL,
+    PRIMARY KEY (account_id, date)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS archive.idx_journal_entries_date ON journal_entries(date, id);
+CREATE INDEX IF NOT EXISTS archive.idx_book_entries_journal ON book_entries(journal_entry_id);
+CREATE INDEX IF NOT EXISTS archive.idx_book_entries_account ON book_entries(account_id);
+"""
+
+_LIVE_JOURNALS = f"""
+    SELECT id, date, description, reference, category_id, import_batch_id
+    FROM main.journal_entries
+    WHERE COALESCE(reference, '') NOT LIKE '{OPENING_BALANCE_REFERENCE}:%'
+"""
+
+_LIVE_BOOK_ENTRIES = f"""
+    SELECT be.id, be.journal_entry_id, be.account_id, be.amount
+    FROM main.book_entries be
+    JOIN main.journal_entries je ON je.id = be.journal_entry_id
+    WHERE COALESCE(je.reference, '') NOT LIKE '{OPENING_BALANCE_REFERENCE}:%'
+"""
+
+
+def is_attached(conn: sqlite3.Connection) -> bool:
+    """Whether the archive database is attached to this connection."""
+    return any(row[1] == ARCHIVE_SCHEMA for row in conn.execute("PRAGMA database_list"))
+
+
+def attach_archive(conn: sqlite3.Connection, path: Path) -> None:
+    """Attach (creating if needed) the archive database and expose full history.
+
+    Must be called outside a transaction, as SQLite cannot attach inside one.
+    """
+    if not is_attached(conn):
+        conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (str(path),))
+    conn.executescript(ARCHIVE_SCHEMA_SQL)
+    install_history_views(conn)
+
+
+def install_history_views(conn: sqlite3.Connection) -> None:
+    """Create per-connection views spanning live and archived journals.
+
+    ``history_journal_entries`` and ``history_book_entries`` are what reports
+    needing full history should read. Opening-balance journals are left out,
+    since the archived entries they summarise are included instead. Without an
+    attached archive the views cover the live database only.
+    """
+    journals, book_entries = _LIVE_JOURNALS, _LIVE_BOOK_ENTRIES
+    if is_attached(conn):
+        journals += f"""
+            UNION ALL
+            SELECT id, date, description, reference, category_id, import_batch_id
+            FROM {ARCHIVE_SCHEMA}.journal_entries
+        """
+        book_entries += f"""
+            UNION ALL
+            SELECT id, journal_entry_id, account_id, amount
+            FROM {ARCHIVE_SCHEMA}.book_entries
+        """
+    conn.execute("DROP VIEW IF EXISTS temp.history_journal_entries")
+    conn.execute("DROP VIEW IF EXISTS temp.history_book_entries")
+    conn.execute(f"CREATE TEMP VIEW history_journal_entries AS {journals}")
+    conn.execute(f"CREATE TEMP VIEW history_book_entries AS {book_entries}")
@@ -0,0 +1,164 @@
+"""Online backups of the live database through the SQLite backup API."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from finadviser.db.archive import ARCHIVE_SCHEMA, is_attached
+
+# Called with (pages_remaining, pages_total) after each step, counted over
+# every database copied in one backup or restore
+Progress = Callable[[int, int], None]
+
+SNAPSHOT_PREFIX = "finadviser-"
+ARCHIVE_SUFFIX = "-archive"
+
+
+class BackupManager:
+    """Takes, rotates, verifies and restores timestamped snapshots.
+
+    Snapshots are copied a few hundred pages at a time with a short sleep in
+    between, so an app writing to the same database is never blocked for
+    long. Each one is checked with ``PRAGMA quick_check`` before it replaces
+    anything. When the archive database is attached it is snapshotted
+    alongside, as ``<snapshot>-archive.db``.
+    """
+
+    def __init__(self, backup_dir: Path, keep: int = 7, pages: int = 256, sleep: float = 0.005) -> None:
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.pages = pages
+        self.sleep = sleep
+
+    def snapshots(self) -> list[Path]:
+        """Main-database snapshots, oldest first."""
+        if not self.backup_dir.exists():
+            return []
+        return sorted(
+            p for p in self.backup_dir.glob(f"{SNAPSHOT_PREFIX}*.db")
+            if not p.stem.endswith(ARCHIVE_SUFFIX)
+        )
+
+    def backup(self, conn: sqlite3.Connection, progress: Progress | None = None) -> Path:
+        """Snapshot the database behind ``conn`` and prune old snapshots."""
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        target = self.backup_dir / f"{SNAPSHOT_PREFIX}{stamp}.db"
+
+        schemas = ["main", ARCHIVE_SCHEMA] if is_attached(conn) else ["main"]
+        sizes = [conn.execute(f"PRAGMA {schema}.page_count").fetchone()[0] for schema in schemas]
+        targets = [target, archive_snapshot(target)]
+        for i, schema in enumerate(schemas):
+            self._copy(conn, targets[i], schema, _adapt(progress, sum(sizes[:i]), sum(sizes)))
+        self._rotate()
+        return target
+
+    def restore(
+        self,
+        snapshot: Path,
+        db_path: Path,
+        archive_path: Path | None = None,
+        progress: Progress | None = None,
+    ) -> Path | None:
+        """Overwrite ``db_path`` (and the archive, if snapshotted) from a snapshot.
+
+        Other connections to the database should be closed first. If the
+        snapshot has no archive but ``archive_path`` exists, the archive is
+        from a different point in time than the restored database, so it is
+        renamed aside rather than left attached to it; the new name is
+        returned (None when nothing was moved).
+        """
+        sources = [(snapshot, db_path)]
+        if archive_path is not None and archive_snapshot(snapshot).exists():
+            sources.append((archive_snapshot(snapshot), archive_path))
+        for source, _ in sources:
+            self.verify(source)
+
+        moved = None
+        if archive_path is not None and len(sources) == 1 and archive_path.exists():
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            moved = archive_path.with_name(f"{archive_path.stem}-before-restore-{stamp}{archive_path.suffix}")
+            for sidecar in ("", "-wal", "-shm"):
+                current = Path(f"{archive_path}{sidecar}")
+                if current.exists():
+                    current.replace(Path(f"{moved}{sidecar}"))
+
+        sizes = [_page_count(source) for source, _ in sources]
+        for i, (source, destination) in enumerate(sources):
+            src = sqlite3.connect(source)
+            dst = sqlite3.connect(destination)
+            try:
+                src.backup(dst, pages=self.pages, progress=_adapt(progress, sum(sizes[:i]), sum(sizes)))
+            finally:
+                src.close()
+                dst.close()
+        return moved
+
+    def verify(self, path: Path) -> None:
+        """Raise ValueError unless ``PRAGMA quick_check`` passes."""
+        if not path.is_file():
+            raise ValueError(f"No such snapshot: {path}")
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            result = [row[0] for row in conn.execute("PRAGMA quick_check")]
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"{path.name} is not a valid database: {e}") from e
+        finally:
+            conn.close()
+        if result != ["ok"]:
+            raise ValueError(f"{path.name} failed quick_check: {'; '.join(result[:5])}")
+
+    def _copy(self, conn: sqlite3.Connection, target: Path, schema: str, progress) -> None:
+        # Copy under a temporary name so a failed or partial backup never
+        # looks like a snapshot
+        partial = target.with_suffix(".partial")
+        dst = sqlite3.connect(partial)
+        try:
+            conn.backup(dst, pages=self.pages, progress=progress, name=schema, sleep=self.sleep)
+            # The copy inherits WAL mode; a snapshot should be a single file
+            dst.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            dst.close()
+        try:
+            self.verify(partial)
+        except ValueError:
+            partial.unlink()
+            raise
+        partial.replace(target)
+
+    def _rotate(self) -> None:
+        snapshots = self.snapshots()
+        for old in snapshots[: max(len(snapshots) - self.keep, 0)]:
+            archive_snapshot(old).unlink(missing_ok=True)
+            old.unlink()
+
+
+def archive_snapshot(snapshot: Path) -> Path:
+    """Companion file holding the archive database for a snapshot."""
+    return snapshot.with_name(f"{snapshot.stem}{ARCHIVE_SUFFIX}.db")
+
+
+def _page_count(path: Path) -> int:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return conn.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _adapt(progress: Progress | None, before: int = 0, overall: int = 0):
+    """Backup-API callback reporting one copy as part of several.
+
+    ``before`` pages were copied by earlier copies out of ``overall`` in all.
+    """
+    if progress is None:
+        return None
+
+    def step(status: int, remaining: int, total: int) -> None:
+        grand_total = max(overall, before + total)
+        progress(grand_total - before - (total - remaining), grand_total)
+
+    return step
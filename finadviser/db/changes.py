@@ -0,0 +1,76 @@
+"""Change detection so screens and caches only recompute after writes."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable
+
+from finadviser.db.connection import Connection
+
+
+def mark_written(conn: sqlite3.Connection, *tables: str) -> None:
+    """Record that this connection wrote to ``tables``.
+
+    Called by repositories and engines after each write. Counting a write
+    that is later rolled back only costs an extra recompute.
+    """
+    if isinstance(conn, Connection):
+        for table in tables:
+            conn.table_writes[table] = conn.table_writes.get(table, 0) + 1
+
+
+def mark_committed_elsewhere(conn: sqlite3.Connection, *tables: str) -> None:
+    """Record that another connection of this app just committed writes to ``tables``.
+
+    For work done on a worker thread's own connection: call it on ``conn``'s
+    thread once the worker has committed, and trackers see a write to those
+    tables instead of an unknown change to every table.
+    """
+    if isinstance(conn, Connection):
+        conn.seen_data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        mark_written(conn, *tables)
+
+
+def _foreign_commits(conn: Connection) -> int:
+    """Commits by other connections so far, less those claimed by ``mark_committed_elsewhere``."""
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    if data_version != conn.seen_data_version:
+        if conn.seen_data_version is not None:
+            conn.foreign_commits += 1
+        conn.seen_data_version = data_version
+    return conn.foreign_commits
+
+
+class ChangeTracker:
+    """Answers "did any of these tables change since I last looked?".
+
+    Own writes are seen through the per-table counters kept by
+    ``mark_written``. Commits from other connections (a CLI import while the
+    app is open) bump ``PRAGMA data_version``, which does not say which table
+    changed, so they count as a change to every table, unless the app made
+    them itself and said so with ``mark_committed_elsewhere``.
+
+    The first call to ``changed()`` always returns True.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, tables: Iterable[str]) -> None:
+        self.conn = conn
+        self.tables = tuple(tables)
+        self._seen: tuple | None = None
+
+    def _token(self) -> tuple | None:
+        if not isinstance(self.conn, Connection):
+            return None
+        return (_foreign_commits(self.conn), *(self.conn.table_writes.get(t, 0) for t in self.tables))
+
+    def changed(self) -> bool:
+        """True if the tables changed since the last call, then resets."""
+        token = self._token()
+        if token is not None and token == self._seen:
+            return False
+        self._seen = token
+        return True
+
+    def reset(self) -> None:
+        """Force the next ``changed()`` to return True."""
+        self._seen = None
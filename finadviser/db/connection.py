@@ -2,16 +2,53 @@
 
 from __future__ import annotations
 
+import os
 import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
-from finadviser.db.schema import SCHEMA_SQL
+from finadviser.db.archive import install_history_views
+from finadviser.db.schema import MIGRATIONS, SCHEMA_SQL
 
+# Report path for SQL profiling; see finadviser.db.profiling
+PROFILE_SQL_ENV = "FINADVISER_PROFILE_SQL"
 
-def get_connection(db_path: Path | None = None) -> sqlite3.Connection:
+
+class Connection(sqlite3.Connection):
+    """SQLite connection whose commits can be deferred by a unit of work.
+
+    Repositories call ``commit()`` after each write. Inside ``unit_of_work``
+    those calls are no-ops and the scope commits once on exit.
+
+    ``table_writes`` counts writes per table made through this connection,
+    and ``foreign_commits`` the commits made by other connections that no
+    caller has claimed; see ``finadviser.db.changes``. ``uow_immediate`` is set while the
+    outermost unit of work holds the write lock from ``BEGIN IMMEDIATE``.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.uow_depth = 0
+        self.uow_immediate = False
+        self.table_writes: dict[str, int] = {}
+        self.foreign_commits = 0
+        self.seen_data_version: int | None = None
+
+    def commit(self) -> None:
+        if self.uow_depth == 0:
+            super().commit()
+
+
+def get_connection(db_path: Path | None = None) -> Connection:
     """Create a new SQLite connection with recommended settings."""
     path = str(db_path) if db_path else ":memory:"
-    conn = sqlite3.connect(path)
+    factory = Connection
+    if os.environ.get(PROFILE_SQL_ENV):
+        from finadviser.db.profiling import ProfilingConnection
+
+        factory = ProfilingConnection
+    conn = sqlite3.connect(path, factory=factory)
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
     conn.execute("PRAGMA busy_timeout=5000")
@@ -19,7 +56,72 @@ def get_connection(db_path: Path | None = None) -> sqlite3.Connection:
     return conn
 
 
+@contextmanager
+def unit_of_work(conn: sqlite3.Connection, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+    """Run a group of repository writes as one transaction.
+
+    Inner ``commit()`` calls are suppressed and the outermost scope commits
+    once on exit, or rolls back if an exception escapes. Nested scopes run in
+    a savepoint, so a failure inside one undoes only that scope's writes.
+
+    With ``immediate`` the outermost scope starts with ``BEGIN IMMEDIATE``,
+    taking the write lock up front so that balances read inside the scope
+    cannot change under it before it commits. It can nest inside another
+    immediate scope, but raises ``ValueError`` rather than quietly running
+    without the lock inside a deferred scope or an already open transaction.
+    """
+    if not isinstance(conn, Connection):
+        raise TypeError("unit_of_work requires a connection from get_connection()")
+
+    depth = conn.uow_depth
+    if immediate and conn.in_transaction and not conn.uow_immediate:
+        raise ValueError("An immediate unit of work cannot start inside a transaction without the write lock")
+    savepoint = f"uow_{depth}"
+    if depth:
+        conn.execute(f"SAVEPOINT {savepoint}")
+    elif not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        conn.uow_immediate = immediate
+    conn.uow_depth += 1
+    try:
+        yield conn
+    except BaseException:
+        conn.uow_depth -= 1
+        if depth:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+        else:
+            conn.uow_immediate = False
+            conn.rollback()
+        raise
+    conn.uow_depth -= 1
+    if depth:
+        conn.execute(f"RELEASE {savepoint}")
+    else:
+        conn.uow_immediate = False
+        conn.commit()
+
+
 def initialize_database(conn: sqlite3.Connection) -> None:
     """Create all tables, views, triggers, and seed data."""
     conn.executescript(SCHEMA_SQL)
+    apply_migrations(conn)
+    install_history_views(conn)
     conn.commit()
+
+
+def apply_migrations(conn: sqlite3.Connection) -> None:
+    """Run any data migrations newer than the database's user_version.
+
+    Each migration and its version bump commit together, so a failure
+    leaves the database at the previous version with none of that
+    migration's changes, and the next start retries it from scratch.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, sql in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            conn.executescript(f"BEGIN;\n{sql}\nPRAGMA user_version = {number};\nCOMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
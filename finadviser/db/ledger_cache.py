@@ -0,0 +1,301 @@
+"""Columnar in-memory copy of the ledger for vectorized analytics."""
+
+from __future__ import annotations
+
+import sqlite3
+import weakref
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+
+from finadviser.db.archive import is_attached
+from finadviser.db.changes import ChangeTracker
+from finadviser.db.models import AccountBalance, AccountType
+
+_EPOCH = date(1970, 1, 1)
+
+# Columns come back as plain integers so a whole batch converts in one call:
+# dates as days since 1970-01-01, amounts in minor units (pence/cents).
+_LOAD_SQL = """
+    SELECT be.id,
+           CAST(julianday(je.date) - 2440587.5 AS INTEGER),
+           be.account_id,
+           COALESCE(je.category_id, 0),
+           CAST(ROUND(be.amount * 100) AS INTEGER)
+    FROM {book_entries} be
+    JOIN {journal_entries} je ON je.id = be.journal_entry_id
+    WHERE be.id > ?
+    ORDER BY be.id
+"""
+
+_caches: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _days(d: date) -> int:
+    return (d - _EPOCH).days
+
+
+def _to_decimal(minor_units: int) -> Decimal:
+    return Decimal(int(minor_units)).scaleb(-2)
+
+
+class _Codes:
+    """Dense integer codes for database ids, assigned on first sight."""
+
+    def __init__(self) -> None:
+        self.ids: list[int] = []
+        self._index: dict[int, int] = {}
+
+    def encode(self, values: np.ndarray) -> np.ndarray:
+        uniq, inverse = np.unique(values, return_inverse=True)
+        codes = np.empty(len(uniq), dtype=np.int32)
+        for i, value in enumerate(uniq.tolist()):
+            if value not in self._index:
+                self._index[value] = len(self.ids)
+                self.ids.append(value)
+            codes[i] = self._index[value]
+        return codes[inverse.reshape(-1)]
+
+    def code(self, value: int) -> int | None:
+        return self._index.get(value)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class LedgerCache:
+    """Book entries held as NumPy columns.
+
+    Covers full history: the ``history_*`` views when the archive is attached,
+    otherwise the live tables. ``refresh()`` appends rows past the highest
+    book entry id already loaded and reloads everything when rows were
+    deleted or edited in place (counted by triggers in ``ledger_edits``);
+    it does nothing at all while the ledger tables are unchanged.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self._changes = ChangeTracker(conn, ("journal_entries", "book_entries"))
+        self._clear()
+
+    @classmethod
+    def for_connection(cls, conn: sqlite3.Connection) -> LedgerCache:
+        """Shared cache for a connection, so screens reuse one load."""
+        try:
+            cache = _caches.get(conn)
+        except TypeError:
+            return cls(conn)
+        if cache is None:
+            cache = _caches[conn] = cls(conn)
+        return cache
+
+    def invalidate(self) -> None:
+        """Drop everything; the next ``refresh()`` reloads from scratch."""
+        self._clear()
+        self._changes.reset()
+
+    def _clear(self) -> None:
+        self.high_water = 0
+        self.days = np.empty(0, dtype=np.int32)
+        self.months = np.empty(0, dtype=np.int32)
+        self.accounts = np.empty(0, dtype=np.int32)
+        self.categories = np.empty(0, dtype=np.int32)
+        self.amounts = np.empty(0, dtype=np.int64)
+        self.account_codes = _Codes()
+        self.category_codes = _Codes()
+        self._source: tuple[str, str] | None = None
+        self._edits: int | None = None
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def refresh(self) -> int:
+        """Load new book entries. Returns the number of rows loaded."""
+        if not self._changes.changed():
+            return 0
+        source = (
+            ("history_book_entries", "history_journal_entries")
+            if is_attached(self.conn)
+            else ("main.book_entries", "main.journal_entries")
+        )
+        book_entries, _ = source
+        count, max_id = self.conn.execute(f"SELECT COUNT(*), COALESCE(MAX(id), 0) FROM {book_entries}").fetchone()
+        edits = self.conn.execute("SELECT edits FROM main.ledger_edits").fetchone()[0]
+        if source != self._source or edits != self._edits or max_id < self.high_water or count < len(self):
+            self._clear()
+            self._source = source
+            self._edits = edits
+        elif count == len(self) and max_id == self.high_water:
+            return 0
+
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(
+            _LOAD_SQL.format(book_entries=book_entries, journal_entries=source[1]),
+            (self.high_water,),
+        ).fetchall()
+        if len(self) + len(rows) != count:
+            # Rows below the high-water mark were deleted; start over.
+            self._clear()
+            self._source = source
+            self._edits = edits
+            rows = cursor.execute(
+                _LOAD_SQL.format(book_entries=book_entries, journal_entries=source[1]), (0,)
+            ).fetchall()
+        if rows:
+            self._append(np.array(rows, dtype=np.int64))
+        return len(rows)
+
+    def _append(self, batch: np.ndarray) -> None:
+        days = batch[:, 1].astype(np.int32)
+        months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+        self.high_water = int(batch[-1, 0])
+        self.days = np.concatenate([self.days, days])
+        self.months = np.concatenate([self.months, months])
+        self.accounts = np.concatenate([self.accounts, self.account_codes.encode(batch[:, 2])])
+        self.categories = np.concatenate([self.categories, self.category_codes.encode(batch[:, 3])])
+        self.amounts = np.concatenate([self.amounts, batch[:, 4]])
+
+    # -- vectorized operations -------------------------------------------
+
+    def sum_by_account(self, as_of: date | None = None) -> dict[int, int]:
+        """Balance per account id in minor units, optionally up to a date."""
+        accounts, amounts = self.accounts, self.amounts
+        if as_of is not None:
+            mask = self.days <= _days(as_of)
+            accounts, amounts = accounts[mask], amounts[mask]
+        totals = np.zeros(len(self.account_codes), dtype=np.int64)
+        np.add.at(totals, accounts, amounts)
+        return dict(zip(self.account_codes.ids, totals.tolist()))
+
+    def sum_by_month(self, account_ids: list[int] | None = None) -> dict[tuple[str, int | None], int]:
+        """Totals in minor units keyed by ``(YYYY-MM, category_id)``."""
+        mask = self._account_mask(account_ids)
+        months, categories, amounts = self.months[mask], self.categories[mask], self.amounts[mask]
+        if not len(amounts):
+            return {}
+        ncat = max(len(self.category_codes), 1)
+        keys, inverse = np.unique(months.astype(np.int64) * ncat + categories, return_inverse=True)
+        totals = np.zeros(len(keys), dtype=np.int64)
+        np.add.at(totals, inverse.reshape(-1), amounts)
+
+        labels = np.datetime_as_string((keys // ncat).astype("datetime64[M]"), unit="M")
+        category_ids = self.category_codes.ids
+        return {
+            (label, category_ids[code] or None): total
+            for label, code, total in zip(labels.tolist(), (keys % ncat).tolist(), totals.tolist())
+        }
+
+    def cumulative_balance(self, account_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """End-of-day balance series for an account.
+
+        Returns ``(dates, balances)``: the days the account moved, as
+        ``datetime64[D]``, and its running balance in minor units.
+        """
+        code = self.account_codes.code(account_id)
+        if code is None:
+            return np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype=np.int64)
+        mask = self.accounts == code
+        days, amounts = self.days[mask], self.amounts[mask]
+        order = np.argsort(days, kind="stable")
+        days, running = days[order], np.cumsum(amounts[order])
+        last_of_day = np.append(days[1:] != days[:-1], True)
+        return days[last_of_day].astype("datetime64[D]"), running[last_of_day]
+
+    def balances_at(self, account_ids: list[int], days: np.ndarray) -> np.ndarray:
+        """End-of-day balances in minor units, one row per account and column per day.
+
+        ``days`` is an array of ``datetime64[D]``. Every lookup is a single
+        ``searchsorted`` over the entries sorted by (account, day).
+        """
+        days = np.asarray(days, dtype="datetime64[D]").astype(np.int64)
+        result = np.zeros((len(account_ids), len(days)), dtype=np.int64)
+        codes = [self.account_codes.code(a) for a in account_ids]
+        present = [i for i, code in enumerate(codes) if code is not None]
+        if not present or not len(self):
+            return result
+
+        order = np.lexsort((self.days, self.accounts))
+        accounts = self.accounts[order].astype(np.int64)
+        running = np.cumsum(self.amounts[order])
+        # Restart the running total at each account's first entry
+        first = np.searchsorted(accounts, accounts, side="left")
+        running -= np.where(first > 0, running[first - 1], 0)
+        keys = (accounts << 32) + (self.days[order].astype(np.int64) + (1 << 31))
+
+        wanted = np.array([codes[i] for i in present], dtype=np.int64)[:, None]
+        pos = np.searchsorted(keys, (wanted << 32) + (days[None, :] + (1 << 31)), side="right") - 1
+        clipped = pos.clip(0)
+        found = (pos >= 0) & (accounts[clipped] == wanted)
+        result[present] = np.where(found, running[clipped], 0)
+        return result
+
+    def _account_mask(self, account_ids: list[int] | None) -> np.ndarray:
+        if account_ids is None:
+            return np.ones(len(self), dtype=bool)
+        codes = [c for c in (self.account_codes.code(a) for a in account_ids) if c is not None]
+        return np.isin(self.accounts, codes)
+
+    # -- drop-in replacements for repository reports ---------------------
+
+    def account_balances(self, rollup: bool = False) -> list[AccountBalance]:
+        """Same rows as ``AccountRepo.get_balances()``, or ``get_rollup_balances()`` with ``rollup``."""
+        self.refresh()
+        totals = self.sum_by_account()
+        if rollup:
+            totals = self._roll_up(totals, "account_closure")
+        rows = self.conn.execute("SELECT id, name, account_type FROM accounts ORDER BY id").fetchall()
+        return [
+            AccountBalance(
+                account_id=r["id"],
+                account_name=r["name"],
+                account_type=r["account_type"],
+                balance=_to_decimal(totals.get(r["id"], 0)),
+            )
+            for r in rows
+        ]
+
+    def monthly_spending(self, rollup: bool = False) -> list[dict]:
+        """Same rows as ``JournalRepo.get_monthly_spending(rollup)``."""
+        self.refresh()
+        expense_ids = [
+            r[0] for r in self.conn.execute(
+                "SELECT id FROM accounts WHERE account_type = ?", (AccountType.EXPENSE.value,)
+            )
+        ]
+        categories = {r[0]: (r[1], r[2]) for r in self.conn.execute("SELECT id, name, parent_id FROM categories")}
+        totals = self.sum_by_month(expense_ids)
+        if rollup:
+            by_month: dict[str, dict[int | None, int]] = {}
+            for (month, category_id), total in totals.items():
+                by_month.setdefault(month, {})[category_id] = total
+            totals = {
+                (month, category_id): total
+                for month, month_totals in by_month.items()
+                for category_id, total in self._roll_up(month_totals, "category_closure").items()
+            }
+        rows = [
+            {
+                "month": month,
+                "category_id": category_id,
+                "category_name": categories.get(category_id, (None, None))[0],
+                "parent_id": categories.get(category_id, (None, None))[1],
+                "account_type": AccountType.EXPENSE.value,
+                "total": total / 100,
+            }
+            for (month, category_id), total in totals.items()
+        ]
+        rows.sort(key=lambda r: r["month"], reverse=True)
+        return rows
+
+    def _roll_up(self, totals: dict, closure: str) -> dict:
+        """Add each id's total to every ancestor's in a closure table.
+
+        Ids not in the closure (such as uncategorized ``None``) keep their own total.
+        """
+        rolled: dict = {key: total for key, total in totals.items() if key is None}
+        for ancestor, descendant in self.conn.execute(f"SELECT ancestor_id, descendant_id FROM {closure}"):
+            if descendant in totals:
+                rolled[ancestor] = rolled.get(ancestor, 0) + totals[descendant]
+        return rolled
@@ -30,6 +30,11 @@ class RuleSource(str, Enum):
     SYSTEM = "system"
 
 
+class PropertyEventKind(str, Enum):
+    INCOME = "income"
+    EXPENSE = "expense"
+
+
 class MessageRole(str, Enum):
     USER = "user"
     ASSISTANT = "assistant"
@@ -113,6 +118,7 @@ class Property(BaseModel):
     address: str | None = None
     purchase_date: date | None = None
     purchase_price: Decimal | None = None
+    region: str | None = None
     created_at: datetime | None = None
 
 
@@ -138,6 +144,7 @@ class Mortgage(BaseModel):
     start_date: date
     term_months: int
     liability_account_id: int
+    payee_pattern: str | None = None
     created_at: datetime | None = None
 
 
@@ -149,6 +156,19 @@ class MortgageRateHistory(BaseModel):
     created_at: datetime | None = None
 
 
+class MortgagePayment(BaseModel):
+    id: int | None = None
+    mortgage_id: int
+    payment_date: date
+    journal_entry_id: int
+    capital_journal_id: int | None = None
+    payer_owner_id: int | None = None
+    total_amount: Decimal
+    principal_amount: Decimal
+    interest_amount: Decimal
+    created_at: datetime | None = None
+
+
 class PropertyValuation(BaseModel):
     id: int | None = None
     property_id: int
@@ -174,7 +194,7 @@ class PropertyTransfer(BaseModel):
     to_property_id: int
     owner_id: int
     amount: Decimal
-    journal_entry_id: int
+    journal_entry_id: int | None = None
     transfer_date: date
     description: str | None = None
     created_at: datetime | None = None
@@ -186,6 +206,8 @@ class ExpenseAllocationRule(BaseModel):
     owner_id: int
     allocation_pct: float
     expense_type: str = "all"
+    effective_from: date | None = None
+    effective_to: date | None = None
     created_at: datetime | None = None
 
 
@@ -229,6 +251,47 @@ class ImportResult(BaseModel):
     imported_count: int = 0
     duplicate_count: int = 0
     total_count: int = 0
+    errors: list[str] = Field(default_factory=list)
+
+
+class PropertyEvent(BaseModel):
+    """A rent receipt or property expense to post and allocate between owners."""
+
+    property_id: int
+    kind: PropertyEventKind
+    event_date: date
+    amount: Decimal
+    description: str | None = None
+    account_id: int | None = None
+    expense_type: str = "all"
+
+
+class MortgageProduct(BaseModel):
+    """A candidate remortgage offer; rates are annual percentages.
+
+    After ``fixed_months`` the rate reverts to ``follow_on_rate`` (the same
+    rate if None). ``erc_pct`` lists early repayment charges by year of the
+    fixed period. Without ``term_months`` the current remaining term is kept.
+    """
+
+    name: str
+    rate: float
+    fixed_months: int = 0
+    follow_on_rate: float | None = None
+    term_months: int | None = None
+    arrangement_fee: Decimal = Decimal("0")
+    fee_added_to_loan: bool = False
+    other_fees: Decimal = Decimal("0")
+    cashback: Decimal = Decimal("0")
+    erc_pct: list[float] = Field(default_factory=list)
+
+
+class EntryPage(BaseModel):
+    """One page of a keyset-paginated journal listing."""
+
+    entries: list[dict] = Field(default_factory=list)
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
 
 
 class AccountBalance(BaseModel):
@@ -0,0 +1,187 @@
+"""Year-end close: archive old journals and roll balances forward."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+from finadviser.db.archive import ARCHIVE_SCHEMA, OPENING_BALANCE_REFERENCE, is_attached
+from finadviser.db.changes import mark_written
+from finadviser.db.connection import unit_of_work
+from finadviser.db.models import BookEntry, JournalEntry
+from finadviser.db.repositories import JournalRepo
+
+# Tables whose rows point at journals by id. Journals referenced here stay in
+# the live database so the references keep resolving.
+PINNED_JOURNAL_REFERENCES = [
+    ("property_transfers", "journal_entry_id"),
+    ("mortgage_payments", "journal_entry_id"),
+    ("mortgage_payments", "capital_journal_id"),
+]
+
+
+class PeriodCloser:
+    """Moves closed years' journals into the archive database.
+
+    Closing a year:
+    - copies its journals, book entries, fingerprints and daily balance
+      checkpoints into the attached archive
+    - deletes them from the live database
+    - posts one opening-balance journal dated the last day of the year whose
+      legs restore every account's balance
+
+    Balances, equity and anything else derived from live balances are unchanged.
+    Full-history reports read the ``history_*`` views, which span both files.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.journal_repo = JournalRepo(conn)
+
+    def closed_through(self) -> str | None:
+        """Cutoff date of the latest close, if any."""
+        return self.conn.execute("SELECT MAX(cutoff) FROM period_closes").fetchone()[0]
+
+    def close_year(self, year: int) -> dict:
+        """Close every year up to and including ``year``.
+
+        Returns a summary with the cutoff date, the number of archived journals
+        and the opening-balance journal id.
+        """
+        if not is_attached(self.conn):
+            raise ValueError("Attach the archive database before closing a period")
+
+        cutoff = date(year, 12, 31).isoformat()
+        closed_through = self.closed_through()
+        if closed_through and cutoff <= closed_through:
+            raise ValueError(f"{year} is already closed (closed through {closed_through})")
+
+        archive_path = next(
+            row[2] for row in self.conn.execute("PRAGMA database_list") if row[1] == ARCHIVE_SCHEMA
+        )
+
+        with unit_of_work(self.conn):
+            pinned = " UNION ".join(
+                f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL"
+                for table, column in PINNED_JOURNAL_REFERENCES
+            )
+            self.conn.execute("DROP TABLE IF EXISTS temp.close_journals")
+            self.conn.execute(
+                f"""CREATE TEMP TABLE close_journals AS
+                    SELECT id FROM main.journal_entries
+                    WHERE date <= ?
+                      AND COALESCE(reference, '') NOT LIKE '{OPENING_BALANCE_REFERENCE}:%'
+                      AND id NOT IN ({pinned})""",
+                (cutoff,),
+            )
+
+            # Checkpoints from the cutoff on already hold the right cumulative
+            # balances. Park them, with each account's balance at the cutoff,
+            # while the closed journals are deleted, then restore them.
+            self.conn.execute("DROP TABLE IF EXISTS temp.close_checkpoints")
+            self.conn.execute(
+                """CREATE TEMP TABLE close_checkpoints AS
+                   SELECT account_id, :cutoff AS date, balance FROM main.account_daily_balances
+                   WHERE (account_id, date) IN (
+                       SELECT account_id, MAX(date) FROM main.account_daily_balances
+                       WHERE date <= :cutoff GROUP BY account_id
+                   )
+                   UNION ALL
+                   SELECT account_id, date, balance FROM main.account_daily_balances
+                   WHERE date > :cutoff""",
+                {"cutoff": cutoff},
+            )
+
+            opening = self._opening_balances(cutoff, pinned)
+            self._archive_journals(cutoff)
+            opening_id = self._post_opening_journal(year, cutoff, opening)
+
+            journal_count = self.conn.execute("SELECT COUNT(*) FROM temp.close_journals").fetchone()[0]
+            self.conn.execute(
+                """INSERT INTO period_closes (year, cutoff, archive_path, journal_count, opening_journal_id)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (year, cutoff, archive_path, journal_count, opening_id),
+            )
+            self.conn.execute("DROP TABLE temp.close_journals")
+            mark_written(self.conn, "journal_entries", "book_entries", "transaction_fingerprints", "period_closes")
+
+        return {"cutoff": cutoff, "journal_count": journal_count, "opening_journal_id": opening_id}
+
+    def _opening_balances(self, cutoff: str, pinned: str) -> dict[int, Decimal]:
+        """Balance at cutoff per account, less the pinned journals staying live."""
+        rows = self.conn.execute(
+            f"""SELECT account_id, SUM(balance) AS balance FROM (
+                    SELECT account_id, balance FROM temp.close_checkpoints WHERE date = :cutoff
+                    UNION ALL
+                    SELECT be.account_id, -be.amount
+                    FROM book_entries be
+                    JOIN journal_entries je ON je.id = be.journal_entry_id
+                    WHERE je.date <= :cutoff AND je.id IN ({pinned})
+                )
+                GROUP BY account_id
+                HAVING ROUND(SUM(balance), 2) != 0""",
+            {"cutoff": cutoff},
+        ).fetchall()
+        return {r["account_id"]: Decimal(str(round(r["balance"], 2))) for r in rows}
+
+    def _archive_journals(self, cutoff: str) -> None:
+        """Copy closed journals into the archive and delete them from live."""
+        archive = ARCHIVE_SCHEMA
+        self.conn.execute(
+            f"""INSERT OR REPLACE INTO {archive}.account_daily_balances (account_id, date, balance)
+                SELECT account_id, date, balance FROM main.account_daily_balances WHERE date <= ?""",
+            (cutoff,),
+        )
+        self.conn.execute(
+            f"""INSERT OR REPLACE INTO {archive}.journal_entries
+                    (id, date, description, reference, category_id, import_batch_id, created_at, leg_count)
+                SELECT id, date, description, reference, category_id, import_batch_id, created_at, leg_count
+                FROM main.journal_entries WHERE id IN (SELECT id FROM temp.close_journals)"""
+        )
+        self.conn.execute(
+            f"""INSERT OR REPLACE INTO {archive}.book_entries (id, journal_entry_id, account_id, amount, created_at)
+                SELECT id, journal_entry_id, account_id, amount, created_at
+                FROM main.book_entries WHERE journal_entry_id IN (SELECT id FROM temp.close_journals)"""
+        )
+        self.conn.execute(
+            f"""INSERT OR REPLACE INTO {archive}.transaction_fingerprints
+                    (id, fingerprint, account_id, journal_entry_id, created_at)
+                SELECT id, fingerprint, account_id, journal_entry_id, created_at
+                FROM main.transaction_fingerprints WHERE journal_entry_id IN (SELECT id FROM temp.close_journals)"""
+        )
+        # With no checkpoints left the balance triggers have nothing to rewrite
+        self.conn.execute("DELETE FROM main.account_daily_balances")
+
+        self.conn.execute(
+            "DELETE FROM main.transaction_fingerprints WHERE journal_entry_id IN (SELECT id FROM temp.close_journals)"
+        )
+        self.conn.execute(
+            f"""DELETE FROM main.journal_entries
+                WHERE id IN (SELECT id FROM temp.close_journals)
+                   OR (date <= ? AND COALESCE(reference, '') LIKE '{OPENING_BALANCE_REFERENCE}:%')""",
+            (cutoff,),
+        )
+
+    def _post_opening_journal(self, year: int, cutoff: str, opening: dict[int, Decimal]) -> int | None:
+        """Post the rollforward journal and restore checkpoints from the cutoff on."""
+        opening_id = None
+        if opening:
+            opening_id = self.journal_repo.create_entry(
+                JournalEntry(
+                    date=date.fromisoformat(cutoff),
+                    description=f"Opening balances brought forward after closing {year}",
+                    reference=f"{OPENING_BALANCE_REFERENCE}:{year}",
+                ),
+                [
+                    BookEntry(journal_entry_id=0, account_id=account_id, amount=amount)
+                    for account_id, amount in opening.items()
+                ],
+            )
+
+        self.conn.execute(
+            """INSERT OR REPLACE INTO main.account_daily_balances (account_id, date, balance)
+               SELECT account_id, date, balance FROM temp.close_checkpoints"""
+        )
+        self.conn.execute("DROP TABLE temp.close_checkpoints")
+        return opening_id
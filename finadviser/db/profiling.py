@@ -0,0 +1,247 @@
+"""Opt-in SQL profiling: per-statement timings, call sites and slow-query plans.
+
+Enabled by setting ``FINADVISER_PROFILE_SQL`` to a report path (the CLI's
+``--profile-sql`` option does this). ``get_connection`` then creates
+``ProfilingConnection``s and the report is written when the process exits.
+When the variable is unset this module is never imported and connections
+run with no instrumentation. ``FINADVISER_SLOW_QUERY_MS`` sets the slow-query
+threshold (default 50 ms).
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from finadviser.db.connection import PROFILE_SQL_ENV, Connection
+
+SLOW_MS_ENV = "FINADVISER_SLOW_QUERY_MS"
+DEFAULT_SLOW_MS = 50.0
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+_PACKAGE_DIR = str(Path(__file__).resolve().parent.parent)
+_THIS_FILE = str(Path(__file__).resolve())
+
+_profiler: QueryProfiler | None = None
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and literals so repeated statements group together."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (?, ...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def _call_site() -> str:
+    """First frame in finadviser code outside this module."""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != _THIS_FILE:
+            site = f"{os.path.relpath(filename, _PACKAGE_DIR)}:{frame.f_lineno} {frame.f_code.co_name}"
+            if filename.startswith(_PACKAGE_DIR):
+                return site
+            fallback = fallback or site
+        frame = frame.f_back
+    return fallback or "?"
+
+
+class QueryStats:
+    """Aggregate timings for one normalized statement."""
+
+    __slots__ = ("sql", "calls", "total", "max", "rows", "sites")
+
+    def __init__(self, sql: str) -> None:
+        self.sql = sql
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.sites: Counter[str] = Counter()
+
+
+class QueryProfiler:
+    """Collects statement statistics from every profiling connection."""
+
+    def __init__(self, slow_ms: float = DEFAULT_SLOW_MS) -> None:
+        self.slow_seconds = slow_ms / 1000
+        self.stats: dict[str, QueryStats] = {}
+        self.slow: list[tuple[float, str, str, list[str]]] = []
+        self._planned: set[str] = set()
+        self._lock = threading.Lock()
+
+    def stats_for(self, sql: str) -> QueryStats:
+        key = normalize_sql(sql)
+        stats = self.stats.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self.stats.setdefault(key, QueryStats(key))
+        return stats
+
+    def record_slow(self, conn: sqlite3.Connection, sql: str, params, elapsed: float, site: str) -> None:
+        """Log a slow execution, with its query plan the first time it is seen."""
+        key = normalize_sql(sql)
+        plan: list[str] = []
+        if key not in self._planned:
+            self._planned.add(key)
+            try:
+                # A plain cursor, so the EXPLAIN itself is not profiled
+                rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+                plan = [row[-1] for row in rows]
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            self.slow.append((elapsed, key, site, plan))
+
+    def report(self, top: int = 40) -> str:
+        """Plain-text report: statements by total time, then the slow log."""
+        stats = sorted(self.stats.values(), key=lambda s: s.total, reverse=True)
+        total = sum(s.total for s in stats)
+        lines = [
+            f"SQL PROFILE: {sum(s.calls for s in stats)} statements, {total * 1000:.1f} ms total",
+            "",
+            f"{'total ms':>10} {'calls':>7} {'mean ms':>9} {'max ms':>9} {'rows':>9}  statement",
+        ]
+        for s in stats[:top]:
+            lines.append(
+                f"{s.total * 1000:10.1f} {s.calls:7d} {s.total * 1000 / s.calls:9.2f} "
+                f"{s.max * 1000:9.2f} {s.rows:9d}  {s.sql[:160]}"
+            )
+            for site, count in s.sites.most_common(3):
+                lines.append(f"{'':48}  <- {site} ({count}x)")
+
+        if self.slow:
+            lines += ["", f"SLOW QUERIES (>= {self.slow_seconds * 1000:.0f} ms):"]
+            for elapsed, sql, site, plan in sorted(self.slow, reverse=True)[:top]:
+                lines.append(f"{elapsed * 1000:10.1f} ms  {site}")
+                lines.append(f"    {sql[:300]}")
+                lines += [f"    PLAN {step}" for step in plan]
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.report())
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor that charges execute and fetch time to the statement's stats."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._profiler: QueryProfiler = self.connection.profiler
+        self._stats: QueryStats | None = None
+        self._sql = ""
+        self._params = ()
+        self._site = ""
+        self._elapsed = 0.0
+        self._logged = False
+
+    def _charge(self, elapsed: float, rows: int) -> None:
+        stats = self._stats
+        if stats is None:
+            return
+        stats.total += elapsed
+        stats.rows += rows
+        self._elapsed += elapsed
+        if self._elapsed > stats.max:
+            stats.max = self._elapsed
+        if not self._logged and self._elapsed >= self._profiler.slow_seconds:
+            self._logged = True
+            self._profiler.record_slow(self.connection, self._sql, self._params, self._elapsed, self._site)
+
+    def _start(self, sql: str, params) -> None:
+        self._stats = self._profiler.stats_for(sql)
+        self._stats.calls += 1
+        self._site = _call_site()
+        self._stats.sites[self._site] += 1
+        self._sql, self._params = sql, params
+        self._elapsed, self._logged = 0.0, False
+
+    def execute(self, sql, parameters=(), /):
+        self._start(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._charge(time.perf_counter() - start, max(self.rowcount, 0))
+
+    def executemany(self, sql, seq_of_parameters, /):
+        self._start(sql, ())
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._charge(time.perf_counter() - start, max(self.rowcount, 0))
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._charge(time.perf_counter() - start, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._charge(time.perf_counter() - start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._charge(time.perf_counter() - start, len(rows))
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._charge(time.perf_counter() - start, 0)
+            raise
+        self._charge(time.perf_counter() - start, 1)
+        return row
+
+
+class ProfilingConnection(Connection):
+    """Connection whose statements all go through ``ProfilingCursor``."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.profiler = active_profiler() or QueryProfiler()
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=(), /):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def active_profiler() -> QueryProfiler | None:
+    """The process-wide profiler if profiling is switched on, else None.
+
+    The first call registers the report to be written at exit.
+    """
+    global _profiler
+    path = os.environ.get(PROFILE_SQL_ENV)
+    if not path:
+        return None
+    if _profiler is None:
+        _profiler = QueryProfiler(float(os.environ.get(SLOW_MS_ENV, DEFAULT_SLOW_MS)))
+        atexit.register(_profiler.write_report, Path(path).expanduser())
+    return _profiler
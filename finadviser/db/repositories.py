@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+import base64
+import binascii
+import re
 import sqlite3
 from datetime import date
 from decimal import Decimal
 
+from finadviser.db.archive import ARCHIVE_SCHEMA, is_attached
+from finadviser.db.changes import mark_written
 from finadviser.db.models import (
     Account,
     AccountBalance,
@@ -13,13 +18,89 @@ from finadviser.db.models import (
     BookEntry,
     Category,
     CategorizationRule,
+    EntryPage,
     ImportBatch,
     JournalEntry,
+    MortgagePayment,
     OwnerEquity,
+    PropertyValuation,
     TransactionFingerprint,
 )
 
 
+# Picks each journal's display leg with one indexed lookup per row: the
+# first asset or liability leg (the bank side of a transaction), falling
+# back to the first leg for journals that touch neither.
+_PRIMARY_LEG_JOIN = """
+            LEFT JOIN book_entries be ON be.id = (
+                SELECT pb.id FROM book_entries pb
+                JOIN accounts pa ON pa.id = pb.account_id
+                WHERE pb.journal_entry_id = je.id
+                ORDER BY pa.account_type NOT IN ('ASSET', 'LIABILITY'), pb.id
+                LIMIT 1
+            )
+            LEFT JOIN accounts a ON a.id = be.account_id"""
+
+
+def _encode_cursor(backwards: bool, entry_date: str, entry_id: int) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor string."""
+    raw = f"{'p' if backwards else 'n'}|{entry_date}|{entry_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[bool, str, int]:
+    """Decode a cursor into (backwards, date, id)."""
+    try:
+        direction, entry_date, entry_id = (
+            base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        )
+        if direction not in ("n", "p"):
+            raise ValueError(direction)
+        return direction == "p", entry_date, int(entry_id)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}") from e
+
+
+# Valuations estimated from a house price index rather than surveyed
+INDEX_SOURCE = "index"
+
+# The order that picks a property's current valuation: the latest date, then
+# a survey or manual figure ahead of an index estimate on that date, then the
+# most recently recorded row. Every latest-valuation query sorts by it so
+# they agree on same-day ties.
+LATEST_VALUATION_ORDER = f"valuation_date DESC, source IS '{INDEX_SOURCE}', id DESC"
+
+
+_FTS_TOKEN = re.compile(r'"[^"]*"?|[()]|[^\s()"]+')
+_FTS_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def _fts_query(text: str, operators: bool = True) -> str:
+    """Translate user search text into a safe FTS5 MATCH expression.
+
+    Every term is quoted so punctuation cannot break the query syntax. Bare
+    words become prefix matches, matching the old substring search behaviour
+    for the usual case of typing the start of a payee name.
+    """
+    parts: list[str] = []
+    for token in _FTS_TOKEN.findall(text):
+        if token.startswith('"'):
+            phrase = token.strip('"').strip()
+            if phrase:
+                parts.append('"' + phrase.replace('"', '""') + '"')
+        elif token in ("(", ")") or token in _FTS_OPERATORS:
+            if operators:
+                parts.append(token)
+        elif token == "*":
+            if parts and parts[-1].endswith('"'):
+                parts[-1] += "*"
+        else:
+            word = token.rstrip("*")
+            if word:
+                parts.append('"' + word.replace('"', '""') + '"*')
+    return " ".join(parts)
+
+
 class AccountRepo:
     """Operations on the accounts table."""
 
@@ -31,6 +112,7 @@ class AccountRepo:
             "INSERT INTO accounts (name, account_type, parent_id, description, is_system) VALUES (?, ?, ?, ?, ?)",
             (account.name, account.account_type.value, account.parent_id, account.description, int(account.is_system)),
         )
+        mark_written(self.conn, "accounts")
         self.conn.commit()
         return cursor.lastrowid
 
@@ -68,12 +150,97 @@ class AccountRepo:
         rows = self.conn.execute("SELECT * FROM v_account_balances").fetchall()
         return [AccountBalance(**dict(r)) for r in rows]
 
-    def get_balance(self, account_id: int) -> Decimal:
-        row = self.conn.execute(
-            "SELECT COALESCE(SUM(amount), 0) AS balance FROM book_entries WHERE account_id = ?",
+    def get_balance(self, account_id: int, as_of: date | None = None) -> Decimal:
+        """Account balance, optionally as of the end of a given day.
+
+        Reads the nearest daily checkpoint, a single primary-key seek. Dates
+        inside a closed period are answered from the attached archive.
+        """
+        table = self.checkpoint_table(as_of)
+        query = f"SELECT ROUND(balance, 2) AS balance FROM {table} WHERE account_id = ?"
+        params: list = [account_id]
+        if as_of is not None:
+            query += " AND date <= ?"
+            params.append(as_of.isoformat())
+        row = self.conn.execute(query + " ORDER BY date DESC LIMIT 1", params).fetchone()
+        return Decimal(str(row["balance"])) if row else Decimal("0")
+
+    def get_balance_map(self, account_ids: list[int]) -> dict[int, Decimal]:
+        """Current balances of several accounts in one query; missing ones are zero."""
+        ids = sorted(set(account_ids))
+        balances = dict.fromkeys(ids, Decimal("0"))
+        if not ids:
+            return balances
+        rows = self.conn.execute(
+            f"""SELECT account_id, ROUND(balance, 2) AS balance, MAX(date)
+                FROM account_daily_balances
+                WHERE account_id IN ({", ".join("?" * len(ids))})
+                GROUP BY account_id""",
+            ids,
+        )
+        for r in rows:
+            balances[r["account_id"]] = Decimal(str(r["balance"]))
+        return balances
+
+    def checkpoint_table(self, as_of: date | None) -> str:
+        """Checkpoint table holding balances as of a date: live or archived."""
+        if as_of is not None:
+            closed_through = self.conn.execute("SELECT MAX(cutoff) FROM period_closes").fetchone()[0]
+            if closed_through and as_of.isoformat() < closed_through:
+                if not is_attached(self.conn):
+                    raise ValueError(f"{as_of} is in a closed period; attach the archive database")
+                return f"{ARCHIVE_SCHEMA}.account_daily_balances"
+        return "account_daily_balances"
+
+    # -- hierarchy -------------------------------------------------------
+
+    def move(self, account_id: int, parent_id: int | None) -> None:
+        """Re-parent an account; its whole subtree moves with it."""
+        self.conn.execute("UPDATE accounts SET parent_id = ? WHERE id = ?", (parent_id, account_id))
+        mark_written(self.conn, "accounts")
+        self.conn.commit()
+
+    def get_subtree(self, account_id: int) -> list[Account]:
+        """The account and all of its descendants, shallowest first."""
+        rows = self.conn.execute(
+            """SELECT a.* FROM account_closure ac
+               JOIN accounts a ON a.id = ac.descendant_id
+               WHERE ac.ancestor_id = ?
+               ORDER BY ac.depth, a.name""",
+            (account_id,),
+        ).fetchall()
+        return [Account(**dict(r)) for r in rows]
+
+    def get_ancestors(self, account_id: int) -> list[Account]:
+        """The account's parents from the root down, excluding itself."""
+        rows = self.conn.execute(
+            """SELECT a.* FROM account_closure ac
+               JOIN accounts a ON a.id = ac.ancestor_id
+               WHERE ac.descendant_id = ? AND ac.depth > 0
+               ORDER BY ac.depth DESC""",
             (account_id,),
+        ).fetchall()
+        return [Account(**dict(r)) for r in rows]
+
+    def get_rollup_balances(self) -> list[AccountBalance]:
+        """Every account's balance including all of its descendants."""
+        rows = self.conn.execute("SELECT * FROM v_account_rollup_balances").fetchall()
+        return [AccountBalance(**dict(r)) for r in rows]
+
+    def get_subtree_balance(self, account_id: int, as_of: date | None = None) -> Decimal:
+        """Combined balance of an account and its descendants, optionally as of a day."""
+        table = self.checkpoint_table(as_of)
+        date_filter = " AND b.date <= :as_of" if as_of is not None else ""
+        row = self.conn.execute(
+            f"""SELECT ROUND(COALESCE(SUM((
+                    SELECT b.balance FROM {table} b
+                    WHERE b.account_id = ac.descendant_id{date_filter}
+                    ORDER BY b.date DESC LIMIT 1
+                )), 0), 2)
+                FROM account_closure ac WHERE ac.ancestor_id = :account_id""",
+            {"account_id": account_id, "as_of": as_of.isoformat() if as_of else None},
         ).fetchone()
-        return Decimal(str(row["balance"]))
+        return Decimal(str(row[0]))
 
 
 class JournalRepo:
@@ -92,27 +259,86 @@ class JournalRepo:
         The SQLite trigger enforces that book entries sum to zero.
         We insert all entries in one transaction.
         """
+        return self.create_entries([(journal, entries)])[0]
+
+    def create_entries(self, journals: list[tuple[JournalEntry, list[BookEntry]]]) -> list[int]:
+        """Create many journal entries with one commit; returns their ids in order.
+
+        Every journal is validated before anything is written. Book entries
+        for all of them go in with a single ``executemany``.
+        """
+        for _, entries in journals:
+            if not entries or len(entries) < 2:
+                raise ValueError("A journal entry requires at least 2 book entries")
+            total = sum(e.amount for e in entries)
+            if round(float(total), 2) != 0:
+                raise ValueError(f"Book entries must sum to zero, got {total}")
+
+        journal_ids = []
+        rows = []
+        for journal, entries in journals:
+            cursor = self.conn.execute(
+                "INSERT INTO journal_entries (date, description, reference, category_id, import_batch_id, leg_count) VALUES (?, ?, ?, ?, ?, ?)",
+                (journal.date.isoformat(), journal.description, journal.reference, journal.category_id, journal.import_batch_id, len(entries)),
+            )
+            journal_ids.append(cursor.lastrowid)
+            rows += [(cursor.lastrowid, e.account_id, float(e.amount)) for e in entries]
+
+        self.conn.executemany(
+            "INSERT INTO book_entries (journal_entry_id, account_id, amount) VALUES (?, ?, ?)", rows,
+        )
+        mark_written(self.conn, "journal_entries", "book_entries")
+        self.conn.commit()
+        return journal_ids
+
+    def replace_entries(self, journal_id: int, entries: list[BookEntry]) -> None:
+        """Replace all of a journal's book entries with a new balanced set."""
         if not entries or len(entries) < 2:
             raise ValueError("A journal entry requires at least 2 book entries")
-
         total = sum(e.amount for e in entries)
         if round(float(total), 2) != 0:
             raise ValueError(f"Book entries must sum to zero, got {total}")
 
-        cursor = self.conn.execute(
-            "INSERT INTO journal_entries (date, description, reference, category_id, import_batch_id) VALUES (?, ?, ?, ?, ?)",
-            (journal.date.isoformat(), journal.description, journal.reference, journal.category_id, journal.import_batch_id),
+        self.conn.execute("DELETE FROM book_entries WHERE journal_entry_id = ?", (journal_id,))
+        self.conn.execute("UPDATE journal_entries SET leg_count = ? WHERE id = ?", (len(entries), journal_id))
+        self.conn.executemany(
+            "INSERT INTO book_entries (journal_entry_id, account_id, amount) VALUES (?, ?, ?)",
+            [(journal_id, e.account_id, float(e.amount)) for e in entries],
         )
-        journal_id = cursor.lastrowid
+        mark_written(self.conn, "journal_entries", "book_entries")
+        self.conn.commit()
 
-        for entry in entries:
-            self.conn.execute(
-                "INSERT INTO book_entries (journal_entry_id, account_id, amount) VALUES (?, ?, ?)",
-                (journal_id, entry.account_id, float(entry.amount)),
-            )
+    def split_leg(self, journal_id: int, account_id: int, entries: list[BookEntry]) -> None:
+        """Replace a journal's leg on one account with legs summing to the same amount.
 
+        Used to re-point an imported transaction's placeholder leg (for
+        example "Uncategorized Expense") without touching its other legs.
+        The old leg is deleted and the replacements posted as new rows, so
+        append-and-delete change detection such as ``LedgerCache`` sees them.
+        """
+        legs = self.conn.execute(
+            "SELECT id, amount FROM book_entries WHERE journal_entry_id = ? AND account_id = ?",
+            (journal_id, account_id),
+        ).fetchall()
+        if len(legs) != 1:
+            raise ValueError(f"Journal {journal_id} has {len(legs)} legs on account {account_id}, expected 1")
+        if not entries or round(float(sum(e.amount for e in entries)) - legs[0]["amount"], 2) != 0:
+            raise ValueError(f"Replacement legs must sum to {legs[0]['amount']}")
+
+        # Raise the expected leg count first so the balance check runs on the last insert
+        self.conn.execute(
+            """UPDATE journal_entries
+               SET leg_count = (SELECT COUNT(*) FROM book_entries WHERE journal_entry_id = :id) - 1 + :added
+               WHERE id = :id""",
+            {"id": journal_id, "added": len(entries)},
+        )
+        self.conn.execute("DELETE FROM book_entries WHERE id = ?", (legs[0]["id"],))
+        self.conn.executemany(
+            "INSERT INTO book_entries (journal_entry_id, account_id, amount) VALUES (?, ?, ?)",
+            [(journal_id, e.account_id, float(e.amount)) for e in entries],
+        )
+        mark_written(self.conn, "journal_entries", "book_entries")
         self.conn.commit()
-        return journal_id
 
     def get_entry(self, journal_id: int) -> JournalEntry | None:
         row = self.conn.execute("SELECT * FROM journal_entries WHERE id = ?", (journal_id,)).fetchone()
@@ -136,64 +362,271 @@ class JournalRepo:
         offset: int = 0,
     ) -> list[dict]:
         """List journal entries with their associated book entries, filtered."""
-        query = """
+        where, params = self._entry_filters(start_date, end_date, category_id, account_id)
+        query = f"""
+            SELECT je.id, je.date, je.description, je.reference, je.category_id,
+                   c.name AS category_name,
+                   be.account_id AS primary_account_id,
+                   a.name AS primary_account_name,
+                   be.amount AS primary_amount
+            FROM (
+                SELECT * FROM journal_entries je
+                WHERE 1=1{where}
+                ORDER BY je.date DESC, je.id DESC
+                LIMIT ? OFFSET ?
+            ) je
+            LEFT JOIN categories c ON c.id = je.category_id
+            {_PRIMARY_LEG_JOIN}
+            ORDER BY je.date DESC, je.id DESC
+        """
+        params.extend([limit, offset])
+
+        entries = [dict(r) for r in self.conn.execute(query, params).fetchall()]
+        self._attach_running_balances(entries, account_id)
+        return entries
+
+    def list_entries_page(
+        self,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        category_id: int | None = None,
+        account_id: int | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> EntryPage:
+        """List journal entries newest-first using keyset pagination on (date, id).
+
+        Pass ``next_cursor`` or ``prev_cursor`` from a previous page to move
+        through the ledger. Each page is a bounded index range scan, so deep
+        pages cost the same as the first. Paging back past the newest entry
+        returns the first page, so every page but the last is full.
+        """
+        where, params = self._entry_filters(start_date, end_date, category_id, account_id)
+
+        backwards = False
+        if cursor:
+            backwards, cursor_date, cursor_id = _decode_cursor(cursor)
+            where += f" AND (je.date, je.id) {'>' if backwards else '<'} (?, ?)"
+            params.extend([cursor_date, cursor_id])
+
+        order = "ASC" if backwards else "DESC"
+        query = f"""
             SELECT je.id, je.date, je.description, je.reference, je.category_id,
                    c.name AS category_name,
-                   GROUP_CONCAT(a.name || ':' || be.amount, '|') AS entries_summary
-            FROM journal_entries je
+                   be.account_id AS primary_account_id,
+                   a.name AS primary_account_name,
+                   be.amount AS primary_amount
+            FROM (
+                SELECT * FROM journal_entries je
+                WHERE 1=1{where}
+                ORDER BY je.date {order}, je.id {order}
+                LIMIT ?
+            ) je
             LEFT JOIN categories c ON c.id = je.category_id
-            LEFT JOIN book_entries be ON be.journal_entry_id = je.id
-            LEFT JOIN accounts a ON a.id = be.account_id
-            WHERE 1=1
+            {_PRIMARY_LEG_JOIN}
+            ORDER BY je.date DESC, je.id DESC
         """
+        # Fetch one extra row to learn whether another page exists
+        params.append(limit + 1)
+
+        entries = [dict(r) for r in self.conn.execute(query, params).fetchall()]
+        has_more = len(entries) > limit
+        if has_more:
+            entries = entries[1:] if backwards else entries[:limit]
+        elif backwards and len(entries) < limit:
+            # Fewer rows than a page above the cursor: fill from the top instead
+            return self.list_entries_page(start_date, end_date, category_id, account_id, limit=limit)
+
+        self._attach_running_balances(entries, account_id)
+        page = EntryPage(entries=entries)
+        if entries:
+            first, last = entries[0], entries[-1]
+            # Moving backwards means older rows exist; moving forwards from a
+            # cursor means newer rows exist.
+            if has_more or backwards:
+                page.next_cursor = _encode_cursor(False, last["date"], last["id"])
+            if (has_more and backwards) or (cursor and not backwards):
+                page.prev_cursor = _encode_cursor(True, first["date"], first["id"])
+        return page
+
+    def _attach_running_balances(self, entries: list[dict], account_id: int | None) -> None:
+        """Set ``running_balance`` on each entry for the filtered account.
+
+        A window sum over the account's movements in the page's date range,
+        seeded from the checkpoint just before the range. Without an account
+        filter the running balance is undefined and left as None.
+        """
+        for entry in entries:
+            entry["running_balance"] = None
+        if account_id is None or not entries:
+            return
+
+        dates = [e["date"] for e in entries]
+        rows = self.conn.execute(
+            """SELECT id,
+                      COALESCE((
+                          SELECT balance FROM account_daily_balances
+                          WHERE account_id = :account_id AND date < :start
+                          ORDER BY date DESC LIMIT 1
+                      ), 0) + SUM(amount) OVER (ORDER BY date, id) AS running_balance
+               FROM (
+                   SELECT je.id, je.date, SUM(be.amount) AS amount
+                   FROM journal_entries je
+                   JOIN book_entries be ON be.journal_entry_id = je.id
+                   WHERE je.date BETWEEN :start AND :end AND be.account_id = :account_id
+                   GROUP BY je.id
+               )""",
+            {"account_id": account_id, "start": min(dates), "end": max(dates)},
+        ).fetchall()
+        balances = {r["id"]: round(r["running_balance"], 2) for r in rows}
+        for entry in entries:
+            entry["running_balance"] = balances.get(entry["id"])
+
+    @staticmethod
+    def _entry_filters(
+        start_date: date | None,
+        end_date: date | None,
+        category_id: int | None,
+        account_id: int | None,
+    ) -> tuple[str, list]:
+        """Build the WHERE fragment shared by the journal listing queries."""
+        where = ""
         params: list = []
 
         if start_date:
-            query += " AND je.date >= ?"
+            where += " AND je.date >= ?"
             params.append(start_date.isoformat())
         if end_date:
-            query += " AND je.date <= ?"
+            where += " AND je.date <= ?"
             params.append(end_date.isoformat())
         if category_id is not None:
-            query += " AND je.category_id = ?"
+            where += " AND je.category_id IN (SELECT descendant_id FROM category_closure WHERE ancestor_id = ?)"
             params.append(category_id)
         if account_id is not None:
-            query += " AND je.id IN (SELECT journal_entry_id FROM book_entries WHERE account_id = ?)"
+            where += " AND je.id IN (SELECT journal_entry_id FROM book_entries WHERE account_id = ?)"
             params.append(account_id)
 
-        query += " GROUP BY je.id ORDER BY je.date DESC, je.id DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-
-        rows = self.conn.execute(query, params).fetchall()
-        return [dict(r) for r in rows]
+        return where, params
 
     def update_category(self, journal_id: int, category_id: int) -> None:
         self.conn.execute(
             "UPDATE journal_entries SET category_id = ? WHERE id = ?",
             (category_id, journal_id),
         )
+        mark_written(self.conn, "journal_entries")
         self.conn.commit()
 
-    def get_monthly_spending(self) -> list[dict]:
-        rows = self.conn.execute("SELECT * FROM v_monthly_spending").fetchall()
+    def get_monthly_spending(self, rollup: bool = False) -> list[dict]:
+        """Expense totals by month and category across the full history.
+
+        With ``rollup`` each month's spending is also counted under every
+        ancestor of its category, as in ``get_category_rollup``;
+        uncategorized spending keeps a row with no category either way.
+        """
+        category_join = (
+            """LEFT JOIN category_closure cc ON cc.descendant_id = je.category_id
+               LEFT JOIN categories c ON c.id = cc.ancestor_id"""
+            if rollup
+            else "LEFT JOIN categories c ON c.id = je.category_id"
+        )
+        rows = self.conn.execute(
+            f"""SELECT strftime('%Y-%m', je.date) AS month,
+                       c.id AS category_id,
+                       c.name AS category_name,
+                       c.parent_id,
+                       a.account_type,
+                       SUM(be.amount) AS total
+                FROM history_book_entries be
+                JOIN history_journal_entries je ON je.id = be.journal_entry_id
+                JOIN accounts a ON a.id = be.account_id
+                {category_join}
+                WHERE a.account_type = 'EXPENSE'
+                GROUP BY month, c.id, a.account_type
+                ORDER BY month DESC"""
+        ).fetchall()
         return [dict(r) for r in rows]
 
-    def search(self, query: str, limit: int = 50) -> list[dict]:
+    def get_category_rollup(
+        self,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[dict]:
+        """Expense totals per category including all of its subcategories.
+
+        Each journal is counted under its own category and every ancestor,
+        so a parent's total is the whole subtree's spending.
+        """
+        where = ""
+        params: list = []
+        if start_date:
+            where += " AND je.date >= ?"
+            params.append(start_date.isoformat())
+        if end_date:
+            where += " AND je.date <= ?"
+            params.append(end_date.isoformat())
         rows = self.conn.execute(
-            """SELECT je.id, je.date, je.description, je.category_id, c.name AS category_name,
-                      GROUP_CONCAT(a.name || ':' || be.amount, '|') AS entries_summary
-               FROM journal_entries je
-               LEFT JOIN categories c ON c.id = je.category_id
-               LEFT JOIN book_entries be ON be.journal_entry_id = je.id
-               LEFT JOIN accounts a ON a.id = be.account_id
-               WHERE je.description LIKE ?
-               GROUP BY je.id
-               ORDER BY je.date DESC
-               LIMIT ?""",
-            (f"%{query}%", limit),
+            f"""SELECT c.id AS category_id, c.name AS category_name, c.parent_id,
+                       SUM(be.amount) AS total
+                FROM history_book_entries be
+                JOIN history_journal_entries je ON je.id = be.journal_entry_id
+                JOIN accounts a ON a.id = be.account_id
+                JOIN category_closure cc ON cc.descendant_id = je.category_id
+                JOIN categories c ON c.id = cc.ancestor_id
+                WHERE a.account_type = 'EXPENSE'{where}
+                GROUP BY c.id
+                ORDER BY total DESC""",
+            params,
         ).fetchall()
         return [dict(r) for r in rows]
 
+    def search(
+        self,
+        query: str,
+        limit: int = 50,
+        category_id: int | None = None,
+        account_id: int | None = None,
+    ) -> list[dict]:
+        """Full-text search over journal descriptions and references.
+
+        Bare words match as prefixes; "quoted phrases" and AND/OR/NOT with
+        parentheses are supported. Results are ranked by bm25, with
+        descriptions weighted above references.
+        """
+        match = _fts_query(query)
+        if not match:
+            return []
+
+        where, params = self._entry_filters(None, None, category_id, account_id)
+        sql = f"""
+            SELECT je.id, je.date, je.description, je.reference, je.category_id,
+                   c.name AS category_name,
+                   be.account_id AS primary_account_id,
+                   a.name AS primary_account_name,
+                   be.amount AS primary_amount
+            FROM (
+                SELECT je.*, bm25(journal_fts, 2.0, 1.0) AS score
+                FROM journal_fts
+                JOIN journal_entries je ON je.id = journal_fts.rowid
+                WHERE journal_fts MATCH ?{where}
+                ORDER BY score, je.date DESC
+                LIMIT ?
+            ) je
+            LEFT JOIN categories c ON c.id = je.category_id
+            {_PRIMARY_LEG_JOIN}
+            ORDER BY je.score, je.date DESC
+        """
+        try:
+            rows = self.conn.execute(sql, [match, *params, limit]).fetchall()
+        except sqlite3.OperationalError as e:
+            if "fts5: syntax error" not in str(e):
+                raise
+            # Malformed boolean syntax: fall back to matching every term
+            match = _fts_query(query, operators=False)
+            if not match:
+                return []
+            rows = self.conn.execute(sql, [match, *params, limit]).fetchall()
+        return [dict(r) for r in rows]
+
 
 class CategoryRepo:
     """Operations on categories and categorization rules."""
@@ -206,6 +639,7 @@ class CategoryRepo:
             "INSERT INTO categories (name, parent_id, is_system) VALUES (?, ?, ?)",
             (category.name, category.parent_id, int(category.is_system)),
         )
+        mark_written(self.conn, "categories")
         self.conn.commit()
         return cursor.lastrowid
 
@@ -225,11 +659,40 @@ class CategoryRepo:
         rows = self.conn.execute("SELECT * FROM categories ORDER BY name").fetchall()
         return [Category(**dict(r)) for r in rows]
 
+    def move(self, category_id: int, parent_id: int | None) -> None:
+        """Re-parent a category; its subcategories move with it."""
+        self.conn.execute("UPDATE categories SET parent_id = ? WHERE id = ?", (parent_id, category_id))
+        mark_written(self.conn, "categories")
+        self.conn.commit()
+
+    def get_subtree(self, category_id: int) -> list[Category]:
+        """The category and all of its subcategories, shallowest first."""
+        rows = self.conn.execute(
+            """SELECT c.* FROM category_closure cc
+               JOIN categories c ON c.id = cc.descendant_id
+               WHERE cc.ancestor_id = ?
+               ORDER BY cc.depth, c.name""",
+            (category_id,),
+        ).fetchall()
+        return [Category(**dict(r)) for r in rows]
+
+    def get_ancestors(self, category_id: int) -> list[Category]:
+        """The category's parents from the root down, excluding itself."""
+        rows = self.conn.execute(
+            """SELECT c.* FROM category_closure cc
+               JOIN categories c ON c.id = cc.ancestor_id
+               WHERE cc.descendant_id = ? AND cc.depth > 0
+               ORDER BY cc.depth DESC""",
+            (category_id,),
+        ).fetchall()
+        return [Category(**dict(r)) for r in rows]
+
     def add_rule(self, rule: CategorizationRule) -> int:
         cursor = self.conn.execute(
             "INSERT INTO categorization_rules (pattern, category_id, match_type, priority, source) VALUES (?, ?, ?, ?, ?)",
             (rule.pattern, rule.category_id, rule.match_type.value, rule.priority, rule.source.value),
         )
+        mark_written(self.conn, "categorization_rules")
         self.conn.commit()
         return cursor.lastrowid
 
@@ -247,10 +710,12 @@ class FingerprintRepo:
         self.conn = conn
 
     def exists(self, fingerprint: str, account_id: int) -> bool:
-        row = self.conn.execute(
-            "SELECT 1 FROM transaction_fingerprints WHERE fingerprint = ? AND account_id = ?",
-            (fingerprint, account_id),
-        ).fetchone()
+        query = "SELECT 1 FROM transaction_fingerprints WHERE fingerprint = ? AND account_id = ?"
+        params: tuple = (fingerprint, account_id)
+        if is_attached(self.conn):
+            query += f" UNION ALL SELECT 1 FROM {ARCHIVE_SCHEMA}.transaction_fingerprints WHERE fingerprint = ? AND account_id = ?"
+            params += params
+        row = self.conn.execute(query, params).fetchone()
         return row is not None
 
     def create(self, fp: TransactionFingerprint) -> int:
@@ -258,6 +723,7 @@ class FingerprintRepo:
             "INSERT INTO transaction_fingerprints (fingerprint, account_id, journal_entry_id) VALUES (?, ?, ?)",
             (fp.fingerprint, fp.account_id, fp.journal_entry_id),
         )
+        mark_written(self.conn, "transaction_fingerprints")
         return cursor.lastrowid
 
 
@@ -272,6 +738,7 @@ class ImportBatchRepo:
             "INSERT INTO import_batches (filename, bank_config, account_id, row_count, imported_count, duplicate_count) VALUES (?, ?, ?, ?, ?, ?)",
             (batch.filename, batch.bank_config, batch.account_id, batch.row_count, batch.imported_count, batch.duplicate_count),
         )
+        mark_written(self.conn, "import_batches")
         self.conn.commit()
         return cursor.lastrowid
 
@@ -280,6 +747,7 @@ class ImportBatchRepo:
             "UPDATE import_batches SET imported_count = ?, duplicate_count = ? WHERE id = ?",
             (imported, duplicates, batch_id),
         )
+        mark_written(self.conn, "import_batches")
         self.conn.commit()
 
     def list_all(self) -> list[ImportBatch]:
@@ -295,12 +763,19 @@ class PropertyRepo:
 
     def create_property(self, prop: dict) -> int:
         cursor = self.conn.execute(
-            "INSERT INTO properties (name, address, purchase_date, purchase_price) VALUES (?, ?, ?, ?)",
-            (prop["name"], prop.get("address"), prop.get("purchase_date"), prop.get("purchase_price")),
+            "INSERT INTO properties (name, address, purchase_date, purchase_price, region) VALUES (?, ?, ?, ?, ?)",
+            (prop["name"], prop.get("address"), prop.get("purchase_date"), prop.get("purchase_price"), prop.get("region")),
         )
+        mark_written(self.conn, "properties")
         self.conn.commit()
         return cursor.lastrowid
 
+    def set_region(self, property_id: int, region: str | None) -> None:
+        """Set the house-price-index region a property is revalued against."""
+        self.conn.execute("UPDATE properties SET region = ? WHERE id = ?", (region, property_id))
+        mark_written(self.conn, "properties")
+        self.conn.commit()
+
     def get_property(self, property_id: int) -> dict | None:
         row = self.conn.execute("SELECT * FROM properties WHERE id = ?", (property_id,)).fetchone()
         return dict(row) if row else None
@@ -311,6 +786,7 @@ class PropertyRepo:
 
     def create_owner(self, name: str) -> int:
         cursor = self.conn.execute("INSERT OR IGNORE INTO owners (name) VALUES (?)", (name,))
+        mark_written(self.conn, "owners")
         self.conn.commit()
         if cursor.lastrowid:
             return cursor.lastrowid
@@ -330,6 +806,7 @@ class PropertyRepo:
             "INSERT INTO property_ownership (property_id, owner_id, capital_account_id) VALUES (?, ?, ?)",
             (property_id, owner_id, capital_account_id),
         )
+        mark_written(self.conn, "property_ownership")
         self.conn.commit()
         return cursor.lastrowid
 
@@ -349,30 +826,48 @@ class PropertyRepo:
             "INSERT INTO property_valuations (property_id, valuation, valuation_date, source) VALUES (?, ?, ?, ?)",
             (property_id, valuation, valuation_date, source),
         )
+        mark_written(self.conn, "property_valuations")
         self.conn.commit()
         return cursor.lastrowid
 
+    def add_valuations(self, valuations: list[PropertyValuation]) -> None:
+        """Insert many valuations with one ``executemany`` and one commit."""
+        self.conn.executemany(
+            "INSERT INTO property_valuations (property_id, valuation, valuation_date, source) VALUES (?, ?, ?, ?)",
+            [(v.property_id, float(v.valuation), v.valuation_date.isoformat(), v.source) for v in valuations],
+        )
+        mark_written(self.conn, "property_valuations")
+        self.conn.commit()
+
     def get_latest_valuation(self, property_id: int) -> dict | None:
         row = self.conn.execute(
-            "SELECT * FROM property_valuations WHERE property_id = ? ORDER BY valuation_date DESC LIMIT 1",
+            f"SELECT * FROM property_valuations WHERE property_id = ? ORDER BY {LATEST_VALUATION_ORDER} LIMIT 1",
             (property_id,),
         ).fetchone()
         return dict(row) if row else None
 
     def get_valuations(self, property_id: int) -> list[dict]:
         rows = self.conn.execute(
-            "SELECT * FROM property_valuations WHERE property_id = ? ORDER BY valuation_date DESC",
+            f"SELECT * FROM property_valuations WHERE property_id = ? ORDER BY {LATEST_VALUATION_ORDER}",
             (property_id,),
         ).fetchall()
         return [dict(r) for r in rows]
 
     def create_mortgage(self, mortgage: dict) -> int:
+        if mortgage.get("payee_pattern"):
+            try:
+                re.compile(mortgage["payee_pattern"])
+            except re.error as e:
+                raise ValueError(f"Invalid payee pattern {mortgage['payee_pattern']!r}: {e}") from e
         cursor = self.conn.execute(
-            """INSERT INTO mortgages (property_id, lender, original_amount, start_date, term_months, liability_account_id)
-               VALUES (?, ?, ?, ?, ?, ?)""",
+            """INSERT INTO mortgages (
+                   property_id, lender, original_amount, start_date, term_months, liability_account_id, payee_pattern
+               ) VALUES (?, ?, ?, ?, ?, ?, ?)""",
             (mortgage["property_id"], mortgage["lender"], mortgage["original_amount"],
-             mortgage["start_date"], mortgage["term_months"], mortgage["liability_account_id"]),
+             mortgage["start_date"], mortgage["term_months"], mortgage["liability_account_id"],
+             mortgage.get("payee_pattern")),
         )
+        mark_written(self.conn, "mortgages")
         self.conn.commit()
         return cursor.lastrowid
 
@@ -387,9 +882,51 @@ class PropertyRepo:
             "INSERT INTO mortgage_rate_history (mortgage_id, rate, effective_date) VALUES (?, ?, ?)",
             (mortgage_id, rate, effective_date),
         )
+        mark_written(self.conn, "mortgage_rate_history")
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def add_mortgage_payment(self, payment: MortgagePayment) -> int:
+        cursor = self.conn.execute(
+            """INSERT INTO mortgage_payments (
+                   mortgage_id, payment_date, journal_entry_id, capital_journal_id, payer_owner_id,
+                   total_amount, principal_amount, interest_amount
+               ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (payment.mortgage_id, payment.payment_date.isoformat(), payment.journal_entry_id,
+             payment.capital_journal_id, payment.payer_owner_id, float(payment.total_amount),
+             float(payment.principal_amount), float(payment.interest_amount)),
+        )
+        mark_written(self.conn, "mortgage_payments")
         self.conn.commit()
         return cursor.lastrowid
 
+    def get_mortgage_payments(
+        self, mortgage_id: int, start: date | None = None, end: date | None = None,
+    ) -> list[MortgagePayment]:
+        """Payments for one mortgage, newest first, optionally within a date range."""
+        rows = self.conn.execute(
+            """SELECT * FROM mortgage_payments
+               WHERE mortgage_id = ? AND payment_date >= ? AND payment_date <= ?
+               ORDER BY payment_date DESC, id DESC""",
+            (mortgage_id, start.isoformat() if start else "", end.isoformat() if end else "9999-12-31"),
+        ).fetchall()
+        return [MortgagePayment(**dict(r)) for r in rows]
+
+    def get_mortgage_payment_totals(self, mortgage_id: int, as_of: date | None = None) -> dict:
+        """Payment count and total, principal and interest paid up to a date."""
+        row = self.conn.execute(
+            """SELECT COUNT(*) AS payments, COALESCE(SUM(total_amount), 0) AS total,
+                      COALESCE(SUM(principal_amount), 0) AS principal,
+                      COALESCE(SUM(interest_amount), 0) AS interest
+               FROM mortgage_payments
+               WHERE mortgage_id = ? AND payment_date <= ?""",
+            (mortgage_id, as_of.isoformat() if as_of else "9999-12-31"),
+        ).fetchone()
+        return {
+            "payments": row["payments"],
+            **{k: Decimal(str(round(row[k], 2))) for k in ("total", "principal", "interest")},
+        }
+
     def get_mortgage_balance(self, mortgage_id: int) -> Decimal:
         """Derive mortgage balance from the liability account's book entries."""
         row = self.conn.execute(
@@ -407,19 +944,60 @@ class PropertyRepo:
         ).fetchall()
         return [OwnerEquity(**dict(r)) for r in rows]
 
-    def get_allocation_rules(self, property_id: int) -> list[dict]:
+    def get_allocation_rules(self, property_id: int, as_of: date | None = None) -> list[dict]:
+        """Allocation rules for a property, oldest version first; only those in force on ``as_of`` if given."""
+        where, params = "", [property_id]
+        if as_of is not None:
+            where = " AND effective_from <= ? AND (effective_to IS NULL OR effective_to > ?)"
+            params += [as_of.isoformat()] * 2
         rows = self.conn.execute(
-            "SELECT * FROM expense_allocation_rules WHERE property_id = ?", (property_id,)
+            f"""SELECT * FROM expense_allocation_rules WHERE property_id = ?{where}
+                ORDER BY expense_type, effective_from, owner_id""",
+            params,
         ).fetchall()
         return [dict(r) for r in rows]
 
-    def set_allocation_rule(self, property_id: int, owner_id: int, pct: float, expense_type: str = "all") -> None:
+    def set_allocation_rule(
+        self,
+        property_id: int,
+        owner_id: int,
+        pct: float,
+        expense_type: str = "all",
+        effective_from: date | None = None,
+        effective_to: date | None = None,
+    ) -> None:
+        """Set an owner's allocation from a date onwards.
+
+        Without ``effective_from`` the rule applies from the beginning. The
+        version already in force on ``effective_from`` is cut short there,
+        and without ``effective_to`` the new one runs until the next version.
+        """
+        start = effective_from.isoformat() if effective_from else "0001-01-01"
+        key = {"property_id": property_id, "owner_id": owner_id, "expense_type": expense_type, "start": start}
+        self.conn.execute(
+            """UPDATE expense_allocation_rules SET effective_to = :start
+               WHERE property_id = :property_id AND owner_id = :owner_id AND expense_type = :expense_type
+                 AND effective_from < :start AND (effective_to IS NULL OR effective_to > :start)""",
+            key,
+        )
+        if effective_to is None:
+            end = self.conn.execute(
+                """SELECT MIN(effective_from) FROM expense_allocation_rules
+                   WHERE property_id = :property_id AND owner_id = :owner_id AND expense_type = :expense_type
+                     AND effective_from > :start""",
+                key,
+            ).fetchone()[0]
+        else:
+            end = effective_to.isoformat()
         self.conn.execute(
-            """INSERT INTO expense_allocation_rules (property_id, owner_id, allocation_pct, expense_type)
-               VALUES (?, ?, ?, ?)
-               ON CONFLICT(property_id, owner_id, expense_type) DO UPDATE SET allocation_pct = excluded.allocation_pct""",
-            (property_id, owner_id, pct, expense_type),
+            """INSERT INTO expense_allocation_rules
+                   (property_id, owner_id, allocation_pct, expense_type, effective_from, effective_to)
+               VALUES (:property_id, :owner_id, :pct, :expense_type, :start, :end)
+               ON CONFLICT(property_id, owner_id, expense_type, effective_from)
+               DO UPDATE SET allocation_pct = excluded.allocation_pct, effective_to = excluded.effective_to""",
+            {**key, "pct": pct, "end": end},
         )
+        mark_written(self.conn, "expense_allocation_rules")
         self.conn.commit()
 
 
@@ -433,6 +1011,7 @@ class ConversationRepo:
         cursor = self.conn.execute(
             "INSERT INTO ai_conversations (title) VALUES (?)", (title,)
         )
+        mark_written(self.conn, "ai_conversations")
         self.conn.commit()
         return cursor.lastrowid
 
@@ -445,6 +1024,7 @@ class ConversationRepo:
             "UPDATE ai_conversations SET updated_at = datetime('now') WHERE id = ?",
             (conversation_id,),
         )
+        mark_written(self.conn, "ai_messages", "ai_conversations")
         self.conn.commit()
         return cursor.lastrowid
 
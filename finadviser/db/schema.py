@@ -1,5 +1,87 @@
 """SQLite schema definition for finadviser."""
 
+# Checked once a journal has all the legs recorded in leg_count, so compound
+# journals with three or more legs can be inserted one row at a time.
+# Journals without a leg_count are checked from their second leg on.
+CHECK_JOURNAL_BALANCE_SQL = """
+CREATE TRIGGER IF NOT EXISTS check_journal_balance
+AFTER INSERT ON book_entries
+WHEN (
+    SELECT COUNT(*)
+    FROM book_entries
+    WHERE journal_entry_id = NEW.journal_entry_id
+) >= COALESCE((SELECT leg_count FROM journal_entries WHERE id = NEW.journal_entry_id), 2)
+BEGIN
+    SELECT CASE
+        WHEN (
+            SELECT ROUND(SUM(amount), 2)
+            FROM book_entries
+            WHERE journal_entry_id = NEW.journal_entry_id
+        ) != 0
+        THEN RAISE(ABORT, 'Journal entry book entries must sum to zero')
+    END;
+END;
+"""
+
+# Closure table for a self-referencing parent_id hierarchy: one row per
+# (ancestor, descendant) pair, including each node paired with itself at
+# depth 0, so subtree and ancestor lookups are a single indexed join.
+# Triggers keep it in step as rows are inserted, moved or deleted.
+CLOSURE_SQL = """
+CREATE TABLE IF NOT EXISTS {closure} (
+    ancestor_id INTEGER NOT NULL REFERENCES {table}(id) ON DELETE CASCADE,
+    descendant_id INTEGER NOT NULL REFERENCES {table}(id) ON DELETE CASCADE,
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_{closure}_descendant ON {closure}(descendant_id, ancestor_id);
+
+CREATE TRIGGER IF NOT EXISTS {closure}_insert
+AFTER INSERT ON {table}
+BEGIN
+    INSERT INTO {closure} (ancestor_id, descendant_id, depth)
+    SELECT ancestor_id, NEW.id, depth + 1 FROM {closure} WHERE descendant_id = NEW.parent_id
+    UNION ALL SELECT NEW.id, NEW.id, 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS {closure}_reject_cycle
+BEFORE UPDATE OF parent_id ON {table}
+WHEN NEW.parent_id IN (SELECT descendant_id FROM {closure} WHERE ancestor_id = NEW.id)
+BEGIN
+    SELECT RAISE(ABORT, 'Cannot move a {noun} under itself');
+END;
+
+CREATE TRIGGER IF NOT EXISTS {closure}_move
+AFTER UPDATE OF parent_id ON {table}
+WHEN OLD.parent_id IS NOT NEW.parent_id
+BEGIN
+    DELETE FROM {closure}
+    WHERE descendant_id IN (SELECT descendant_id FROM {closure} WHERE ancestor_id = NEW.id)
+      AND ancestor_id NOT IN (SELECT descendant_id FROM {closure} WHERE ancestor_id = NEW.id);
+    INSERT INTO {closure} (ancestor_id, descendant_id, depth)
+    SELECT up.ancestor_id, down.descendant_id, up.depth + down.depth + 1
+    FROM {closure} up, {closure} down
+    WHERE up.descendant_id = NEW.parent_id AND down.ancestor_id = NEW.id;
+END;
+"""
+
+# Rebuilds a closure table from parent_id with a recursive walk.
+CLOSURE_BACKFILL_SQL = """
+DELETE FROM {closure};
+INSERT INTO {closure} (ancestor_id, descendant_id, depth)
+WITH RECURSIVE walk (ancestor_id, descendant_id, depth) AS (
+    SELECT id, id, 0 FROM {table}
+    UNION ALL
+    SELECT walk.ancestor_id, t.id, walk.depth + 1
+    FROM walk JOIN {table} t ON t.parent_id = walk.descendant_id
+)
+SELECT ancestor_id, descendant_id, depth FROM walk;
+"""
+
+ACCOUNT_CLOSURE = {"table": "accounts", "closure": "account_closure", "noun": "account"}
+CATEGORY_CLOSURE = {"table": "categories", "closure": "category_closure", "noun": "category"}
+
 SCHEMA_SQL = """
 -- Chart of accounts
 CREATE TABLE IF NOT EXISTS accounts (
@@ -22,6 +104,8 @@ CREATE TABLE IF NOT EXISTS categories (
     UNIQUE(name, parent_id)
 );
 
+-- Account and category hierarchies
+""" + CLOSURE_SQL.format(**ACCOUNT_CLOSURE) + CLOSURE_SQL.format(**CATEGORY_CLOSURE) + """
 -- Pattern-based auto-categorization rules
 CREATE TABLE IF NOT EXISTS categorization_rules (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -123,6 +207,22 @@ CREATE TABLE IF NOT EXISTS mortgage_rate_history (
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
+-- Mortgage payments: links each payment's journals and its principal/interest split
+CREATE TABLE IF NOT EXISTS mortgage_payments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mortgage_id INTEGER NOT NULL REFERENCES mortgages(id),
+    payment_date TEXT NOT NULL,
+    journal_entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
+    capital_journal_id INTEGER REFERENCES journal_entries(id),
+    payer_owner_id INTEGER REFERENCES owners(id),
+    total_amount REAL NOT NULL,
+    principal_amount REAL NOT NULL,
+    interest_amount REAL NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_mortgage_payments_mortgage ON mortgage_payments(mortgage_id, payment_date);
+
 -- Property valuations
 CREATE TABLE IF NOT EXISTS property_valuations (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -133,6 +233,8 @@ CREATE TABLE IF NOT EXISTS property_valuations (
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
+CREATE INDEX IF NOT EXISTS idx_property_valuations_property ON property_valuations(property_id, valuation_date);
+
 -- Equity snapshots (optional performance cache)
 CREATE TABLE IF NOT EXISTS equity_snapshots (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -157,7 +259,12 @@ CREATE TABLE IF NOT EXISTS property_transfers (
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
--- Expense allocation rules (how property costs split between owners)
+CREATE INDEX IF NOT EXISTS idx_property_transfers_from ON property_transfers(from_property_id, transfer_date);
+CREATE INDEX IF NOT EXISTS idx_property_transfers_to ON property_transfers(to_property_id, transfer_date);
+CREATE INDEX IF NOT EXISTS idx_property_transfers_owner ON property_transfers(owner_id, transfer_date);
+
+-- Expense allocation rules (how property costs split between owners);
+-- migration 7 rebuilds this with effective dates
 CREATE TABLE IF NOT EXISTS expense_allocation_rules (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     property_id INTEGER NOT NULL REFERENCES properties(id),
@@ -185,6 +292,264 @@ CREATE TABLE IF NOT EXISTS ai_messages (
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
+-- Indexes
+
+CREATE INDEX IF NOT EXISTS idx_journal_entries_date ON journal_entries(date, id);
+CREATE INDEX IF NOT EXISTS idx_book_entries_journal ON book_entries(journal_entry_id);
+CREATE INDEX IF NOT EXISTS idx_book_entries_account ON book_entries(account_id);
+
+-- Full-text index over journal descriptions and references
+CREATE VIRTUAL TABLE IF NOT EXISTS journal_fts USING fts5(
+    description,
+    reference,
+    content='journal_entries',
+    content_rowid='id',
+    prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS journal_fts_insert
+AFTER INSERT ON journal_entries
+BEGIN
+    INSERT INTO journal_fts (rowid, description, reference)
+    VALUES (NEW.id, NEW.description, NEW.reference);
+END;
+
+CREATE TRIGGER IF NOT EXISTS journal_fts_delete
+AFTER DELETE ON journal_entries
+BEGIN
+    INSERT INTO journal_fts (journal_fts, rowid, description, reference)
+    VALUES ('delete', OLD.id, OLD.description, OLD.reference);
+END;
+
+CREATE TRIGGER IF NOT EXISTS journal_fts_update
+AFTER UPDATE OF description, reference ON journal_entries
+BEGIN
+    INSERT INTO journal_fts (journal_fts, rowid, description, reference)
+    VALUES ('delete', OLD.id, OLD.description, OLD.reference);
+    INSERT INTO journal_fts (rowid, description, reference)
+    VALUES (NEW.id, NEW.description, NEW.reference);
+END;
+
+-- Year-end closes; journals up to cutoff live in the archive database
+CREATE TABLE IF NOT EXISTS period_closes (
+    year INTEGER PRIMARY KEY,
+    cutoff TEXT NOT NULL,
+    archive_path TEXT NOT NULL,
+    journal_count INTEGER NOT NULL DEFAULT 0,
+    opening_journal_id INTEGER REFERENCES journal_entries(id) ON DELETE SET NULL,
+    closed_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Per-account closing balance for every day the account moved.
+-- The latest row on or before a date is the balance as of that date.
+CREATE TABLE IF NOT EXISTS account_daily_balances (
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    date TEXT NOT NULL,
+    balance REAL NOT NULL,
+    PRIMARY KEY (account_id, date)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS daily_balance_insert
+AFTER INSERT ON book_entries
+BEGIN
+    INSERT INTO account_daily_balances (account_id, date, balance)
+    SELECT NEW.account_id, je.date, COALESCE((
+        SELECT balance FROM account_daily_balances
+        WHERE account_id = NEW.account_id AND date < je.date
+        ORDER BY date DESC LIMIT 1
+    ), 0)
+    FROM journal_entries je WHERE je.id = NEW.journal_entry_id
+    ON CONFLICT (account_id, date) DO NOTHING;
+
+    UPDATE account_daily_balances SET balance = balance + NEW.amount
+    WHERE account_id = NEW.account_id
+      AND date >= (SELECT date FROM journal_entries WHERE id = NEW.journal_entry_id);
+END;
+
+-- Cascaded deletes are handled by daily_balance_journal_delete: once the
+-- journal row is gone the date lookup is NULL and this matches nothing.
+CREATE TRIGGER IF NOT EXISTS daily_balance_delete
+AFTER DELETE ON book_entries
+BEGIN
+    UPDATE account_daily_balances SET balance = balance - OLD.amount
+    WHERE account_id = OLD.account_id
+      AND date >= (SELECT date FROM journal_entries WHERE id = OLD.journal_entry_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_balance_update
+AFTER UPDATE OF amount, account_id, journal_entry_id ON book_entries
+BEGIN
+    UPDATE account_daily_balances SET balance = balance - OLD.amount
+    WHERE account_id = OLD.account_id
+      AND date >= (SELECT date FROM journal_entries WHERE id = OLD.journal_entry_id);
+
+    INSERT INTO account_daily_balances (account_id, date, balance)
+    SELECT NEW.account_id, je.date, COALESCE((
+        SELECT balance FROM account_daily_balances
+        WHERE account_id = NEW.account_id AND date < je.date
+        ORDER BY date DESC LIMIT 1
+    ), 0)
+    FROM journal_entries je WHERE je.id = NEW.journal_entry_id
+    ON CONFLICT (account_id, date) DO NOTHING;
+
+    UPDATE account_daily_balances SET balance = balance + NEW.amount
+    WHERE account_id = NEW.account_id
+      AND date >= (SELECT date FROM journal_entries WHERE id = NEW.journal_entry_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_balance_journal_delete
+BEFORE DELETE ON journal_entries
+BEGIN
+    UPDATE account_daily_balances SET balance = balance - (
+        SELECT COALESCE(SUM(amount), 0) FROM book_entries
+        WHERE journal_entry_id = OLD.id AND account_id = account_daily_balances.account_id
+    )
+    WHERE date >= OLD.date
+      AND account_id IN (SELECT account_id FROM book_entries WHERE journal_entry_id = OLD.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_balance_journal_redate
+AFTER UPDATE OF date ON journal_entries
+WHEN OLD.date <> NEW.date
+BEGIN
+    INSERT INTO account_daily_balances (account_id, date, balance)
+    SELECT DISTINCT be.account_id, NEW.date, COALESCE((
+        SELECT balance FROM account_daily_balances b
+        WHERE b.account_id = be.account_id AND b.date < NEW.date
+        ORDER BY b.date DESC LIMIT 1
+    ), 0)
+    FROM book_entries be WHERE be.journal_entry_id = NEW.id
+    ON CONFLICT (account_id, date) DO NOTHING;
+
+    UPDATE account_daily_balances SET balance = balance + (
+        SELECT COALESCE(SUM(amount), 0) FROM book_entries
+        WHERE journal_entry_id = NEW.id AND account_id = account_daily_balances.account_id
+    ) * ((date >= NEW.date) - (date >= OLD.date))
+    WHERE date >= MIN(OLD.date, NEW.date)
+      AND account_id IN (SELECT account_id FROM book_entries WHERE journal_entry_id = NEW.id);
+END;
+
+-- Count of in-place edits to ledger rows. LedgerCache compares it on each
+-- refresh, since an UPDATE changes neither the row count nor the max id.
+CREATE TABLE IF NOT EXISTS ledger_edits (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    edits INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO ledger_edits (id) VALUES (1);
+
+CREATE TRIGGER IF NOT EXISTS ledger_edit_book_entry
+AFTER UPDATE OF amount, account_id, journal_entry_id ON book_entries
+BEGIN
+    UPDATE ledger_edits SET edits = edits + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS ledger_edit_journal
+AFTER UPDATE OF date, category_id ON journal_entries
+BEGIN
+    UPDATE ledger_edits SET edits = edits + 1 WHERE id = 1;
+END;
+
+-- Accounts whose balances feed a property's equity: capital and mortgage
+CREATE VIEW IF NOT EXISTS v_property_accounts AS
+SELECT property_id, capital_account_id AS account_id FROM property_ownership
+UNION
+SELECT property_id, liability_account_id FROM mortgages;
+
+CREATE INDEX IF NOT EXISTS idx_property_ownership_capital ON property_ownership(capital_account_id);
+CREATE INDEX IF NOT EXISTS idx_mortgages_liability ON mortgages(liability_account_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_equity_snapshots_key
+    ON equity_snapshots(snapshot_date, property_id, owner_id);
+
+-- Equity snapshots dated on or after a change to a property's valuations,
+-- ownership, mortgages or capital/mortgage ledger legs are stale: drop them
+-- and let EquitySnapshots.refresh() record them again. A leg whose journal
+-- is already gone has no date, so the comparison with '' drops them all.
+CREATE TRIGGER IF NOT EXISTS equity_snapshot_valuation_insert
+AFTER INSERT ON property_valuations
+BEGIN
+    DELETE FROM equity_snapshots
+    WHERE property_id = NEW.property_id AND snapshot_date >= NEW.valuation_date;
+END;
+
+CREATE TRIGGER IF NOT EXISTS equity_snapshot_valuation_delete
+AFTER DELETE ON property_valuations
+BEGIN
+    DELETE FROM equity_snapshots
+    WHERE property_id = OLD.property_id AND snapshot_date >= OLD.valuation_date;
+END;
+
+CREATE TRIGGER IF NOT EXISTS equity_snapshot_valuation_update
+AFTER UPDATE ON property_valuations
+BEGIN
+    DELETE FROM equity_snapshots
+    WHERE property_id IN (OLD.property_id, NEW.property_id)
+      AND snapshot_date >= MIN(OLD.valuation_date, NEW.valuation_date);
+END;
+
+CREATE TRIGGER IF NOT EXISTS equity_snapshot_ownership_insert
+AFTER INSERT ON property_ownership
+BEGIN
+    DELETE FROM equity_snapshots WHERE property_id = NEW.property_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS equity_snapshot_ownership_delete
+AFTER DELETE ON property_ownership
+BEGIN
+    DELETE FROM equity_snapshots WHERE property_id = OLD.property_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS equity_snapshot_mortgage_insert
+AFTER INSERT ON mortgages
+BEGIN
+    DELETE FROM equity_snapshots WHERE property_id = NEW.property_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS equity_snapshot_entry_insert
+AFTER INSERT ON book_entries
+WHEN NEW.account_id IN (SELECT account_id FROM v_property_accounts)
+BEGIN
+    DELETE FROM equity_snapshots
+    WHERE property_id IN (SELECT property_id FROM v_property_accounts WHERE account_id = NEW.account_id)
+      AND snapshot_date >= COALESCE((SELECT date FROM journal_entries WHERE id = NEW.journal_entry_id), '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS equity_snapshot_entry_delete
+AFTER DELETE ON book_entries
+WHEN OLD.account_id IN (SELECT account_id FROM v_property_accounts)
+BEGIN
+    DELETE FROM equity_snapshots
+    WHERE property_id IN (SELECT property_id FROM v_property_accounts WHERE account_id = OLD.account_id)
+      AND snapshot_date >= COALESCE((SELECT date FROM journal_entries WHERE id = OLD.journal_entry_id), '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS equity_snapshot_entry_update
+AFTER UPDATE OF amount, account_id, journal_entry_id ON book_entries
+WHEN OLD.account_id IN (SELECT account_id FROM v_property_accounts)
+  OR NEW.account_id IN (SELECT account_id FROM v_property_accounts)
+BEGIN
+    DELETE FROM equity_snapshots
+    WHERE property_id IN (
+        SELECT property_id FROM v_property_accounts WHERE account_id IN (OLD.account_id, NEW.account_id)
+    )
+      AND snapshot_date >= COALESCE(MIN(
+        (SELECT date FROM journal_entries WHERE id = OLD.journal_entry_id),
+        (SELECT date FROM journal_entries WHERE id = NEW.journal_entry_id)
+      ), '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS equity_snapshot_journal_redate
+AFTER UPDATE OF date ON journal_entries
+WHEN OLD.date <> NEW.date
+BEGIN
+    DELETE FROM equity_snapshots
+    WHERE property_id IN (
+        SELECT pa.property_id FROM book_entries be
+        JOIN v_property_accounts pa ON pa.account_id = be.account_id
+        WHERE be.journal_entry_id = NEW.id
+    )
+      AND snapshot_date >= MIN(OLD.date, NEW.date);
+END;
+
 -- Views
 
 CREATE VIEW IF NOT EXISTS v_account_balances AS
@@ -197,6 +562,18 @@ FROM accounts a
 LEFT JOIN book_entries be ON be.account_id = a.id
 GROUP BY a.id, a.name, a.account_type;
 
+-- Balance of each account plus all of its descendants
+CREATE VIEW IF NOT EXISTS v_account_rollup_balances AS
+SELECT
+    a.id AS account_id,
+    a.name AS account_name,
+    a.account_type,
+    COALESCE(SUM(be.amount), 0) AS balance
+FROM accounts a
+JOIN account_closure ac ON ac.ancestor_id = a.id
+LEFT JOIN book_entries be ON be.account_id = ac.descendant_id
+GROUP BY a.id, a.name, a.account_type;
+
 CREATE VIEW IF NOT EXISTS v_property_equity AS
 SELECT
     p.id AS property_id,
@@ -226,22 +603,23 @@ GROUP BY month, c.name, a.account_type
 ORDER BY month DESC;
 
 -- Trigger: enforce balanced journal entries
-CREATE TRIGGER IF NOT EXISTS check_journal_balance
-AFTER INSERT ON book_entries
+""" + CHECK_JOURNAL_BALANCE_SQL + """
+-- Trigger: closed periods only accept their opening-balance journals
+CREATE TRIGGER IF NOT EXISTS reject_closed_period_entry
+BEFORE INSERT ON journal_entries
+WHEN NEW.date <= (SELECT MAX(cutoff) FROM period_closes)
+ AND COALESCE(NEW.reference, '') NOT LIKE 'opening-balance:%'
 BEGIN
-    SELECT CASE
-        WHEN (
-            SELECT ROUND(SUM(amount), 2)
-            FROM book_entries
-            WHERE journal_entry_id = NEW.journal_entry_id
-        ) != 0
-        AND (
-            SELECT COUNT(*)
-            FROM book_entries
-            WHERE journal_entry_id = NEW.journal_entry_id
-        ) >= 2
-        THEN RAISE(ABORT, 'Journal entry book entries must sum to zero')
-    END;
+    SELECT RAISE(ABORT, 'Cannot post into a closed period');
+END;
+
+CREATE TRIGGER IF NOT EXISTS reject_closed_period_redate
+BEFORE UPDATE OF date ON journal_entries
+WHEN NEW.date <> OLD.date
+ AND MIN(NEW.date, OLD.date) <= (SELECT MAX(cutoff) FROM period_closes)
+ AND COALESCE(NEW.reference, '') NOT LIKE 'opening-balance:%'
+BEGIN
+    SELECT RAISE(ABORT, 'Cannot move a journal into or out of a closed period');
 END;
 
 -- Default system accounts
@@ -265,3 +643,94 @@ INSERT OR IGNORE INTO categories (name, is_system) VALUES
     ('Transfer', 1),
     ('Uncategorized', 1);
 """
+
+# Data migrations applied once per database, tracked with PRAGMA user_version.
+# SCHEMA_SQL is idempotent and always runs first; these cover existing data.
+MIGRATIONS: list[str] = [
+    # 1: backfill the full-text index for journals created before it existed
+    "INSERT INTO journal_fts (journal_fts) VALUES ('rebuild');",
+    # 2: build daily balance checkpoints from cumulative sums of existing entries
+    """
+    DELETE FROM account_daily_balances;
+    INSERT INTO account_daily_balances (account_id, date, balance)
+    SELECT account_id, date, SUM(day_total) OVER (PARTITION BY account_id ORDER BY date)
+    FROM (
+        SELECT be.account_id, je.date, SUM(be.amount) AS day_total
+        FROM book_entries be
+        JOIN journal_entries je ON je.id = be.journal_entry_id
+        GROUP BY be.account_id, je.date
+    );
+    """,
+    # 3: expected leg count so multi-leg journals pass the balance check
+    """
+    ALTER TABLE journal_entries ADD COLUMN leg_count INTEGER;
+    DROP TRIGGER IF EXISTS check_journal_balance;
+    """ + CHECK_JOURNAL_BALANCE_SQL,
+    # 4: closure tables for rows that existed before the hierarchy triggers
+    CLOSURE_BACKFILL_SQL.format(**ACCOUNT_CLOSURE) + CLOSURE_BACKFILL_SQL.format(**CATEGORY_CLOSURE),
+    # 5: link payments recorded before mortgage_payments existed, matching the
+    # journals MortgageTracker.record_payment posts by lender and liability leg
+    """
+    INSERT INTO mortgage_payments (
+        mortgage_id, payment_date, journal_entry_id, capital_journal_id, payer_owner_id,
+        total_amount, principal_amount, interest_amount
+    )
+    WITH payments AS (
+        SELECT m.id AS mortgage_id, m.property_id, m.lender, je.date, je.id AS journal_id,
+               (SELECT SUM(amount) FROM book_entries
+                WHERE journal_entry_id = je.id AND account_id = m.liability_account_id) AS principal,
+               (SELECT SUM(be.amount) FROM book_entries be JOIN accounts a ON a.id = be.account_id
+                WHERE be.journal_entry_id = je.id AND a.name = 'Mortgage Interest') AS interest
+        FROM journal_entries je
+        JOIN mortgages m ON je.description = 'Mortgage payment - ' || m.lender
+    ),
+    numbered AS (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY mortgage_id, date ORDER BY journal_id) AS seq
+        FROM payments WHERE principal IS NOT NULL
+    ),
+    -- Each payment posted its capital journal straight after it, so the nth
+    -- payment to a lender on a day pairs with the nth capital journal
+    capital AS (
+        SELECT id, date, description,
+               ROW_NUMBER() OVER (PARTITION BY description, date ORDER BY id) AS seq
+        FROM journal_entries
+        WHERE description LIKE 'Capital contribution via mortgage principal - %'
+    )
+    SELECT p.mortgage_id, p.date, p.journal_id, c.id,
+           (SELECT po.owner_id FROM book_entries cb
+            JOIN property_ownership po ON po.capital_account_id = cb.account_id AND po.property_id = p.property_id
+            WHERE cb.journal_entry_id = c.id),
+           p.principal + COALESCE(p.interest, 0), p.principal, COALESCE(p.interest, 0)
+    FROM numbered p
+    LEFT JOIN capital c
+        ON c.description = 'Capital contribution via mortgage principal - ' || p.lender
+       AND c.date = p.date AND c.seq = p.seq
+    WHERE p.journal_id NOT IN (SELECT journal_entry_id FROM mortgage_payments)
+    ORDER BY p.date, p.journal_id;
+    """,
+    # 6: payee pattern used to match imported bank debits to a mortgage
+    "ALTER TABLE mortgages ADD COLUMN payee_pattern TEXT;",
+    # 7: effective-dated allocation rules; effective_to is exclusive and NULL
+    # means open-ended. The unique key gains effective_from, so rebuild the table.
+    """
+    CREATE TABLE expense_allocation_rules_dated (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        property_id INTEGER NOT NULL REFERENCES properties(id),
+        owner_id INTEGER NOT NULL REFERENCES owners(id),
+        allocation_pct REAL NOT NULL CHECK (allocation_pct >= 0 AND allocation_pct <= 100),
+        expense_type TEXT NOT NULL DEFAULT 'all',
+        effective_from TEXT NOT NULL DEFAULT '0001-01-01',
+        effective_to TEXT CHECK (effective_to IS NULL OR effective_to > effective_from),
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        UNIQUE(property_id, owner_id, expense_type, effective_from)
+    );
+    INSERT INTO expense_allocation_rules_dated (id, property_id, owner_id, allocation_pct, expense_type, created_at)
+    SELECT id, property_id, owner_id, allocation_pct, expense_type, created_at FROM expense_allocation_rules;
+    DROP TABLE expense_allocation_rules;
+    ALTER TABLE expense_allocation_rules_dated RENAME TO expense_allocation_rules;
+    CREATE INDEX idx_allocation_rules_lookup
+        ON expense_allocation_rules(property_id, expense_type, effective_from);
+    """,
+    # 8: house-price-index region used to revalue a property between surveys
+    "ALTER TABLE properties ADD COLUMN region TEXT;",
+]
@@ -0,0 +1,172 @@
+"""Streams the full ledger to CSV or NDJSON, optionally gzip-compressed."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import sqlite3
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from finadviser.db.archive import ARCHIVE_SCHEMA, OPENING_BALANCE_REFERENCE, is_attached
+
+FORMATS = ("csv", "ndjson")
+
+CSV_COLUMNS = [
+    "journal_id", "date", "description", "reference", "category",
+    "book_entry_id", "account", "account_type", "amount",
+]
+
+_CHUNK_SQL = """
+    SELECT je.id AS journal_id, je.date, je.description, je.reference,
+           c.name AS category, be.id AS book_entry_id,
+           a.name AS account, a.account_type, be.amount
+    FROM (
+        SELECT id, date, description, reference, category_id
+        FROM {schema}.journal_entries
+        WHERE (date, id) > (?, ?){exclude}
+        ORDER BY date, id
+        LIMIT ?
+    ) je
+    LEFT JOIN {schema}.book_entries be ON be.journal_entry_id = je.id
+    LEFT JOIN main.accounts a ON a.id = be.account_id
+    LEFT JOIN main.categories c ON c.id = je.category_id
+    ORDER BY je.date, je.id, be.id
+"""
+
+
+def detect_format(path: Path) -> tuple[str, bool]:
+    """Format and compression implied by a file name like ``ledger.csv.gz``."""
+    suffixes = [s.lower() for s in path.suffixes]
+    compress = bool(suffixes) and suffixes[-1] == ".gz"
+    if compress:
+        suffixes = suffixes[:-1]
+    ext = suffixes[-1] if suffixes else ""
+    if ext in (".ndjson", ".jsonl", ".json"):
+        return "ndjson", compress
+    return "csv", compress
+
+
+class LedgerExporter:
+    """Writes every journal with its book entries, in constant memory.
+
+    Journals are read oldest-first in keyset chunks on ``(date, id)``, so
+    each chunk is an index range scan and only one chunk is held at a time.
+    With the archive attached, archived years are written first, followed
+    by the live ledger without its opening-balance journals.
+
+    CSV has one row per book entry with the journal's fields repeated.
+    NDJSON has one object per journal with an ``entries`` list.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, chunk_size: int = 2000) -> None:
+        self.conn = conn
+        self.chunk_size = chunk_size
+
+    def iter_journals(self) -> Iterator[dict]:
+        """Yield each journal as a dict with its book entries under ``entries``."""
+        journal: dict | None = None
+        for row in self._iter_rows():
+            if journal is None or journal["id"] != row["journal_id"]:
+                if journal is not None:
+                    yield journal
+                journal = {
+                    "id": row["journal_id"],
+                    "date": row["date"],
+                    "description": row["description"],
+                    "reference": row["reference"],
+                    "category": row["category"],
+                    "entries": [],
+                }
+            # A journal with no legs still comes back once, so chunks stay full
+            if row["book_entry_id"] is None:
+                continue
+            journal["entries"].append({
+                "id": row["book_entry_id"],
+                "account": row["account"],
+                "account_type": row["account_type"],
+                "amount": round(row["amount"], 2),
+            })
+        if journal is not None:
+            yield journal
+
+    def _iter_rows(self) -> Iterator[sqlite3.Row]:
+        sources = [("main", True)]
+        if is_attached(self.conn):
+            sources.insert(0, (ARCHIVE_SCHEMA, False))
+
+        for schema, skip_opening in sources:
+            exclude = (
+                f" AND COALESCE(reference, '') NOT LIKE '{OPENING_BALANCE_REFERENCE}:%'"
+                if skip_opening and is_attached(self.conn)
+                else ""
+            )
+            sql = _CHUNK_SQL.format(schema=schema, exclude=exclude)
+            last = ("", 0)
+            while True:
+                cursor = self.conn.execute(sql, (*last, self.chunk_size))
+                journals = 0
+                for row in cursor:
+                    if row["journal_id"] != last[1]:
+                        journals += 1
+                        last = (row["date"], row["journal_id"])
+                    yield row
+                if journals < self.chunk_size:
+                    break
+
+    def export(
+        self,
+        path: Path,
+        fmt: str | None = None,
+        compress: bool | None = None,
+        progress: Callable[[int], None] | None = None,
+    ) -> int:
+        """Write the ledger to ``path``. Returns the number of journals.
+
+        ``fmt`` and ``compress`` default to what the file name implies.
+        ``progress`` is called with the running journal count after each
+        chunk's worth of journals.
+        """
+        detected_fmt, detected_compress = detect_format(path)
+        fmt = fmt or detected_fmt
+        compress = detected_compress if compress is None else compress
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        raw = gzip.open(path, "wb") if compress else open(path, "wb")
+        count = 0
+        with raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as out:
+            writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS) if fmt == "csv" else None
+            if writer:
+                writer.writeheader()
+            for journal in self.iter_journals():
+                if writer:
+                    head = {
+                        "journal_id": journal["id"],
+                        "date": journal["date"],
+                        "description": journal["description"],
+                        "reference": journal["reference"] or "",
+                        "category": journal["category"] or "",
+                    }
+                    writer.writerows(
+                        {
+                            **head,
+                            "book_entry_id": e["id"],
+                            "account": e["account"],
+                            "account_type": e["account_type"],
+                            "amount": f"{e['amount']:.2f}",
+                        }
+                        for e in journal["entries"]
+                    )
+                else:
+                    out.write(json.dumps(journal, separators=(",", ":"), ensure_ascii=False))
+                    out.write("\n")
+                count += 1
+                if progress and count % self.chunk_size == 0:
+                    progress(count)
+        if progress:
+            progress(count)
+        return count
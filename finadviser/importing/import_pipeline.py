@@ -7,6 +7,7 @@ from decimal import Decimal
 from pathlib import Path
 
 from finadviser.config import AppConfig
+from finadviser.db.connection import unit_of_work
 from finadviser.db.models import (
     AccountType,
     BookEntry,
@@ -16,6 +17,7 @@ from finadviser.db.models import (
     RawTransaction,
     TransactionFingerprint,
 )
+from finadviser.db.period_close import PeriodCloser
 from finadviser.db.repositories import (
     AccountRepo,
     FingerprintRepo,
@@ -48,62 +50,68 @@ class ImportPipeline:
         account_name: str,
     ) -> ImportResult:
         """Run the full import pipeline."""
-        # Resolve bank config
-        configs = get_all_configs(self.config.bank_configs_dir)
-        if bank_config_name not in configs:
-            raise ValueError(f"Unknown bank config: {bank_config_name}. Available: {list(configs.keys())}")
-        bank_config = configs[bank_config_name]
+        with unit_of_work(self.conn):
+            # Resolve bank config
+            configs = get_all_configs(self.config.bank_configs_dir)
+            if bank_config_name not in configs:
+                raise ValueError(f"Unknown bank config: {bank_config_name}. Available: {list(configs.keys())}")
+            bank_config = configs[bank_config_name]
 
-        # Resolve or create account
-        account = self.account_repo.get_or_create(account_name, AccountType.ASSET)
+            # Resolve or create account
+            account = self.account_repo.get_or_create(account_name, AccountType.ASSET)
 
-        # Step 1: Parse CSV
-        transactions = parse_csv(csv_path, bank_config)
+            # Step 1: Parse CSV
+            transactions = parse_csv(csv_path, bank_config)
 
-        # Step 2: Deduplicate
-        transactions = self.dedup.check(transactions, account.id)
+            # Step 2: Deduplicate
+            transactions = self.dedup.check(transactions, account.id)
 
-        # Step 3: Categorize
-        transactions = self.categorizer.categorize(transactions)
+            # Step 3: Categorize
+            transactions = self.categorizer.categorize(transactions)
 
-        # Step 4: Create import batch
-        batch = ImportBatch(
-            filename=csv_path.name,
-            bank_config=bank_config_name,
-            account_id=account.id,
-            row_count=len(transactions),
-        )
-        batch_id = self.batch_repo.create(batch)
-
-        # Step 5: Create journal entries (all in one DB transaction)
-        imported = 0
-        duplicates = 0
-
-        for txn in transactions:
-            if txn.is_duplicate:
-                duplicates += 1
-                continue
-
-            journal_id = self._create_journal_entry(txn, account.id, batch_id)
-
-            # Record fingerprint for future dedup
-            self.fp_repo.create(TransactionFingerprint(
-                fingerprint=txn.fingerprint,
+            # Step 4: Create import batch
+            batch = ImportBatch(
+                filename=csv_path.name,
+                bank_config=bank_config_name,
                 account_id=account.id,
-                journal_entry_id=journal_id,
-            ))
-            imported += 1
-
-        # Update batch counts
-        self.batch_repo.update_counts(batch_id, imported, duplicates)
-        self.conn.commit()
-
-        return ImportResult(
-            batch_id=batch_id,
-            imported_count=imported,
-            duplicate_count=duplicates,
-            total_count=len(transactions),
-        )
+                row_count=len(transactions),
+            )
+            batch_id = self.batch_repo.create(batch)
+
+            # Step 5: Create journal entries (all in one DB transaction)
+            imported = 0
+            duplicates = 0
+            errors = []
+            closed_through = PeriodCloser(self.conn).closed_through()
+
+            for txn in transactions:
+                if txn.is_duplicate:
+                    duplicates += 1
+                    continue
+                if closed_through and txn.date.isoformat() <= closed_through:
+                    errors.append(f"{txn.date} {txn.description}: in a period closed through {closed_through}")
+                    continue
+
+                journal_id = self._create_journal_entry(txn, account.id, batch_id)
+
+                # Record fingerprint for future dedup
+                self.fp_repo.create(TransactionFingerprint(
+                    fingerprint=txn.fingerprint,
+                    account_id=account.id,
+                    journal_entry_id=journal_id,
+                ))
+                imported += 1
+
+            # Update batch counts
+            self.batch_repo.update_counts(batch_id, imported, duplicates)
+
+            return ImportResult(
+                batch_id=batch_id,
+                imported_count=imported,
+                duplicate_count=duplicates,
+                total_count=len(transactions),
+                errors=errors,
+            )
 
     def preview(
         self,
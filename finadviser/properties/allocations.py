@@ -0,0 +1,56 @@
+"""Interval lookup of owner allocation splits from effective-dated rules."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+
+BEGINNING = "0001-01-01"
+
+
+class AllocationIndex:
+    """Resolves a property's owner split for any expense type and date.
+
+    The rules' effective dates cut the timeline into segments over which the
+    rules in force do not change. Each segment's split is worked out once per
+    expense type, so a lookup is a bisect over the segment starts. Rules for
+    the expense type itself take precedence over ``"all"`` rules; with
+    neither in force the split is equal between owners.
+    """
+
+    def __init__(self, owner_ids: list[int], rules: list[dict]) -> None:
+        if not owner_ids:
+            raise ValueError("An allocation index needs at least one owner")
+        self.owner_ids = owner_ids
+        self._rules: dict[str, list[dict]] = defaultdict(list)
+        for rule in rules:
+            self._rules[rule["expense_type"]].append(rule)
+        self._segments: dict[str, tuple[list[str], list[dict[int, float]]]] = {}
+
+    def split(self, expense_type: str, on: date) -> dict[int, float]:
+        """Allocation percentage per owner for an expense type on a date."""
+        segments = self._segments.get(expense_type)
+        if segments is None:
+            segments = self._segments[expense_type] = self._build(expense_type)
+        starts, splits = segments
+        return splits[bisect_right(starts, on.isoformat()) - 1]
+
+    def _build(self, expense_type: str) -> tuple[list[str], list[dict[int, float]]]:
+        specific = self._rules.get(expense_type, []) if expense_type != "all" else []
+        general = self._rules.get("all", [])
+        starts = sorted(
+            {BEGINNING}
+            | {r["effective_from"] for r in specific + general}
+            | {r["effective_to"] for r in specific + general if r["effective_to"]}
+        )
+        equal = {owner_id: 100.0 / len(self.owner_ids) for owner_id in self.owner_ids}
+
+        def in_force(rules: list[dict], day: str) -> dict[int, float]:
+            return {
+                r["owner_id"]: r["allocation_pct"]
+                for r in rules
+                if r["effective_from"] <= day and (r["effective_to"] is None or day < r["effective_to"])
+            }
+
+        return starts, [in_force(specific, day) or in_force(general, day) or equal for day in starts]
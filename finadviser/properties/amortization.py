@@ -0,0 +1,239 @@
+"""Mortgage amortization schedules, computed for every mortgage in one batch."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+
+from finadviser.db.ledger_cache import LedgerCache
+
+
+def payment_dates(start: date, months: int) -> np.ndarray:
+    """Monthly instalment dates after ``start`` on the same day of the month.
+
+    Days past the end of a shorter month fall on its last day.
+    """
+    first = np.datetime64(start, "M") + 1
+    month_starts = np.arange(first, first + months).astype("datetime64[D]")
+    month_lengths = ((np.arange(first, first + months) + 1).astype("datetime64[D]") - month_starts).astype(int)
+    return month_starts + np.minimum(start.day, month_lengths) - 1
+
+
+def remaining_months(mortgage: dict, as_of: date) -> int:
+    """Instalments left on a mortgage after ``as_of``, at least one."""
+    start = date.fromisoformat(mortgage["start_date"])
+    elapsed = (as_of.year - start.year) * 12 + as_of.month - start.month - (as_of.day < start.day)
+    return max(mortgage["term_months"] - elapsed, 1)
+
+
+def annuity(balance: np.ndarray, rate: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """Level monthly payment repaying ``balance`` over ``months`` at monthly ``rate``."""
+    months = np.maximum(months, 1)
+    growth = np.power(1 + rate, months)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(rate > 0, balance * rate * growth / (growth - 1), balance / months)
+    return np.round(payment, 2)
+
+
+_COLUMNS = ("payment", "interest", "principal", "overpayment", "balance")
+
+
+def amortize(
+    balance: np.ndarray, rates: np.ndarray, terms: np.ndarray, extra: np.ndarray | None = None,
+) -> dict[str, np.ndarray]:
+    """Step loans forward together, one instalment per column of ``rates``.
+
+    ``rates`` holds the annual percentage for each loan (row) and instalment;
+    ``terms`` is each loan's total number of instalments. The payment is
+    re-levelled over the remaining term at the start and whenever the rate
+    changes, and the final instalment clears the balance. ``extra`` adds
+    overpayments. Returns ``(loans, instalments)`` arrays for each of
+    ``payment``, ``interest``, ``principal``, ``overpayment`` and the
+    closing ``balance``, plus ``live`` marking instalments still owed.
+    """
+    count, horizon = rates.shape
+    balance = balance.astype(float)
+    extra = np.zeros(rates.shape) if extra is None else extra
+    payment = np.zeros(count)
+    columns = {name: np.zeros((count, horizon)) for name in _COLUMNS}
+    live = np.zeros((count, horizon), dtype=bool)
+
+    for k in range(horizon):
+        active = (k < terms) & (balance > 0.005)
+        if not active.any():
+            break
+        monthly = rates[:, k] / 1200
+        relevel = active & ((k == 0) | (rates[:, k] != rates[:, k - 1]))
+        payment = np.where(relevel, annuity(balance, monthly, terms - k), payment)
+
+        interest = np.where(active, np.round(balance * monthly, 2), 0.0)
+        last = active & (k == terms - 1)
+        principal = np.where(active, np.minimum(np.where(last, balance, payment - interest), balance), 0.0)
+        over = np.where(active, np.minimum(extra[:, k], balance - principal), 0.0)
+        balance = np.round(balance - principal - over, 2)
+
+        live[:, k] = active
+        columns["payment"][:, k] = principal + interest
+        columns["interest"][:, k] = interest
+        columns["principal"][:, k] = principal
+        columns["overpayment"][:, k] = over
+        columns["balance"][:, k] = balance
+    columns["live"] = live
+    return columns
+
+
+class AmortizationSchedule:
+    """One mortgage's schedule: aligned arrays, one entry per instalment.
+
+    ``rate`` is the annual percentage in force; ``payment``, ``interest``,
+    ``principal`` and ``overpayment`` are amounts for the instalment and
+    ``balance`` is the closing balance after it.
+    """
+
+    def __init__(self, mortgage: dict, dates, rate, payment, interest, principal, overpayment, balance) -> None:
+        self.mortgage_id: int = mortgage["id"]
+        self.lender: str = mortgage["lender"]
+        self.liability_account_id: int = mortgage["liability_account_id"]
+        self.dates = dates
+        self.rate = rate
+        self.payment = payment
+        self.interest = interest
+        self.principal = principal
+        self.overpayment = overpayment
+        self.balance = balance
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def payoff_date(self) -> date | None:
+        return self.dates[-1].item() if len(self) else None
+
+    @property
+    def total_interest(self) -> Decimal:
+        return Decimal(str(round(float(self.interest.sum()), 2)))
+
+    def instalment(self, payment_date: date) -> int:
+        """Index of the scheduled instalment nearest to a payment date."""
+        if not len(self):
+            raise ValueError(f"Mortgage {self.mortgage_id} has no scheduled instalments")
+        gaps = np.abs(self.dates - np.datetime64(payment_date, "D")).astype(int)
+        return int(np.argmin(gaps))
+
+    def expected_split(self, payment_date: date) -> tuple[Decimal, Decimal]:
+        """Scheduled ``(principal, interest)`` for the instalment nearest a date."""
+        i = self.instalment(payment_date)
+        return (
+            Decimal(str(round(float(self.principal[i]), 2))),
+            Decimal(str(round(float(self.interest[i]), 2))),
+        )
+
+    def balance_at(self, when: date) -> Decimal:
+        """Scheduled outstanding balance at the end of a day."""
+        if not len(self):
+            return Decimal("0")
+        i = int(np.searchsorted(self.dates, np.datetime64(when, "D"), side="right")) - 1
+        if i < 0:
+            return Decimal(str(round(float(self.balance[0] + self.principal[0] + self.overpayment[0]), 2)))
+        return Decimal(str(round(float(self.balance[i]), 2)))
+
+
+class AmortizationEngine:
+    """Builds schedules for all mortgages from ``mortgages`` and ``mortgage_rate_history``.
+
+    Every mortgage steps forward one month at a time together, as columns of
+    NumPy arrays. The payment is re-levelled over the remaining term at the
+    start and whenever the rate changes; overpayments shorten the term.
+    Before the first recorded rate the earliest rate applies. A mortgage
+    with no recorded rate has no schedule rather than a 0% one.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def schedules(
+        self,
+        mortgage_ids: list[int] | None = None,
+        overpayments: dict[int, list[tuple[date, Decimal]]] | None = None,
+    ) -> dict[int, AmortizationSchedule]:
+        """Schedules keyed by mortgage id, for the given mortgages or all of them.
+
+        Mortgages without any ``mortgage_rate_history`` row are left out.
+        """
+        rated = {r[0] for r in self.conn.execute("SELECT DISTINCT mortgage_id FROM mortgage_rate_history")}
+        mortgages = [dict(r) for r in self.conn.execute("SELECT * FROM mortgages ORDER BY id") if r["id"] in rated]
+        if mortgage_ids is not None:
+            wanted = set(mortgage_ids)
+            mortgages = [m for m in mortgages if m["id"] in wanted]
+        if not mortgages:
+            return {}
+
+        horizon = max(m["term_months"] for m in mortgages)
+        terms = np.array([m["term_months"] for m in mortgages])
+        dates = np.stack([payment_dates(date.fromisoformat(m["start_date"]), horizon) for m in mortgages])
+        rates = self._rates(mortgages, dates)
+        extra = self._overpayments(mortgages, dates, overpayments or {})
+
+        balance = np.array([m["original_amount"] for m in mortgages], dtype=float)
+        columns = amortize(balance, rates, terms, extra)
+        live = columns.pop("live")
+
+        result = {}
+        for i, mortgage in enumerate(mortgages):
+            n = int(live[i].sum())
+            result[mortgage["id"]] = AmortizationSchedule(
+                mortgage, dates[i, :n], rates[i, :n], *(columns[name][i, :n] for name in _COLUMNS),
+            )
+        return result
+
+    def _rates(self, mortgages: list[dict], dates: np.ndarray) -> np.ndarray:
+        """Annual rate in force for each instalment period, as a step function."""
+        history: dict[int, list] = defaultdict(list)
+        for r in self.conn.execute("SELECT mortgage_id, rate, effective_date FROM mortgage_rate_history ORDER BY effective_date, id"):
+            history[r["mortgage_id"]].append((r["effective_date"], r["rate"]))
+
+        rates = np.zeros(dates.shape)
+        for i, mortgage in enumerate(mortgages):
+            points = history[mortgage["id"]]
+            when = np.array([p[0] for p in points], dtype="datetime64[D]")
+            values = np.array([p[1] for p in points], dtype=float)
+            # Interest for an instalment accrues over the month before it
+            period_start = np.concatenate([[np.datetime64(mortgage["start_date"], "D")], dates[i, :-1]])
+            idx = np.searchsorted(when, period_start, side="right") - 1
+            rates[i] = values[idx.clip(0)]
+        return rates
+
+    @staticmethod
+    def _overpayments(mortgages: list[dict], dates: np.ndarray, overpayments: dict) -> np.ndarray:
+        """Overpayments bucketed into the first instalment on or after their date."""
+        extra = np.zeros(dates.shape)
+        for i, mortgage in enumerate(mortgages):
+            for when, amount in overpayments.get(mortgage["id"], ()):
+                k = int(np.searchsorted(dates[i], np.datetime64(when, "D")))
+                if k < dates.shape[1]:
+                    extra[i, k] += float(amount)
+        return extra
+
+    def variance(self, schedules: dict[int, AmortizationSchedule], as_of: date | None = None) -> dict[int, dict]:
+        """Actual liability balance against the schedule at each past instalment.
+
+        Returns ``{mortgage_id: {"dates", "scheduled", "actual", "variance"}}``;
+        a positive variance means more is owed than scheduled.
+        """
+        cache = LedgerCache.for_connection(self.conn)
+        cache.refresh()
+        cutoff = np.datetime64(as_of or date.today(), "D")
+        result = {}
+        for mortgage_id, schedule in schedules.items():
+            past = schedule.dates <= cutoff
+            dates = schedule.dates[past]
+            actual = np.abs(cache.balances_at([schedule.liability_account_id], dates)[0]) / 100
+            scheduled = schedule.balance[past]
+            result[mortgage_id] = {
+                "dates": dates, "scheduled": scheduled, "actual": actual, "variance": actual - scheduled,
+            }
+        return result
@@ -6,6 +6,7 @@ import sqlite3
 from decimal import Decimal
 
 from finadviser.db.repositories import AccountRepo, PropertyRepo
+from finadviser.properties.portfolio import PortfolioEquity, split_equity
 
 
 class EquityCalculator:
@@ -50,45 +51,21 @@ class EquityCalculator:
         net_equity = market_value - total_mortgage_balance
 
         # Calculate each owner's capital balance
-        owner_data = []
-        total_capital = Decimal("0")
-
-        for own in ownership:
-            capital_balance = self.account_repo.get_balance(own["capital_account_id"])
-            total_capital += capital_balance
-            owner_data.append({
+        owners = [
+            {
                 "owner_id": own["owner_id"],
                 "name": own["owner_name"],
                 "capital_account_id": own["capital_account_id"],
-                "capital_balance": capital_balance,
-            })
-
-        # Calculate percentages and market equity
-        for owner in owner_data:
-            if total_capital > 0:
-                pct = float(owner["capital_balance"] / total_capital * 100)
-            else:
-                # Equal split if no capital recorded
-                pct = 100.0 / len(owner_data)
-
-            owner["equity_pct"] = pct
-            owner["equity_amount"] = net_equity * Decimal(str(pct)) / Decimal("100")
-
-        return owner_data
+                "capital_balance": self.account_repo.get_balance(own["capital_account_id"]),
+            }
+            for own in ownership
+        ]
+        return split_equity(owners, net_equity)
 
     def calculate_all(self) -> dict[int, list[dict]]:
         """Calculate equity for all properties. Returns {property_id: [owner_equity]}."""
-        result = {}
-        for prop in self.prop_repo.list_properties():
-            result[prop["id"]] = self.calculate(prop["id"])
-        return result
+        return PortfolioEquity(self.conn).calculate_all()
 
     def get_owner_total_equity(self, owner_id: int) -> Decimal:
         """Total equity across all properties for one owner."""
-        total = Decimal("0")
-        for prop in self.prop_repo.list_properties():
-            equity_data = self.calculate(prop["id"])
-            for e in equity_data:
-                if e["owner_id"] == owner_id:
-                    total += e["equity_amount"]
-        return total
+        return PortfolioEquity(self.conn).owner_totals().get(owner_id, Decimal("0"))
@@ -0,0 +1,145 @@
+"""Equity and net-worth time series, vectorized over every date at once."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+
+from finadviser.db.ledger_cache import LedgerCache
+from finadviser.db.models import AccountType
+from finadviser.db.repositories import LATEST_VALUATION_ORDER
+
+FREQUENCIES = ("daily", "monthly")
+
+
+def series_dates(start: date, end: date, frequency: str = "monthly") -> np.ndarray:
+    """Every day, or every month end, from ``start`` to ``end`` as ``datetime64[D]``."""
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency {frequency!r}; expected one of {', '.join(FREQUENCIES)}")
+    first, last = np.datetime64(start, "D"), np.datetime64(end, "D")
+    if frequency == "daily":
+        return np.arange(first, last + 1)
+    months = np.arange(first.astype("datetime64[M]"), last.astype("datetime64[M]") + 1)
+    month_ends = (months + 1).astype("datetime64[D]") - 1
+    return month_ends[(month_ends >= first) & (month_ends <= last)]
+
+
+class EquitySeries:
+    """Aligned arrays over ``dates``; all amounts in currency units.
+
+    ``properties`` maps property id to ``name``, ``valuation``, ``mortgage``
+    and ``net_equity``. ``owners`` maps ``(property_id, owner_id)`` to
+    ``name``, ``capital``, ``pct`` and ``equity``. ``owner_totals`` sums each
+    owner's equity across properties. ``net_worth`` is ledger assets less
+    liabilities plus property valuations.
+    """
+
+    def __init__(self, dates: np.ndarray) -> None:
+        self.dates = dates
+        self.properties: dict[int, dict] = {}
+        self.owners: dict[tuple[int, int], dict] = {}
+        self.owner_totals: dict[int, np.ndarray] = {}
+        zeros = np.zeros(len(dates))
+        self.assets = zeros
+        self.liabilities = zeros
+        self.property_value = zeros
+        self.net_worth = zeros
+
+
+class EquitySeriesEngine:
+    """Builds ``EquitySeries`` from the ledger cache and property tables.
+
+    Valuations are a step function over ``property_valuations``; capital,
+    mortgage and account balances come from ``LedgerCache.balances_at``.
+    Each figure matches ``PortfolioEquity`` and ``AccountRepo.get_balance``
+    as of the same day, but the whole range is computed in one pass.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.ledger = LedgerCache.for_connection(conn)
+
+    def compute(self, start: date, end: date, frequency: str = "monthly") -> EquitySeries:
+        """Series for every property, owner and the household from ``start`` to ``end``."""
+        dates = series_dates(start, end, frequency)
+        series = EquitySeries(dates)
+        self.ledger.refresh()
+
+        accounts = self.conn.execute("SELECT id, account_type FROM accounts ORDER BY id").fetchall()
+        account_ids = [r["id"] for r in accounts]
+        row_of = {account_id: i for i, account_id in enumerate(account_ids)}
+        balances = self.ledger.balances_at(account_ids, dates) / 100
+
+        types = np.array([r["account_type"] for r in accounts])
+        series.assets = balances[types == AccountType.ASSET.value].sum(axis=0)
+        series.liabilities = np.abs(balances[types == AccountType.LIABILITY.value]).sum(axis=0)
+
+        valuations = self._valuations(dates)
+        mortgages: dict[int, set[int]] = defaultdict(set)
+        for r in self.conn.execute("SELECT property_id, liability_account_id FROM mortgages"):
+            mortgages[r["property_id"]].add(r["liability_account_id"])
+        ownership: dict[int, list] = defaultdict(list)
+        for r in self.conn.execute(
+            """SELECT po.property_id, po.owner_id, o.name, po.capital_account_id
+               FROM property_ownership po JOIN owners o ON o.id = po.owner_id
+               ORDER BY po.property_id, po.owner_id"""
+        ):
+            ownership[r["property_id"]].append(r)
+
+        totals: dict[int, np.ndarray] = defaultdict(lambda: np.zeros(len(dates)))
+        for prop in self.conn.execute("SELECT id, name FROM properties ORDER BY name"):
+            pid = prop["id"]
+            valuation = valuations.get(pid, np.zeros(len(dates)))
+            liability_rows = [row_of[a] for a in mortgages.get(pid, ())]
+            mortgage = np.abs(balances[liability_rows]).sum(axis=0)
+            net_equity = valuation - mortgage
+            series.properties[pid] = {
+                "name": prop["name"], "valuation": valuation, "mortgage": mortgage, "net_equity": net_equity,
+            }
+
+            owners = ownership.get(pid)
+            if not owners:
+                continue
+            capital = balances[[row_of[o["capital_account_id"]] for o in owners]]
+            total_capital = capital.sum(axis=0)
+            # Equal split on dates with no capital recorded
+            pct = np.where(
+                total_capital > 0,
+                capital / np.where(total_capital > 0, total_capital, 1) * 100,
+                100 / len(owners),
+            )
+            equity = net_equity * pct / 100
+            for i, owner in enumerate(owners):
+                series.owners[(pid, owner["owner_id"])] = {
+                    "name": owner["name"], "capital": capital[i], "pct": pct[i], "equity": equity[i],
+                }
+                totals[owner["owner_id"]] += equity[i]
+
+        series.owner_totals = dict(totals)
+        series.property_value = sum((p["valuation"] for p in series.properties.values()), np.zeros(len(dates)))
+        series.net_worth = series.assets - series.liabilities + series.property_value
+        return series
+
+    def _valuations(self, dates: np.ndarray) -> dict[int, np.ndarray]:
+        """Latest valuation on or before each date, per property (0 before the first)."""
+        rows = self.conn.execute(
+            f"""SELECT property_id, valuation_date, valuation FROM property_valuations
+                ORDER BY property_id, {LATEST_VALUATION_ORDER}"""
+        ).fetchall()
+        # Of several valuations on one date keep the first in LATEST_VALUATION_ORDER,
+        # the one get_latest_valuation and PortfolioEquity pick
+        grouped: dict[int, dict[str, float]] = defaultdict(dict)
+        for r in rows:
+            grouped[r["property_id"]].setdefault(r["valuation_date"], r["valuation"])
+
+        result = {}
+        for pid, by_date in grouped.items():
+            points = sorted(by_date.items())
+            when = np.array([p[0] for p in points], dtype="datetime64[D]")
+            values = np.array([p[1] for p in points], dtype=float)
+            idx = np.searchsorted(when, dates, side="right") - 1
+            result[pid] = np.where(idx >= 0, values[idx.clip(0)], 0.0)
+        return result
@@ -2,12 +2,23 @@
 
 from __future__ import annotations
 
+import re
 import sqlite3
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
 
-from finadviser.db.models import AccountType, BookEntry, JournalEntry
+from finadviser.db.connection import unit_of_work
+from finadviser.db.models import AccountType, BookEntry, JournalEntry, MortgagePayment
 from finadviser.db.repositories import AccountRepo, JournalRepo, PropertyRepo
+from finadviser.properties.amortization import AmortizationEngine
+
+
+def payee_regex(mortgage: dict) -> re.Pattern:
+    """The mortgage's ``payee_pattern``, or its lender name, as a case-insensitive regex."""
+    try:
+        return re.compile(mortgage["payee_pattern"] or re.escape(mortgage["lender"]), re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Mortgage {mortgage['lender']!r} has an invalid payee pattern: {e}") from e
 
 
 class MortgageTracker:
@@ -28,13 +39,16 @@ class MortgageTracker:
         mortgage_id: int,
         payment_date: date,
         total_amount: Decimal,
-        principal_amount: Decimal,
-        interest_amount: Decimal,
+        principal_amount: Decimal | None,
+        interest_amount: Decimal | None,
         payer_owner_id: int,
         from_account_id: int,
     ) -> int:
         """Record a mortgage payment with principal/interest split.
 
+        Pass None for both amounts to take the interest from the
+        amortization schedule and treat the rest of the payment as principal.
+
         Creates balanced journal entries:
         - Credit from_account (bank) by total
         - Debit mortgage liability by principal (reduces debt)
@@ -57,49 +71,220 @@ class MortgageTracker:
         For the capital account tracking (separate from the main entry):
         We need to record that the payer contributed principal to the property.
         """
-        mortgages = self.prop_repo.get_mortgages(0)  # need to get mortgage by id
-        mortgage_row = self.conn.execute(
-            "SELECT * FROM mortgages WHERE id = ?", (mortgage_id,)
-        ).fetchone()
-        if not mortgage_row:
-            raise ValueError(f"Mortgage {mortgage_id} not found")
-
-        liability_account_id = mortgage_row["liability_account_id"]
-
-        # Get payer's capital account for this property
-        ownership = self.prop_repo.get_ownership(mortgage_row["property_id"])
-        payer_capital_account_id = None
-        for own in ownership:
-            if own["owner_id"] == payer_owner_id:
-                payer_capital_account_id = own["capital_account_id"]
-                break
+        with unit_of_work(self.conn):
+            mortgage_row = self.conn.execute(
+                "SELECT * FROM mortgages WHERE id = ?", (mortgage_id,)
+            ).fetchone()
+            if not mortgage_row:
+                raise ValueError(f"Mortgage {mortgage_id} not found")
 
-        if payer_capital_account_id is None:
-            raise ValueError(f"Owner {payer_owner_id} does not own property {mortgage_row['property_id']}")
+            liability_account_id = mortgage_row["liability_account_id"]
 
-        # Get or create interest expense account
-        interest_account = self.account_repo.get_or_create(
-            "Mortgage Interest", AccountType.EXPENSE
-        )
+            if principal_amount is None and interest_amount is None:
+                schedule = AmortizationEngine(self.conn).schedules([mortgage_id]).get(mortgage_id)
+                if schedule is None:
+                    raise ValueError(
+                        f"Mortgage {mortgage_id} ({mortgage_row['lender']}) has no recorded interest rate; "
+                        "give the principal and interest amounts"
+                    )
+                _, interest_amount = schedule.expected_split(payment_date)
+                interest_amount = min(interest_amount, total_amount)
+                principal_amount = total_amount - interest_amount
+            elif principal_amount is None or interest_amount is None:
+                raise ValueError("Give both principal and interest amounts, or neither")
 
-        # Create journal entry for the mortgage payment
-        # Entries must sum to zero:
-        # from_account (bank): -total (money out)
-        # liability: +principal (debt reduced - for liability accounts, positive = reduction)
-        # interest expense: +interest (expense incurred)
-        # These sum to: -total + principal + interest = 0 (since total = principal + interest)
+            _, payer_capital_account_id = self._payer(mortgage_row["property_id"], payer_owner_id)
+            interest_account = self.account_repo.get_or_create("Mortgage Interest", AccountType.EXPENSE)
 
-        journal = JournalEntry(
-            date=payment_date,
-            description=f"Mortgage payment - {mortgage_row['lender']}",
-        )
-        entries = [
-            BookEntry(journal_entry_id=0, account_id=from_account_id, amount=-total_amount),
-            BookEntry(journal_entry_id=0, account_id=liability_account_id, amount=principal_amount),
-            BookEntry(journal_entry_id=0, account_id=interest_account.id, amount=interest_amount),
-        ]
-        journal_id = self.journal_repo.create_entry(journal, entries)
+            # Entries must sum to zero:
+            # from_account (bank): -total (money out)
+            # liability: +principal (debt reduced - for liability accounts, positive = reduction)
+            # interest expense: +interest (expense incurred)
+            # These sum to: -total + principal + interest = 0 (since total = principal + interest)
+            journal = JournalEntry(
+                date=payment_date,
+                description=f"Mortgage payment - {mortgage_row['lender']}",
+            )
+            entries = [
+                BookEntry(journal_entry_id=0, account_id=from_account_id, amount=-total_amount),
+                BookEntry(journal_entry_id=0, account_id=liability_account_id, amount=principal_amount),
+                BookEntry(journal_entry_id=0, account_id=interest_account.id, amount=interest_amount),
+            ]
+            journal_id = self.journal_repo.create_entry(journal, entries)
+
+            self._post_capital(
+                mortgage_row, journal_id, payment_date, total_amount, principal_amount, interest_amount,
+                payer_owner_id, payer_capital_account_id,
+            )
+            return journal_id
+
+    def get_payment_history(
+        self, mortgage_id: int, start: date | None = None, end: date | None = None,
+    ) -> list[dict]:
+        """Payments for a mortgage, newest first, from the ``mortgage_payments`` link table."""
+        return [p.model_dump() for p in self.prop_repo.get_mortgage_payments(mortgage_id, start, end)]
+
+    def get_interest_to_date(self, mortgage_id: int, as_of: date | None = None) -> Decimal:
+        """Total interest paid on a mortgage up to a date."""
+        return self.prop_repo.get_mortgage_payment_totals(mortgage_id, as_of)["interest"]
+
+    def get_principal_to_date(self, mortgage_id: int, as_of: date | None = None) -> Decimal:
+        """Total principal repaid on a mortgage up to a date."""
+        return self.prop_repo.get_mortgage_payment_totals(mortgage_id, as_of)["principal"]
+
+    def find_imported_payments(
+        self,
+        start: date,
+        end: date,
+        window_days: int = 5,
+        tolerance: Decimal = Decimal("1.00"),
+    ) -> list[dict]:
+        """Imported bank debits between two dates that look like scheduled instalments.
+
+        A debit still posted to "Uncategorized Expense" matches a mortgage when
+        its description matches the mortgage's ``payee_pattern`` (a
+        case-insensitive regex, defaulting to the lender name), it falls within
+        ``window_days`` of a scheduled instalment and its amount is within
+        ``tolerance`` of that instalment. Each debit and each instalment is
+        used once; instalments already linked to a payment are skipped.
+        Matches carry the principal/interest split from the schedule.
+        """
+        placeholder = self.account_repo.get_by_name("Uncategorized Expense")
+        mortgages = [dict(r) for r in self.conn.execute("SELECT * FROM mortgages ORDER BY id")]
+        if placeholder is None or not mortgages:
+            return []
+        # Mortgages with no recorded rate have no schedule to match against
+        schedules = AmortizationEngine(self.conn).schedules()
+        mortgages = [m for m in mortgages if m["id"] in schedules]
+        patterns = {m["id"]: payee_regex(m) for m in mortgages}
+
+        window = timedelta(days=window_days)
+        claimed = {
+            (r["mortgage_id"], schedules[r["mortgage_id"]].instalment(date.fromisoformat(r["payment_date"])))
+            for r in self.conn.execute(
+                "SELECT mortgage_id, payment_date FROM mortgage_payments WHERE payment_date BETWEEN ? AND ?",
+                ((start - window).isoformat(), (end + window).isoformat()),
+            )
+            if r["mortgage_id"] in schedules and len(schedules[r["mortgage_id"]])
+        }
+        rows = self.conn.execute(
+            """SELECT je.id, je.date, je.description, bank.account_id AS bank_account_id, bank.amount
+               FROM journal_entries je
+               JOIN book_entries other ON other.journal_entry_id = je.id AND other.account_id = :placeholder
+               JOIN book_entries bank ON bank.journal_entry_id = je.id AND bank.id != other.id
+               WHERE je.date BETWEEN :start AND :end
+                 AND je.import_batch_id IS NOT NULL
+                 AND COALESCE(je.leg_count, 2) = 2
+                 AND bank.amount < 0
+                 AND je.id NOT IN (SELECT journal_entry_id FROM mortgage_payments)
+               ORDER BY je.date, je.id""",
+            {"placeholder": placeholder.id, "start": start.isoformat(), "end": end.isoformat()},
+        ).fetchall()
 
+        matches = []
+        for row in rows:
+            when = date.fromisoformat(row["date"])
+            total = Decimal(str(round(-row["amount"], 2)))
+            best = None
+            for mortgage in mortgages:
+                schedule = schedules[mortgage["id"]]
+                if not len(schedule) or not patterns[mortgage["id"]].search(row["description"]):
+                    continue
+                i = schedule.instalment(when)
+                gap = abs(schedule.dates[i].item() - when)
+                difference = abs(total - Decimal(str(round(float(schedule.payment[i]), 2))))
+                if gap > window or difference > tolerance or (mortgage["id"], i) in claimed:
+                    continue
+                if best is None or difference < best[0]:
+                    best = (difference, mortgage["id"], i)
+            if best is None:
+                continue
+
+            _, mortgage_id, i = best
+            claimed.add((mortgage_id, i))
+            interest = min(Decimal(str(round(float(schedules[mortgage_id].interest[i]), 2))), total)
+            matches.append({
+                "journal_entry_id": row["id"],
+                "mortgage_id": mortgage_id,
+                "payment_date": when,
+                "description": row["description"],
+                "bank_account_id": row["bank_account_id"],
+                "total_amount": total,
+                "principal_amount": total - interest,
+                "interest_amount": interest,
+            })
+        return matches
+
+    def ingest_imported_payments(
+        self,
+        start: date,
+        end: date,
+        payer_owner_id: int | None = None,
+        window_days: int = 5,
+        tolerance: Decimal = Decimal("1.00"),
+    ) -> list[dict]:
+        """Turn matched imported debits into mortgage payments, in one transaction.
+
+        Each matched bank journal is re-pointed in place: its "Uncategorized
+        Expense" leg becomes the liability and interest legs, so the import
+        fingerprint still refers to it. The capital journal and the
+        ``mortgage_payments`` link row are posted alongside. ``payer_owner_id``
+        pays for the properties that owner holds; any other property's
+        payments go to its owner when it has only one.
+        Returns the matches posted, as from ``find_imported_payments``.
+        """
+        with unit_of_work(self.conn):
+            matches = self.find_imported_payments(start, end, window_days, tolerance)
+            if not matches:
+                return []
+            placeholder = self.account_repo.get_by_name("Uncategorized Expense").id
+            interest_account = self.account_repo.get_or_create("Mortgage Interest", AccountType.EXPENSE)
+            mortgages = {r["id"]: r for r in self.conn.execute("SELECT * FROM mortgages")}
+
+            for match in matches:
+                mortgage_row = mortgages[match["mortgage_id"]]
+                property_id = mortgage_row["property_id"]
+                holds = any(own["owner_id"] == payer_owner_id for own in self.prop_repo.get_ownership(property_id))
+                owner_id, capital_account_id = self._payer(property_id, payer_owner_id if holds else None)
+                legs = [
+                    BookEntry(journal_entry_id=0, account_id=account_id, amount=amount)
+                    for account_id, amount in (
+                        (mortgage_row["liability_account_id"], match["principal_amount"]),
+                        (interest_account.id, match["interest_amount"]),
+                    )
+                    if amount
+                ]
+                self.journal_repo.split_leg(match["journal_entry_id"], placeholder, legs)
+                self._post_capital(
+                    mortgage_row, match["journal_entry_id"], match["payment_date"], match["total_amount"],
+                    match["principal_amount"], match["interest_amount"], owner_id, capital_account_id,
+                )
+            return matches
+
+    def _payer(self, property_id: int, owner_id: int | None) -> tuple[int, int]:
+        """The paying owner and their capital account for a property."""
+        ownership = self.prop_repo.get_ownership(property_id)
+        if owner_id is None:
+            if len(ownership) != 1:
+                raise ValueError(f"Property {property_id} has {len(ownership)} owners; give the payer explicitly")
+            return ownership[0]["owner_id"], ownership[0]["capital_account_id"]
+        for own in ownership:
+            if own["owner_id"] == owner_id:
+                return owner_id, own["capital_account_id"]
+        raise ValueError(f"Owner {owner_id} does not own property {property_id}")
+
+    def _post_capital(
+        self,
+        mortgage_row: sqlite3.Row,
+        journal_id: int,
+        payment_date: date,
+        total_amount: Decimal,
+        principal_amount: Decimal,
+        interest_amount: Decimal,
+        payer_owner_id: int,
+        payer_capital_account_id: int,
+    ) -> int:
+        """Credit the payer's capital with the principal and link both journals to the mortgage."""
         # Separate journal entry for capital contribution
         # This records that the payer's equity in the property increased by the principal amount
         # Debit capital account (positive = increase in equity)
@@ -115,27 +300,15 @@ class MortgageTracker:
             BookEntry(journal_entry_id=0, account_id=payer_capital_account_id, amount=principal_amount),
             BookEntry(journal_entry_id=0, account_id=equity_tracking.id, amount=-principal_amount),
         ]
-        self.journal_repo.create_entry(capital_journal, capital_entries)
-
-        return journal_id
+        capital_journal_id = self.journal_repo.create_entry(capital_journal, capital_entries)
 
-    def get_payment_history(self, mortgage_id: int) -> list[dict]:
-        """Get all payments for a mortgage."""
-        mortgage_row = self.conn.execute(
-            "SELECT * FROM mortgages WHERE id = ?", (mortgage_id,)
-        ).fetchone()
-        if not mortgage_row:
-            return []
-
-        rows = self.conn.execute(
-            """SELECT je.id, je.date, je.description,
-                      GROUP_CONCAT(a.name || ':' || be.amount, '|') AS entries_summary
-               FROM journal_entries je
-               JOIN book_entries be ON be.journal_entry_id = je.id
-               JOIN accounts a ON a.id = be.account_id
-               WHERE je.description LIKE ?
-               GROUP BY je.id
-               ORDER BY je.date DESC""",
-            (f"%{mortgage_row['lender']}%",),
-        ).fetchall()
-        return [dict(r) for r in rows]
+        return self.prop_repo.add_mortgage_payment(MortgagePayment(
+            mortgage_id=mortgage_row["id"],
+            payment_date=payment_date,
+            journal_entry_id=journal_id,
+            capital_journal_id=capital_journal_id,
+            payer_owner_id=payer_owner_id,
+            total_amount=total_amount,
+            principal_amount=principal_amount,
+            interest_amount=interest_amount,
+        ))
@@ -0,0 +1,129 @@
+"""Set-based equity for every property and owner at once."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from finadviser.db.repositories import LATEST_VALUATION_ORDER, AccountRepo
+
+
+def split_equity(owners: list[dict], net_equity: Decimal) -> list[dict]:
+    """Set ``equity_pct`` and ``equity_amount`` on owner rows in proportion to capital.
+
+    Each row needs a ``capital_balance``. With no capital recorded the
+    property is split equally.
+    """
+    total_capital = sum((o["capital_balance"] for o in owners), Decimal("0"))
+    for owner in owners:
+        if total_capital > 0:
+            pct = float(owner["capital_balance"] / total_capital * 100)
+        else:
+            # Equal split if no capital recorded
+            pct = 100.0 / len(owners)
+
+        owner["equity_pct"] = pct
+        owner["equity_amount"] = net_equity * Decimal(str(pct)) / Decimal("100")
+    return owners
+
+
+class PortfolioEquity:
+    """Equity for the whole portfolio from a fixed handful of queries.
+
+    Gives the same figures as ``EquityCalculator.calculate`` per property,
+    but reads ownership, latest valuations, mortgages and every capital and
+    liability balance once for all properties instead of once per property.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def properties(self, as_of: date | None = None) -> list[dict]:
+        """Every property with its ``valuation``, ``mortgages`` and owner ``equity``.
+
+        ``valuation`` is the latest valuation row or None; each mortgage row
+        carries its liability account ``balance``; ``equity`` has the same
+        rows as ``EquityCalculator.calculate``. With ``as_of`` everything is
+        taken as at the end of that day.
+        """
+        properties = [dict(r) for r in self.conn.execute("SELECT * FROM properties ORDER BY name")]
+        cutoff = {"as_of": as_of.isoformat() if as_of else "9999-12-31"}
+
+        valuations = {
+            r["property_id"]: dict(r)
+            for r in self.conn.execute(
+                f"""SELECT id, property_id, valuation, valuation_date, source FROM (
+                       SELECT *, ROW_NUMBER() OVER (
+                           PARTITION BY property_id ORDER BY {LATEST_VALUATION_ORDER}
+                       ) AS recency
+                       FROM property_valuations WHERE valuation_date <= :as_of
+                   ) WHERE recency = 1""",
+                cutoff,
+            )
+        }
+
+        balances = {
+            r["account_id"]: Decimal(str(r["balance"]))
+            for r in self.conn.execute(
+                f"""SELECT account_id, ROUND(balance, 2) AS balance, MAX(date)
+                    FROM {AccountRepo(self.conn).checkpoint_table(as_of)}
+                    WHERE date <= :as_of AND account_id IN (
+                        SELECT capital_account_id FROM property_ownership
+                        UNION SELECT liability_account_id FROM mortgages
+                    )
+                    GROUP BY account_id""",
+                cutoff,
+            )
+        }
+
+        mortgages: dict[int, list[dict]] = defaultdict(list)
+        for r in self.conn.execute("SELECT * FROM mortgages ORDER BY property_id, start_date"):
+            mortgage = dict(r)
+            mortgage["balance"] = balances.get(mortgage["liability_account_id"], Decimal("0"))
+            mortgages[mortgage["property_id"]].append(mortgage)
+
+        ownership: dict[int, list[dict]] = defaultdict(list)
+        for r in self.conn.execute(
+            """SELECT po.property_id, po.owner_id, o.name AS owner_name, po.capital_account_id
+               FROM property_ownership po
+               JOIN owners o ON o.id = po.owner_id
+               ORDER BY po.property_id, po.owner_id"""
+        ):
+            ownership[r["property_id"]].append({
+                "owner_id": r["owner_id"],
+                "name": r["owner_name"],
+                "capital_account_id": r["capital_account_id"],
+                "capital_balance": balances.get(r["capital_account_id"], Decimal("0")),
+            })
+
+        for prop in properties:
+            pid = prop["id"]
+            prop["valuation"] = valuations.get(pid)
+            prop["mortgages"] = mortgages.get(pid, [])
+            prop["equity"] = self._equity(prop, ownership.get(pid, []))
+        return properties
+
+    @staticmethod
+    def _equity(prop: dict, owners: list[dict]) -> list[dict]:
+        if not owners:
+            return []
+        valuation = prop["valuation"]
+        market_value = Decimal(str(valuation["valuation"])) if valuation else Decimal("0")
+        # Shared liability accounts count once per property
+        liabilities = {m["liability_account_id"]: m["balance"] for m in prop["mortgages"]}
+        net_equity = market_value - sum((abs(b) for b in liabilities.values()), Decimal("0"))
+        return split_equity(owners, net_equity)
+
+    def calculate_all(self, as_of: date | None = None) -> dict[int, list[dict]]:
+        """Owner equity per property, as ``EquityCalculator.calculate_all``."""
+        return {prop["id"]: prop["equity"] for prop in self.properties(as_of)}
+
+    def owner_totals(self, as_of: date | None = None) -> dict[int, Decimal]:
+        """Total equity across all properties per owner id."""
+        totals: dict[int, Decimal] = defaultdict(Decimal)
+        for prop in self.properties(as_of):
+            for owner in prop["equity"]:
+                totals[owner["owner_id"]] += owner["equity_amount"]
+        return dict(totals)
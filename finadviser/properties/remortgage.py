@@ -0,0 +1,186 @@
+"""Compare remortgage products for an existing mortgage side by side."""
+
+from __future__ import annotations
+
+import csv
+import io
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from pydantic import ValidationError
+
+from finadviser.db.models import MortgageProduct
+from finadviser.db.repositories import LATEST_VALUATION_ORDER, AccountRepo, PropertyRepo
+from finadviser.properties.amortization import amortize, payment_dates, remaining_months
+
+DEFAULT_HORIZON = 60
+STAY = "Stay"
+
+
+def parse_products(text: str) -> list[MortgageProduct]:
+    """Products from CSV text with a header row of ``MortgageProduct`` fields.
+
+    Empty cells take the field default; ``erc_pct`` is a ``;``-separated
+    list of yearly percentages.
+    """
+    products = []
+    reader = csv.DictReader(io.StringIO(text.strip()))
+    for line, row in enumerate(reader, start=2):
+        fields = {k.strip(): v.strip() for k, v in row.items() if k and v and v.strip()}
+        if "erc_pct" in fields:
+            fields["erc_pct"] = [p for p in fields["erc_pct"].split(";") if p.strip()]
+        try:
+            products.append(MortgageProduct(**fields))
+        except ValidationError as e:
+            first = e.errors()[0]
+            raise ValueError(f"Line {line}: {'.'.join(map(str, first['loc']))}: {first['msg']}") from e
+    if not products:
+        raise ValueError("No products given")
+    return products
+
+
+class RemortgageComparison:
+    """Candidate trajectories over ``dates``; arrays are ``(products, months)``.
+
+    ``balance`` has an extra leading column for the balance on drawdown.
+    ``summary`` holds one dict per product, cheapest total cost first.
+    """
+
+    def __init__(self, mortgage_id: int, as_of: date, products: list[MortgageProduct], dates: np.ndarray) -> None:
+        self.mortgage_id = mortgage_id
+        self.as_of = as_of
+        self.products = products
+        self.dates = dates
+        self.balance = np.zeros((len(products), len(dates) + 1))
+        self.payment = np.zeros((len(products), len(dates)))
+        self.interest = np.zeros((len(products), len(dates)))
+        self.equity = np.zeros((len(products), len(dates)))
+        self.summary: list[dict] = []
+
+    @property
+    def best(self) -> dict:
+        return self.summary[0]
+
+
+class RemortgageEngine:
+    """Evaluates every candidate product for a mortgage in one amortization pass.
+
+    Each product starts from the mortgage's ledger balance on ``as_of``
+    (plus its arrangement fee when added to the loan) and runs for the
+    comparison horizon: the longest fixed period among the candidates, or
+    five years if none is fixed. Its total cost over the horizon is the
+    interest paid, fees less cashback, the early repayment charge due if the
+    horizon ends inside its fixed period, and ``current_erc`` for leaving
+    the current deal. Equity is the latest valuation less the candidate's
+    balance and the property's other mortgages.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def compare(
+        self,
+        mortgage_id: int,
+        products: list[MortgageProduct],
+        as_of: date | None = None,
+        horizon_months: int | None = None,
+        current_erc: Decimal = Decimal("0"),
+        include_current: bool = True,
+    ) -> RemortgageComparison:
+        """Ranked comparison of ``products``, optionally against staying put."""
+        as_of = as_of or date.today()
+        mortgage = self.conn.execute("SELECT * FROM mortgages WHERE id = ?", (mortgage_id,)).fetchone()
+        if mortgage is None:
+            raise ValueError(f"Mortgage {mortgage_id} not found")
+        mortgage = dict(mortgage)
+        accounts = AccountRepo(self.conn)
+        balance = abs(float(accounts.get_balance(mortgage["liability_account_id"], as_of)))
+        if balance <= 0:
+            raise ValueError(f"Mortgage {mortgage_id} has nothing outstanding on {as_of}")
+        remaining = remaining_months(mortgage, as_of)
+
+        products = list(products)
+        staying = False
+        if include_current:
+            current = self.conn.execute(
+                """SELECT rate FROM mortgage_rate_history WHERE mortgage_id = ? AND effective_date <= ?
+                   ORDER BY effective_date DESC, id DESC LIMIT 1""",
+                (mortgage_id, as_of.isoformat()),
+            ).fetchone()
+            if current is not None:
+                products.insert(0, MortgageProduct(name=STAY, rate=current["rate"]))
+                staying = True
+        if not products:
+            raise ValueError("No products to compare")
+
+        horizon = horizon_months or max((p.fixed_months for p in products), default=0) or DEFAULT_HORIZON
+        months = np.arange(horizon)
+        fixed = np.array([p.fixed_months for p in products])
+        initial = np.array([p.rate for p in products], dtype=float)
+        follow_on = np.array([p.rate if p.follow_on_rate is None else p.follow_on_rate for p in products], dtype=float)
+        rates = np.where(months[None, :] < fixed[:, None], initial[:, None], follow_on[:, None])
+        terms = np.array([p.term_months or remaining for p in products])
+        added = np.array([float(p.arrangement_fee) if p.fee_added_to_loan else 0.0 for p in products])
+
+        columns = amortize(balance + added, rates, terms)
+
+        dates = payment_dates(as_of, horizon)
+        result = RemortgageComparison(mortgage_id, as_of, products, dates)
+        result.balance[:, 0] = balance + added
+        result.balance[:, 1:] = columns["balance"]
+        result.payment = columns["payment"]
+        result.interest = columns["interest"]
+        result.equity = self._property_value(mortgage, as_of) - self._other_debt(mortgage, as_of) - columns["balance"]
+
+        end_balance = columns["balance"][:, -1]
+        rows = []
+        for i, product in enumerate(products):
+            fees = float(product.arrangement_fee + product.other_fees - product.cashback)
+            erc = 0.0
+            if horizon < product.fixed_months and product.erc_pct:
+                year = min(horizon // 12, len(product.erc_pct) - 1)
+                erc = end_balance[i] * product.erc_pct[year] / 100
+            if i or not staying:
+                erc += float(current_erc)
+            interest = float(columns["interest"][i].sum())
+            rows.append({
+                "name": product.name,
+                "initial_payment": _money(columns["payment"][i, 0]),
+                "max_payment": _money(columns["payment"][i].max()),
+                "interest": _money(interest),
+                "fees": _money(fees),
+                "erc": _money(erc),
+                "total_cost": _money(interest + fees + erc),
+                "end_balance": _money(end_balance[i]),
+                "end_equity": _money(result.equity[i, -1]),
+            })
+        result.summary = sorted(rows, key=lambda r: r["total_cost"])
+        for rank, row in enumerate(result.summary, start=1):
+            row["rank"] = rank
+        return result
+
+    def _property_value(self, mortgage: dict, as_of: date) -> float:
+        row = self.conn.execute(
+            f"""SELECT valuation FROM property_valuations WHERE property_id = ? AND valuation_date <= ?
+                ORDER BY {LATEST_VALUATION_ORDER} LIMIT 1""",
+            (mortgage["property_id"], as_of.isoformat()),
+        ).fetchone()
+        if row is not None:
+            return float(row["valuation"])
+        prop = PropertyRepo(self.conn).get_property(mortgage["property_id"])
+        return float(prop["purchase_price"] or 0) if prop else 0.0
+
+    def _other_debt(self, mortgage: dict, as_of: date) -> float:
+        """The property's other mortgage balances, held flat over the horizon."""
+        accounts = AccountRepo(self.conn)
+        return sum(
+            abs(float(accounts.get_balance(m["liability_account_id"], as_of)))
+            for m in PropertyRepo(self.conn).get_mortgages(mortgage["property_id"])
+            if m["id"] != mortgage["id"]
+        )
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(str(round(float(value), 2)))
@@ -6,8 +6,23 @@ import sqlite3
 from datetime import date
 from decimal import Decimal
 
-from finadviser.db.models import AccountType, BookEntry, JournalEntry
+from finadviser.db.connection import unit_of_work
+from finadviser.db.models import AccountType, BookEntry, JournalEntry, PropertyEvent, PropertyEventKind
 from finadviser.db.repositories import AccountRepo, JournalRepo, PropertyRepo
+from finadviser.properties.allocations import AllocationIndex
+
+# Journal reference on compound rent/expense journals: allocation:<property>:<kind>:<expense type>
+ALLOCATION_REFERENCE = "allocation"
+
+_ACCOUNTS = {
+    PropertyEventKind.INCOME: (("Rental Income", AccountType.INCOME), ("Rental Income Equity", AccountType.EQUITY)),
+    PropertyEventKind.EXPENSE: (("Property Expenses", AccountType.EXPENSE), ("Property Expense Equity", AccountType.EQUITY)),
+}
+_DEFAULT_DESCRIPTIONS = {PropertyEventKind.INCOME: "Rental income", PropertyEventKind.EXPENSE: "Property expense"}
+
+
+def _leg_keys(entries: list[BookEntry]) -> list[tuple[int, float]]:
+    return sorted((e.account_id, round(float(e.amount), 2)) for e in entries)
 
 
 class RentalTracker:
@@ -29,62 +44,19 @@ class RentalTracker:
     ) -> int:
         """Record rental income and allocate to owners per allocation rules.
 
-        Creates journal entries:
-        - Credit rental income account
+        Posts one compound journal:
         - Debit bank/asset account
+        - Credit rental income account
         - Credit each owner's capital account per their allocation %
         """
-        ownership = self.prop_repo.get_ownership(property_id)
-        if not ownership:
-            raise ValueError(f"No owners for property {property_id}")
-
-        rules = self.prop_repo.get_allocation_rules(property_id)
-        allocations = self._get_allocations(ownership, rules)
-
-        # Bank account receives the income
-        if to_account_id is None:
-            bank = self.account_repo.get_or_create("Bank", AccountType.ASSET)
-            to_account_id = bank.id
-
-        rental_income_account = self.account_repo.get_or_create(
-            "Rental Income", AccountType.INCOME
-        )
-
-        # Main income entry: bank debit, income credit
-        journal = JournalEntry(date=income_date, description=description)
-        entries = [
-            BookEntry(journal_entry_id=0, account_id=to_account_id, amount=amount),
-            BookEntry(journal_entry_id=0, account_id=rental_income_account.id, amount=-amount),
-        ]
-        journal_id = self.journal_repo.create_entry(journal, entries)
-
-        # Capital allocation entries
-        equity_tracking = self.account_repo.get_or_create("Rental Income Equity", AccountType.EQUITY)
-
-        for owner_id, pct in allocations.items():
-            owner_amount = amount * Decimal(str(pct)) / Decimal("100")
-            if owner_amount == 0:
-                continue
-
-            # Find this owner's capital account
-            capital_account_id = None
-            for own in ownership:
-                if own["owner_id"] == owner_id:
-                    capital_account_id = own["capital_account_id"]
-                    break
-
-            if capital_account_id:
-                cap_journal = JournalEntry(
-                    date=income_date,
-                    description=f"Rental income allocation - {pct}%",
-                )
-                cap_entries = [
-                    BookEntry(journal_entry_id=0, account_id=capital_account_id, amount=owner_amount),
-                    BookEntry(journal_entry_id=0, account_id=equity_tracking.id, amount=-owner_amount),
-                ]
-                self.journal_repo.create_entry(cap_journal, cap_entries)
-
-        return journal_id
+        return self.post_events([PropertyEvent(
+            property_id=property_id,
+            kind=PropertyEventKind.INCOME,
+            event_date=income_date,
+            amount=amount,
+            description=description,
+            account_id=to_account_id,
+        )])[0]
 
     def record_property_expense(
         self,
@@ -99,72 +71,130 @@ class RentalTracker:
 
         Expense reduces each owner's capital account per allocation rules.
         """
-        ownership = self.prop_repo.get_ownership(property_id)
-        if not ownership:
-            raise ValueError(f"No owners for property {property_id}")
-
-        rules = self.prop_repo.get_allocation_rules(property_id)
-        allocations = self._get_allocations(ownership, rules, expense_type)
-
-        if from_account_id is None:
-            bank = self.account_repo.get_or_create("Bank", AccountType.ASSET)
-            from_account_id = bank.id
-
-        expense_account = self.account_repo.get_or_create("Property Expenses", AccountType.EXPENSE)
-
-        # Main expense entry
-        journal = JournalEntry(date=expense_date, description=description)
-        entries = [
-            BookEntry(journal_entry_id=0, account_id=from_account_id, amount=-amount),
-            BookEntry(journal_entry_id=0, account_id=expense_account.id, amount=amount),
-        ]
-        journal_id = self.journal_repo.create_entry(journal, entries)
-
-        # Capital reduction entries
-        equity_tracking = self.account_repo.get_or_create("Property Expense Equity", AccountType.EQUITY)
-
-        for owner_id, pct in allocations.items():
-            owner_amount = amount * Decimal(str(pct)) / Decimal("100")
-            if owner_amount == 0:
-                continue
-
-            capital_account_id = None
-            for own in ownership:
-                if own["owner_id"] == owner_id:
-                    capital_account_id = own["capital_account_id"]
-                    break
-
-            if capital_account_id:
-                cap_journal = JournalEntry(
-                    date=expense_date,
-                    description=f"Property expense allocation - {pct}%",
-                )
-                cap_entries = [
-                    BookEntry(journal_entry_id=0, account_id=capital_account_id, amount=-owner_amount),
-                    BookEntry(journal_entry_id=0, account_id=equity_tracking.id, amount=owner_amount),
+        return self.post_events([PropertyEvent(
+            property_id=property_id,
+            kind=PropertyEventKind.EXPENSE,
+            event_date=expense_date,
+            amount=amount,
+            description=description,
+            account_id=from_account_id,
+            expense_type=expense_type,
+        )])[0]
+
+    def post_events(self, events: list[PropertyEvent]) -> list[int]:
+        """Post many rent and expense events in one transaction.
+
+        Each event becomes a single compound journal: the bank leg, the rental
+        income or property expense leg, a leg per owner's capital account and
+        the balancing equity-tracking leg. The split is the one in force on
+        the event date. Ownership and allocation rules are read once per
+        property. Returns journal ids in event order.
+        """
+        if not events:
+            return []
+        with unit_of_work(self.conn):
+            bank_id = None
+            if any(e.account_id is None for e in events):
+                bank_id = self.account_repo.get_or_create("Bank", AccountType.ASSET).id
+
+            properties: dict[int, tuple[dict[int, int], AllocationIndex]] = {}
+            accounts: dict[PropertyEventKind, tuple[int, int]] = {}
+            journals = []
+            for event in events:
+                pid = event.property_id
+                if pid not in properties:
+                    properties[pid] = self._load_property(pid)
+                capital, index = properties[pid]
+                # Income is always split by the "all" rules
+                expense_type = event.expense_type if event.kind == PropertyEventKind.EXPENSE else "all"
+                main_account_id, equity_account_id = self._accounts(event.kind, accounts)
+
+                # Income adds to the bank and to capital; expenses take from both
+                amount = event.amount if event.kind == PropertyEventKind.INCOME else -event.amount
+                entries = [
+                    BookEntry(journal_entry_id=0, account_id=event.account_id or bank_id, amount=amount),
+                    BookEntry(journal_entry_id=0, account_id=main_account_id, amount=-amount),
+                    *self._allocation_legs(amount, index.split(expense_type, event.event_date), capital, equity_account_id),
                 ]
-                self.journal_repo.create_entry(cap_journal, cap_entries)
+                journal = JournalEntry(
+                    date=event.event_date,
+                    description=event.description or _DEFAULT_DESCRIPTIONS[event.kind],
+                    reference=f"{ALLOCATION_REFERENCE}:{pid}:{event.kind.value}:{expense_type}",
+                )
+                journals.append((journal, entries))
 
-        return journal_id
+            return self.journal_repo.create_entries(journals)
 
-    def _get_allocations(
-        self, ownership: list[dict], rules: list[dict], expense_type: str = "all"
-    ) -> dict[int, float]:
-        """Determine allocation percentages for each owner.
+    def reallocate(self, property_id: int, start: date | None = None, end: date | None = None) -> int:
+        """Re-split a property's posted events with the rules in force on each date.
 
-        Falls back to equal split if no rules are defined.
+        For use after backdating an allocation rule. Only compound journals
+        from ``post_events`` carry the reference needed to find them. Returns
+        the number of journals whose owner legs changed.
         """
-        allocations: dict[int, float] = {}
-
-        # Check for specific rules
-        for rule in rules:
-            if rule["expense_type"] in (expense_type, "all"):
-                allocations[rule["owner_id"]] = rule["allocation_pct"]
+        with unit_of_work(self.conn):
+            capital, index = self._load_property(property_id)
+            rows = self.conn.execute(
+                """SELECT id, date, reference FROM journal_entries
+                   WHERE date >= ? AND date <= ? AND reference LIKE ?""",
+                (
+                    start.isoformat() if start else "",
+                    end.isoformat() if end else "9999-12-31",
+                    f"{ALLOCATION_REFERENCE}:{property_id}:%",
+                ),
+            ).fetchall()
+
+            accounts: dict[PropertyEventKind, tuple[int, int]] = {}
+            changed = 0
+            for row in rows:
+                _, _, kind, expense_type = row["reference"].split(":", 3)
+                main_account_id, equity_account_id = self._accounts(PropertyEventKind(kind), accounts)
+                allocation_accounts = {*capital.values(), equity_account_id}
+                legs = self.journal_repo.get_book_entries(row["id"])
+                kept = [e for e in legs if e.account_id not in allocation_accounts]
+                amount = -sum(e.amount for e in kept if e.account_id == main_account_id)
+                split = index.split(expense_type, date.fromisoformat(row["date"]))
+                entries = kept + self._allocation_legs(amount, split, capital, equity_account_id)
+                if _leg_keys(entries) != _leg_keys(legs):
+                    self.journal_repo.replace_entries(row["id"], entries)
+                    changed += 1
+            return changed
+
+    def _load_property(self, property_id: int) -> tuple[dict[int, int], AllocationIndex]:
+        """Capital account per owner and the allocation index for a property."""
+        ownership = self.prop_repo.get_ownership(property_id)
+        if not ownership:
+            raise ValueError(f"No owners for property {property_id}")
+        capital = {own["owner_id"]: own["capital_account_id"] for own in ownership}
+        return capital, AllocationIndex(list(capital), self.prop_repo.get_allocation_rules(property_id))
 
-        # Fall back to equal split
-        if not allocations:
-            equal_pct = 100.0 / len(ownership)
-            for own in ownership:
-                allocations[own["owner_id"]] = equal_pct
+    def _accounts(self, kind: PropertyEventKind, resolved: dict[PropertyEventKind, tuple[int, int]]) -> tuple[int, int]:
+        """Income or expense account and its equity-tracking account for an event kind.
 
-        return allocations
+        ``resolved`` lives for one unit of work only: the accounts may be
+        created inside it, and a rollback would leave cached ids dangling.
+        """
+        if kind not in resolved:
+            (main, main_type), (equity, equity_type) = _ACCOUNTS[kind]
+            resolved[kind] = (
+                self.account_repo.get_or_create(main, main_type).id,
+                self.account_repo.get_or_create(equity, equity_type).id,
+            )
+        return resolved[kind]
+
+    @staticmethod
+    def _allocation_legs(
+        amount: Decimal, split: dict[int, float], capital: dict[int, int], equity_account_id: int,
+    ) -> list[BookEntry]:
+        """A capital leg per owner and the equity-tracking leg balancing them."""
+        entries = []
+        allocated = Decimal("0")
+        for owner_id, pct in split.items():
+            owner_amount = amount * Decimal(str(pct)) / Decimal("100")
+            if owner_amount == 0 or owner_id not in capital:
+                continue
+            entries.append(BookEntry(journal_entry_id=0, account_id=capital[owner_id], amount=owner_amount))
+            allocated += owner_amount
+        if allocated:
+            entries.append(BookEntry(journal_entry_id=0, account_id=equity_account_id, amount=-allocated))
+        return entries
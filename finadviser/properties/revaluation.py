@@ -0,0 +1,137 @@
+"""Revalue properties between surveys from a regional house price index."""
+
+from __future__ import annotations
+
+import csv
+import sqlite3
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from finadviser.db.changes import mark_written
+from finadviser.db.connection import unit_of_work
+from finadviser.db.models import PropertyValuation
+from finadviser.db.repositories import INDEX_SOURCE, PropertyRepo
+
+
+class HousePriceIndex:
+    """Monthly index levels by region.
+
+    A lookup for a month uses the latest level published on or before it,
+    so an index that lags by a few months still projects to today. Results
+    are cached per region and month. Region names match case-insensitively.
+    """
+
+    def __init__(self, levels: dict[str, dict[str, float]]) -> None:
+        self._months: dict[str, list[str]] = {}
+        self._levels: dict[str, list[float]] = {}
+        for region, series in levels.items():
+            months = sorted(series)
+            self._months[region.strip().casefold()] = months
+            self._levels[region.strip().casefold()] = [series[m] for m in months]
+        self._cache: dict[tuple[str, str], float | None] = {}
+
+    @classmethod
+    def from_csv(cls, path: Path) -> HousePriceIndex:
+        """Read a CSV with ``region``, ``month`` (YYYY-MM or a full date) and ``index`` columns."""
+        levels: dict[str, dict[str, float]] = {}
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            missing = {"region", "month", "index"} - set(reader.fieldnames or ())
+            if missing:
+                raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+            for line, row in enumerate(reader, start=2):
+                try:
+                    level = float(row["index"])
+                    month = row["month"].strip()[:7]
+                    date.fromisoformat(f"{month}-01")
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"{path} line {line}: {e}") from e
+                levels.setdefault(row["region"], {})[month] = level
+        return cls(levels)
+
+    def level(self, region: str, month: str) -> float | None:
+        """Index level in force for a ``YYYY-MM`` month, or None before the series starts."""
+        key = (region.strip().casefold(), month[:7])
+        if key not in self._cache:
+            months = self._months.get(key[0])
+            i = bisect_right(months, key[1]) - 1 if months else -1
+            self._cache[key] = self._levels[key[0]][i] if i >= 0 else None
+        return self._cache[key]
+
+
+class RevaluationJob:
+    """Projects every property's value to a date from its last survey.
+
+    The base is the latest valuation on or before the date that did not
+    come from the index (the purchase price if there is none), scaled by
+    the movement of the property's regional index since then. Estimates
+    are written with ``source='index'`` in one transaction; running the job
+    again for the same date replaces its earlier estimates. A survey dated
+    the same day as an estimate still counts as the latest valuation.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, index: HousePriceIndex) -> None:
+        self.conn = conn
+        self.index = index
+
+    def run(self, as_of: date | None = None, default_region: str | None = None) -> list[dict]:
+        """Revalue all properties; returns one row per estimate written.
+
+        Properties with no region (and no ``default_region``), no base value
+        or no index level for their base month are skipped.
+        """
+        as_of = as_of or date.today()
+        target_month = as_of.isoformat()[:7]
+        rows = self.conn.execute(
+            """SELECT p.id, p.name, p.region, p.purchase_date, p.purchase_price,
+                      v.valuation, v.valuation_date
+               FROM properties p
+               LEFT JOIN property_valuations v ON v.id = (
+                   SELECT pv.id FROM property_valuations pv
+                   WHERE pv.property_id = p.id AND pv.source IS NOT ? AND pv.valuation_date <= ?
+                   ORDER BY pv.valuation_date DESC, pv.id DESC LIMIT 1
+               )
+               ORDER BY p.id""",
+            (INDEX_SOURCE, as_of.isoformat()),
+        ).fetchall()
+
+        estimates = []
+        for r in rows:
+            region = r["region"] or default_region
+            if r["valuation"] is not None:
+                base_value, base_date = r["valuation"], r["valuation_date"]
+            else:
+                base_value, base_date = r["purchase_price"], r["purchase_date"]
+            if not region or not base_value or not base_date or base_date >= as_of.isoformat():
+                continue
+            base_level = self.index.level(region, base_date)
+            target_level = self.index.level(region, target_month)
+            if not base_level or target_level is None:
+                continue
+            estimates.append({
+                "property_id": r["id"],
+                "name": r["name"],
+                "region": region,
+                "base_value": base_value,
+                "base_date": base_date,
+                "valuation": round(base_value * target_level / base_level, 2),
+            })
+
+        if not estimates:
+            return estimates
+        with unit_of_work(self.conn):
+            self.conn.executemany(
+                "DELETE FROM property_valuations WHERE property_id = ? AND valuation_date = ? AND source = ?",
+                [(e["property_id"], as_of.isoformat(), INDEX_SOURCE) for e in estimates],
+            )
+            mark_written(self.conn, "property_valuations")
+            PropertyRepo(self.conn).add_valuations([
+                PropertyValuation(
+                    property_id=e["property_id"], valuation=Decimal(str(e["valuation"])),
+                    valuation_date=as_of, source=INDEX_SOURCE,
+                )
+                for e in estimates
+            ])
+        return estimates
@@ -0,0 +1,284 @@
+"""Monte Carlo simulation of property equity, LTV and net worth."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+from finadviser.db.models import AccountType
+from finadviser.db.repositories import AccountRepo
+from finadviser.properties.amortization import annuity, payment_dates, remaining_months
+from finadviser.properties.portfolio import PortfolioEquity
+from finadviser.properties.rental_tracker import ALLOCATION_REFERENCE
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class SimulationAssumptions:
+    """Scenario model parameters; rates and growth are annual.
+
+    House prices follow a geometric random walk with a shared market factor
+    (``price_correlation``) and a per-property shock. The base rate is
+    mean-reverting towards ``rate_long_run`` (the current average mortgage
+    rate if None), in percentage points, and every mortgage moves with it.
+    Net rent grows as an independent geometric random walk per property.
+    """
+
+    def __init__(
+        self,
+        price_growth: float = 0.03,
+        price_volatility: float = 0.08,
+        price_correlation: float = 0.7,
+        rate_long_run: float | None = None,
+        rate_reversion: float = 0.3,
+        rate_volatility: float = 1.0,
+        rent_growth: float = 0.02,
+        rent_volatility: float = 0.05,
+    ) -> None:
+        self.price_growth = price_growth
+        self.price_volatility = price_volatility
+        self.price_correlation = price_correlation
+        self.rate_long_run = rate_long_run
+        self.rate_reversion = rate_reversion
+        self.rate_volatility = rate_volatility
+        self.rent_growth = rent_growth
+        self.rent_volatility = rent_volatility
+
+
+class SimulationResult:
+    """Percentile bands over ``dates``: each band is ``(len(percentiles), len(dates))``.
+
+    ``owner_equity`` and ``ltv`` are keyed by owner and property id, with
+    names in ``owners`` and ``properties``. ``negative_equity`` is the share
+    of scenarios in which each property is worth less than its mortgages.
+    """
+
+    def __init__(self, dates: np.ndarray, percentiles: tuple[int, ...], scenarios: int) -> None:
+        self.dates = dates
+        self.percentiles = percentiles
+        self.scenarios = scenarios
+        self.owners: dict[int, str] = {}
+        self.properties: dict[int, str] = {}
+        self.owner_equity: dict[int, np.ndarray] = {}
+        self.ltv: dict[int, np.ndarray] = {}
+        self.negative_equity: dict[int, np.ndarray] = {}
+        self.portfolio_ltv = np.zeros((len(percentiles), len(dates)))
+        self.net_worth = np.zeros((len(percentiles), len(dates)))
+
+
+class MonteCarloEngine:
+    """Simulates the portfolio forward from the ledger as of a date.
+
+    The starting point is each property's latest valuation (purchase price
+    if never valued), each mortgage's ledger balance, latest rate and
+    remaining term, the trailing year of net rent posted through
+    ``RentalTracker`` and the household's other assets and liabilities.
+    Every scenario steps forward a month at a time as one row of NumPy
+    arrays; mortgages are re-levelled over their remaining term each month
+    and rent less mortgage payments accrues as cash. Owners keep their
+    current equity shares.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def run(
+        self,
+        scenarios: int = 10_000,
+        years: int = 25,
+        assumptions: SimulationAssumptions | None = None,
+        as_of: date | None = None,
+        seed: int | None = None,
+        workers: int = 1,
+        chunk_size: int = 2_500,
+        percentiles: tuple[int, ...] = PERCENTILES,
+    ) -> SimulationResult:
+        """Run the scenarios and reduce them to percentile bands at each year end.
+
+        Scenarios are simulated in chunks, each with its own child of
+        ``seed``, so results do not depend on ``workers``; more than one
+        worker spreads the chunks over a process pool.
+        """
+        if scenarios < 1 or years < 1:
+            raise ValueError("Need at least one scenario and one year")
+        as_of = as_of or date.today()
+        assumptions = assumptions or SimulationAssumptions()
+        state = self._initial_state(as_of)
+
+        sizes = [min(chunk_size, scenarios - start) for start in range(0, scenarios, chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        jobs = [(state, assumptions, years, size, child) for size, child in zip(sizes, seeds)]
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunks = list(pool.map(_simulate_chunk, *zip(*jobs)))
+        else:
+            chunks = [_simulate_chunk(*job) for job in jobs]
+        paths = {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+
+        dates = np.concatenate([[np.datetime64(as_of, "D")], payment_dates(as_of, years * 12)[11::12]])
+        result = SimulationResult(dates, percentiles, scenarios)
+        result.properties = dict(zip(state["property_ids"], state["property_names"]))
+        result.owners = dict(zip(state["owner_ids"], state["owner_names"]))
+
+        def bands(values: np.ndarray) -> np.ndarray:
+            return np.percentile(values, percentiles, axis=0)
+
+        for i, pid in enumerate(state["property_ids"]):
+            result.ltv[pid] = bands(paths["ltv"][:, :, i])
+            result.negative_equity[pid] = (paths["ltv"][:, :, i] > 1).mean(axis=0)
+        for j, owner_id in enumerate(state["owner_ids"]):
+            result.owner_equity[owner_id] = bands(paths["owner_equity"][:, :, j])
+        result.portfolio_ltv = bands(paths["portfolio_ltv"])
+        result.net_worth = bands(paths["net_worth"])
+        return result
+
+    def _initial_state(self, as_of: date) -> dict:
+        """Plain arrays describing the portfolio on ``as_of``, safe to send to workers."""
+        properties = PortfolioEquity(self.conn).properties(as_of)
+        index = {prop["id"]: i for i, prop in enumerate(properties)}
+        values = np.array([
+            prop["valuation"]["valuation"] if prop["valuation"] else prop["purchase_price"] or 0.0
+            for prop in properties
+        ], dtype=float)
+
+        owner_names: dict[int, str] = {}
+        for prop in properties:
+            for owner in prop["equity"]:
+                owner_names[owner["owner_id"]] = owner["name"]
+        owner_ids = sorted(owner_names)
+        shares = np.zeros((len(properties), len(owner_ids)))
+        for prop in properties:
+            for owner in prop["equity"]:
+                shares[index[prop["id"]], owner_ids.index(owner["owner_id"])] = owner["equity_pct"] / 100
+
+        # The rate in force on as_of, or the earliest one before the first
+        rates: dict[int, float] = {}
+        for r in self.conn.execute(
+            "SELECT mortgage_id, rate, effective_date FROM mortgage_rate_history ORDER BY effective_date, id"
+        ):
+            if r["effective_date"] <= as_of.isoformat() or r["mortgage_id"] not in rates:
+                rates[r["mortgage_id"]] = r["rate"]
+        mortgages = [
+            (index[prop["id"]], m) for prop in properties for m in prop["mortgages"] if m["balance"]
+        ]
+        for _, m in mortgages:
+            if m["id"] not in rates:
+                raise ValueError(f"Mortgage {m['id']} ({m['lender']}) has no recorded interest rate")
+        owned_by = np.zeros((len(mortgages), len(properties)))
+        for k, (i, _) in enumerate(mortgages):
+            owned_by[k, i] = 1
+
+        mortgage_accounts = {m["liability_account_id"] for _, m in mortgages}
+        other_worth = 0.0
+        for r in self.conn.execute(
+            f"""SELECT c.account_id, a.account_type, c.balance, MAX(c.date)
+                FROM {AccountRepo(self.conn).checkpoint_table(as_of)} c
+                JOIN accounts a ON a.id = c.account_id
+                WHERE c.date <= ? AND a.account_type IN (?, ?)
+                GROUP BY c.account_id""",
+            (as_of.isoformat(), AccountType.ASSET.value, AccountType.LIABILITY.value),
+        ):
+            if r["account_type"] == AccountType.ASSET.value:
+                other_worth += r["balance"]
+            elif r["account_id"] not in mortgage_accounts:
+                other_worth -= abs(r["balance"])
+
+        return {
+            "property_ids": [prop["id"] for prop in properties],
+            "property_names": [prop["name"] for prop in properties],
+            "owner_ids": owner_ids,
+            "owner_names": [owner_names[o] for o in owner_ids],
+            "values": values,
+            "shares": shares,
+            "rent": self._annual_net_rent(as_of, index),
+            "balances": np.array([abs(float(m["balance"])) for _, m in mortgages], dtype=float),
+            "rates": np.array([rates[m["id"]] for _, m in mortgages], dtype=float),
+            "remaining": np.array([remaining_months(m, as_of) for _, m in mortgages], dtype=int),
+            "owned_by": owned_by,
+            "other_worth": other_worth,
+        }
+
+    def _annual_net_rent(self, as_of: date, index: dict[int, int]) -> np.ndarray:
+        """Rent less property expenses over the year to ``as_of``, per property."""
+        start = (as_of - timedelta(days=365)).isoformat()
+        totals: dict[int, float] = defaultdict(float)
+        for r in self.conn.execute(
+            """SELECT je.reference, SUM(be.amount) AS amount
+               FROM journal_entries je
+               JOIN book_entries be ON be.journal_entry_id = je.id
+               JOIN accounts a ON a.id = be.account_id
+               WHERE je.date > ? AND je.date <= ? AND je.reference LIKE ?
+                 AND a.name IN ('Rental Income', 'Property Expenses')
+               GROUP BY je.reference""",
+            (start, as_of.isoformat(), f"{ALLOCATION_REFERENCE}:%"),
+        ):
+            # Income is credited and expenses debited, so the net rent is the negated sum
+            totals[int(r["reference"].split(":")[1])] -= r["amount"]
+        rent = np.zeros(len(index))
+        for pid, amount in totals.items():
+            if pid in index:
+                rent[index[pid]] = amount
+        return rent
+
+
+def _simulate_chunk(
+    state: dict, assumptions: SimulationAssumptions, years: int, scenarios: int, seed: np.random.SeedSequence,
+) -> dict[str, np.ndarray]:
+    """Simulate one chunk of scenarios; arrays are ``(scenarios, years + 1, ...)``."""
+    rng = np.random.default_rng(seed)
+    a = assumptions
+    dt = 1 / 12
+    n_props = len(state["values"])
+
+    values = np.tile(state["values"], (scenarios, 1))
+    rent = np.tile(state["rent"], (scenarios, 1))
+    balances = np.tile(state["balances"], (scenarios, 1))
+    remaining = state["remaining"].copy()
+    owned_by = state["owned_by"]
+    base0 = float(state["rates"].mean()) if len(state["rates"]) else 0.0
+    long_run = base0 if a.rate_long_run is None else a.rate_long_run
+    base = np.full(scenarios, base0)
+    cash = np.zeros(scenarios)
+
+    price_drift = (a.price_growth - a.price_volatility ** 2 / 2) * dt
+    rent_drift = (a.rent_growth - a.rent_volatility ** 2 / 2) * dt
+    market_weight, own_weight = np.sqrt(a.price_correlation), np.sqrt(1 - a.price_correlation)
+
+    def record() -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        debt = balances @ owned_by
+        equity = values - debt
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ltv = np.where(values > 0, debt / values, 0.0)
+            portfolio_ltv = np.where(values.sum(axis=1) > 0, debt.sum(axis=1) / values.sum(axis=1), 0.0)
+        net_worth = state["other_worth"] + cash + equity.sum(axis=1)
+        return equity @ state["shares"], ltv, portfolio_ltv, net_worth
+
+    snapshots = [record()]
+    for k in range(1, years * 12 + 1):
+        shocks = rng.standard_normal((scenarios, n_props + 2))
+        market = shocks[:, n_props]
+        values = values * np.exp(
+            price_drift + a.price_volatility * np.sqrt(dt) * (market_weight * market[:, None] + own_weight * shocks[:, :n_props])
+        )
+        rent = rent * np.exp(rent_drift + a.rent_volatility * np.sqrt(dt) * rng.standard_normal((scenarios, n_props)))
+        base = base + a.rate_reversion * (long_run - base) * dt + a.rate_volatility * np.sqrt(dt) * shocks[:, n_props + 1]
+
+        monthly = np.maximum(state["rates"] + (base - base0)[:, None], 0) / 1200
+        active = remaining > 0
+        payment = np.where(active, annuity(balances, monthly, remaining), 0.0)
+        interest = np.where(active, balances * monthly, 0.0)
+        # The final instalment clears whatever is left
+        principal = np.where(remaining == 1, balances, np.minimum(payment - interest, balances))
+        balances = balances - np.where(active, principal, 0.0)
+        remaining = np.maximum(remaining - 1, 0)
+        cash = cash + rent.sum(axis=1) / 12 - np.where(active, principal + interest, 0.0).sum(axis=1)
+
+        if k % 12 == 0:
+            snapshots.append(record())
+
+    owner_equity, ltv, portfolio_ltv, net_worth = (np.stack(parts, axis=1) for parts in zip(*snapshots))
+    return {"owner_equity": owner_equity, "ltv": ltv, "portfolio_ltv": portfolio_ltv, "net_worth": net_worth}
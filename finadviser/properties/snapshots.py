@@ -0,0 +1,161 @@
+"""Equity snapshots: a per-owner, per-property equity time series cache."""
+
+from __future__ import annotations
+
+import calendar
+import sqlite3
+from datetime import date, timedelta
+
+from finadviser.db.archive import is_attached
+from finadviser.db.changes import mark_written
+from finadviser.db.connection import unit_of_work
+from finadviser.properties.portfolio import PortfolioEquity
+
+CADENCES = ("daily", "weekly", "monthly")
+
+
+def snapshot_dates(start: date, end: date, cadence: str = "monthly") -> list[date]:
+    """Snapshot dates between two days: every day, every Sunday or every month end."""
+    if cadence not in CADENCES:
+        raise ValueError(f"Unknown snapshot cadence {cadence!r}; expected one of {', '.join(CADENCES)}")
+    if cadence == "daily":
+        return [start + timedelta(days=n) for n in range((end - start).days + 1)]
+    if cadence == "weekly":
+        first = start + timedelta(days=6 - start.weekday())
+        return [first + timedelta(weeks=n) for n in range((end - first).days // 7 + 1)] if first <= end else []
+
+    dates = []
+    year, month = start.year, start.month
+    while True:
+        month_end = date(year, month, calendar.monthrange(year, month)[1])
+        if month_end > end:
+            return dates
+        dates.append(month_end)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+class EquitySnapshots:
+    """Keeps ``equity_snapshots`` filled at a fixed cadence.
+
+    Schema triggers drop the snapshots a change affects (a valuation, an
+    ownership or mortgage change, or a capital or mortgage ledger leg dated on
+    or before them), so ``refresh()`` only records dates that are missing.
+    Reads go through ``history()``, which refreshes first unless told not to.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, cadence: str = "monthly") -> None:
+        if cadence not in CADENCES:
+            raise ValueError(f"Unknown snapshot cadence {cadence!r}; expected one of {', '.join(CADENCES)}")
+        self.conn = conn
+        self.cadence = cadence
+        self.portfolio = PortfolioEquity(conn)
+
+    def _expected(self, through: date | None = None) -> dict[str, int]:
+        """Snapshot date -> number of owned properties it should cover."""
+        rows = self.conn.execute(
+            """SELECT p.id, COALESCE(p.purchase_date, MIN(v.valuation_date)) AS since
+               FROM properties p
+               LEFT JOIN property_valuations v ON v.property_id = p.id
+               WHERE p.id IN (SELECT property_id FROM property_ownership)
+               GROUP BY p.id"""
+        ).fetchall()
+        starts = sorted(date.fromisoformat(r["since"]) for r in rows if r["since"])
+        if not starts:
+            return {}
+
+        closed_through = self.conn.execute("SELECT MAX(cutoff) FROM period_closes").fetchone()[0]
+        readable_from = closed_through if closed_through and not is_attached(self.conn) else ""
+
+        expected = {}
+        covered = 0
+        for day in snapshot_dates(starts[0], through or date.today(), self.cadence):
+            while covered < len(starts) and starts[covered] <= day:
+                covered += 1
+            key = day.isoformat()
+            # Closed-period balances live in the archive; skip them until it is attached
+            if key >= readable_from:
+                expected[key] = covered
+        return expected
+
+    def refresh(self, through: date | None = None) -> int:
+        """Record every missing or stale snapshot date. Returns the dates recorded."""
+        expected = self._expected(through)
+        stored = dict(self.conn.execute(
+            "SELECT snapshot_date, COUNT(DISTINCT property_id) FROM equity_snapshots GROUP BY snapshot_date"
+        ).fetchall())
+        stale = [d for d, count in expected.items() if stored.get(d) != count]
+        if not stale:
+            return 0
+
+        with unit_of_work(self.conn):
+            for day in stale:
+                self.record(date.fromisoformat(day))
+        return len(stale)
+
+    def rebuild(self, through: date | None = None) -> int:
+        """Drop every snapshot and record them again, e.g. after changing cadence."""
+        with unit_of_work(self.conn):
+            self.conn.execute("DELETE FROM equity_snapshots")
+            mark_written(self.conn, "equity_snapshots")
+            return self.refresh(through)
+
+    def record(self, as_of: date) -> int:
+        """Replace the snapshot for one date. Returns the rows written."""
+        key = as_of.isoformat()
+        rows = [
+            (prop["id"], owner["owner_id"], key, float(owner["equity_amount"]), owner["equity_pct"])
+            for prop in self.portfolio.properties(as_of)
+            if (prop["purchase_date"] <= key if prop["purchase_date"] else prop["valuation"] is not None)
+            for owner in prop["equity"]
+        ]
+        self.conn.execute("DELETE FROM equity_snapshots WHERE snapshot_date = ?", (key,))
+        self.conn.executemany(
+            """INSERT INTO equity_snapshots
+               (property_id, owner_id, snapshot_date, equity_amount, equity_percentage)
+               VALUES (?, ?, ?, ?, ?)""",
+            rows,
+        )
+        mark_written(self.conn, "equity_snapshots")
+        self.conn.commit()
+        return len(rows)
+
+    def history(
+        self,
+        property_id: int | None = None,
+        owner_id: int | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        refresh: bool = True,
+    ) -> list[dict]:
+        """Snapshot rows oldest first, with property and owner names.
+
+        Pass ``refresh=False`` to read only what is stored, e.g. on a UI
+        thread while a worker keeps the snapshots current.
+        """
+        if refresh:
+            self.refresh(end)
+        where = ""
+        params: list = []
+        if property_id is not None:
+            where += " AND s.property_id = ?"
+            params.append(property_id)
+        if owner_id is not None:
+            where += " AND s.owner_id = ?"
+            params.append(owner_id)
+        if start:
+            where += " AND s.snapshot_date >= ?"
+            params.append(start.isoformat())
+        if end:
+            where += " AND s.snapshot_date <= ?"
+            params.append(end.isoformat())
+        rows = self.conn.execute(
+            f"""SELECT s.snapshot_date, s.property_id, p.name AS property_name,
+                       s.owner_id, o.name AS owner_name, s.equity_amount, s.equity_percentage
+                FROM equity_snapshots s
+                JOIN properties p ON p.id = s.property_id
+                JOIN owners o ON o.id = s.owner_id
+                WHERE 1=1{where}
+                ORDER BY s.snapshot_date, p.name, o.name""",
+            params,
+        ).fetchall()
+        return [dict(r) for r in rows]
@@ -6,7 +6,9 @@ import sqlite3
 from datetime import date
 from decimal import Decimal
 
-from finadviser.db.models import AccountType, BookEntry, JournalEntry
+from finadviser.db.changes import mark_written
+from finadviser.db.connection import unit_of_work
+from finadviser.db.models import BookEntry, JournalEntry, PropertyTransfer
 from finadviser.db.repositories import AccountRepo, JournalRepo, PropertyRepo
 
 
@@ -39,60 +41,90 @@ class TransferEngine:
 
         Returns the journal_entry_id.
         """
-        # Get ownership records
-        from_ownership = self.prop_repo.get_ownership(from_property_id)
-        to_ownership = self.prop_repo.get_ownership(to_property_id)
-
-        from_capital_id = None
-        to_capital_id = None
-
-        for own in from_ownership:
-            if own["owner_id"] == owner_id:
-                from_capital_id = own["capital_account_id"]
-                break
-
-        for own in to_ownership:
-            if own["owner_id"] == owner_id:
-                to_capital_id = own["capital_account_id"]
-                break
-
-        if from_capital_id is None:
-            raise ValueError(f"Owner {owner_id} does not own property {from_property_id}")
-        if to_capital_id is None:
-            raise ValueError(f"Owner {owner_id} does not own property {to_property_id}")
-
-        # Check sufficient equity
-        from_balance = self.account_repo.get_balance(from_capital_id)
-        if from_balance < amount:
-            raise ValueError(
-                f"Insufficient equity: {from_balance} available, {amount} requested"
-            )
-
-        # Create balanced journal entry
-        from_prop = self.prop_repo.get_property(from_property_id)
-        to_prop = self.prop_repo.get_property(to_property_id)
-
-        desc = description or (
-            f"Equity transfer: {from_prop['name']} -> {to_prop['name']}"
+        transfer = PropertyTransfer(
+            from_property_id=from_property_id,
+            to_property_id=to_property_id,
+            owner_id=owner_id,
+            amount=amount,
+            transfer_date=transfer_date,
+            description=description,
         )
+        return self.transfer_equities([transfer])[0]
 
-        journal = JournalEntry(date=transfer_date, description=desc)
-        entries = [
-            BookEntry(journal_entry_id=0, account_id=from_capital_id, amount=-amount),
-            BookEntry(journal_entry_id=0, account_id=to_capital_id, amount=amount),
-        ]
-        journal_id = self.journal_repo.create_entry(journal, entries)
-
-        # Record the transfer
-        self.conn.execute(
-            """INSERT INTO property_transfers
-               (from_property_id, to_property_id, owner_id, amount, journal_entry_id, transfer_date, description)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (from_property_id, to_property_id, owner_id, float(amount), journal_id, transfer_date.isoformat(), desc),
-        )
-        self.conn.commit()
+    def transfer_equities(self, transfers: list[PropertyTransfer]) -> list[int]:
+        """Apply a set of transfers atomically; returns their journal ids in order.
+
+        Ownership, property names and capital balances for every property
+        involved are read once, under the write lock of a ``BEGIN IMMEDIATE``
+        transaction, and each transfer is checked against the balance left
+        by the ones before it. Nothing is written unless all of them pass.
+        """
+        if not transfers:
+            return []
+        with unit_of_work(self.conn, immediate=True):
+            property_ids = sorted({t.from_property_id for t in transfers} | {t.to_property_id for t in transfers})
+            marks = ", ".join("?" * len(property_ids))
+            capital = {
+                (r["property_id"], r["owner_id"]): r["capital_account_id"]
+                for r in self.conn.execute(
+                    f"SELECT property_id, owner_id, capital_account_id FROM property_ownership WHERE property_id IN ({marks})",
+                    property_ids,
+                )
+            }
+            names = {
+                r["id"]: r["name"]
+                for r in self.conn.execute(f"SELECT id, name FROM properties WHERE id IN ({marks})", property_ids)
+            }
+            balances = self.account_repo.get_balance_map(list(capital.values()))
+
+            journals = []
+            for t in transfers:
+                if t.amount <= 0:
+                    raise ValueError(f"Transfer amount must be positive, got {t.amount}")
+                if t.from_property_id == t.to_property_id:
+                    raise ValueError(f"Cannot transfer equity from property {t.from_property_id} to itself")
+                from_capital_id = capital.get((t.from_property_id, t.owner_id))
+                to_capital_id = capital.get((t.to_property_id, t.owner_id))
+                if from_capital_id is None:
+                    raise ValueError(f"Owner {t.owner_id} does not own property {t.from_property_id}")
+                if to_capital_id is None:
+                    raise ValueError(f"Owner {t.owner_id} does not own property {t.to_property_id}")
+
+                # Check sufficient equity, net of earlier transfers in the batch
+                if balances[from_capital_id] < t.amount:
+                    raise ValueError(
+                        f"Insufficient equity: {balances[from_capital_id]} available, {t.amount} requested"
+                    )
+                balances[from_capital_id] -= t.amount
+                balances[to_capital_id] += t.amount
+
+                desc = t.description or (
+                    f"Equity transfer: {names[t.from_property_id]} -> {names[t.to_property_id]}"
+                )
+                journals.append((
+                    JournalEntry(date=t.transfer_date, description=desc),
+                    [
+                        BookEntry(journal_entry_id=0, account_id=from_capital_id, amount=-t.amount),
+                        BookEntry(journal_entry_id=0, account_id=to_capital_id, amount=t.amount),
+                    ],
+                ))
+
+            journal_ids = self.journal_repo.create_entries(journals)
+
+            # Record the transfers
+            self.conn.executemany(
+                """INSERT INTO property_transfers
+                   (from_property_id, to_property_id, owner_id, amount, journal_entry_id, transfer_date, description)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                [
+                    (t.from_property_id, t.to_property_id, t.owner_id, float(t.amount), journal_id,
+                     t.transfer_date.isoformat(), journal.description)
+                    for t, (journal, _), journal_id in zip(transfers, journals, journal_ids)
+                ],
+            )
+            mark_written(self.conn, "property_transfers")
 
-        return journal_id
+            return journal_ids
 
     def get_transfers(self, property_id: int | None = None, owner_id: int | None = None) -> list[dict]:
         """Get transfer history, optionally filtered."""
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+from importlib import import_module
+
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.widgets import Footer, Header
 
 from finadviser.config import AppConfig
+from finadviser.db.archive import attach_archive
 from finadviser.db.connection import get_connection, initialize_database
+from finadviser.utils import startup
 
 
 class FinAdviserApp(App):
@@ -28,30 +32,39 @@ class FinAdviserApp(App):
         Binding("q", "quit", "Quit", show=True),
     ]
 
+    # Screen name -> (module, class), imported and built on first visit
+    SCREEN_FACTORIES = {
+        "dashboard": ("finadviser.ui.screens.dashboard", "DashboardScreen"),
+        "transactions": ("finadviser.ui.screens.transactions", "TransactionsScreen"),
+        "import_wizard": ("finadviser.ui.screens.import_wizard", "ImportWizardScreen"),
+        "properties": ("finadviser.ui.screens.properties", "PropertiesScreen"),
+        "chat": ("finadviser.ui.screens.chat", "ChatScreen"),
+        "settings": ("finadviser.ui.screens.settings", "SettingsScreen"),
+    }
+
     def __init__(self, config: AppConfig | None = None, **kwargs) -> None:
         super().__init__(**kwargs)
         self.config = config or AppConfig()
         self.config.ensure_dirs()
         self.conn = get_connection(self.config.db_path)
         initialize_database(self.conn)
+        if self.config.archive_path.exists():
+            attach_archive(self.conn, self.config.archive_path)
+        startup.mark("database ready")
 
     def on_mount(self) -> None:
-        """Register screens and show dashboard."""
-        from finadviser.ui.screens.chat import ChatScreen
-        from finadviser.ui.screens.dashboard import DashboardScreen
-        from finadviser.ui.screens.import_wizard import ImportWizardScreen
-        from finadviser.ui.screens.properties import PropertiesScreen
-        from finadviser.ui.screens.settings import SettingsScreen
-        from finadviser.ui.screens.transactions import TransactionsScreen
-
-        self.install_screen(DashboardScreen(self.conn, self.config), name="dashboard")
-        self.install_screen(TransactionsScreen(self.conn, self.config), name="transactions")
-        self.install_screen(ImportWizardScreen(self.conn, self.config), name="import_wizard")
-        self.install_screen(PropertiesScreen(self.conn, self.config), name="properties")
-        self.install_screen(ChatScreen(self.conn, self.config), name="chat")
-        self.install_screen(SettingsScreen(self.conn, self.config), name="settings")
+        """Show the dashboard; other screens are built when first visited."""
+        startup.mark("app mounted")
+        self._ensure_screen("dashboard")
         self.push_screen("dashboard")
 
+    def _ensure_screen(self, screen_name: str) -> None:
+        if self.is_screen_installed(screen_name):
+            return
+        module_name, class_name = self.SCREEN_FACTORIES[screen_name]
+        screen_class = getattr(import_module(module_name), class_name)
+        self.install_screen(screen_class(self.conn, self.config), name=screen_name)
+
     def compose(self) -> ComposeResult:
         yield Header()
         yield Footer()
@@ -61,4 +74,5 @@ class FinAdviserApp(App):
         # Pop back to base then push the target
         while len(self.screen_stack) > 1:
             self.pop_screen()
+        self._ensure_screen(screen_name)
         self.push_screen(screen_name)
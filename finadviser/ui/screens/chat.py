@@ -10,6 +10,7 @@ from textual.screen import Screen
 from textual.widgets import Button, Input, ListItem, ListView, Static
 
 from finadviser.config import AppConfig
+from finadviser.db.changes import ChangeTracker
 from finadviser.db.repositories import ConversationRepo
 from finadviser.ui.widgets.chat_message import ChatMessage
 
@@ -23,6 +24,7 @@ class ChatScreen(Screen):
         self.config = config
         self.conv_repo = ConversationRepo(conn)
         self._current_conversation_id: int | None = None
+        self._changes = ChangeTracker(conn, ("ai_conversations",))
 
     def compose(self) -> ComposeResult:
         yield Horizontal(
@@ -50,11 +52,13 @@ class ChatScreen(Screen):
         )
 
     async def on_mount(self) -> None:
+        self._changes.changed()
         await self._refresh_conversations()
         self._show_welcome()
 
     async def on_screen_resume(self) -> None:
-        await self._refresh_conversations()
+        if self._changes.changed():
+            await self._refresh_conversations()
 
     def _show_welcome(self) -> None:
         messages = self.query_one("#chat-messages", VerticalScroll)
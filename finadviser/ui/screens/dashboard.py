@@ -11,10 +11,11 @@ from textual.screen import Screen
 from textual.widgets import Static
 
 from finadviser.config import AppConfig
+from finadviser.db.changes import ChangeTracker
 from finadviser.db.models import AccountType
-from finadviser.db.repositories import AccountRepo, JournalRepo
 from finadviser.ui.widgets.net_worth_card import NetWorthCard
 from finadviser.ui.widgets.transaction_table import TransactionTable
+from finadviser.utils import startup
 from finadviser.utils.formatting import format_currency
 
 
@@ -25,6 +26,7 @@ class DashboardScreen(Screen):
         super().__init__(**kwargs)
         self.conn = conn
         self.config = config
+        self._changes = ChangeTracker(conn, ("accounts", "categories", "journal_entries", "book_entries"))
 
     def compose(self) -> ComposeResult:
         yield Container(
@@ -53,15 +55,26 @@ class DashboardScreen(Screen):
         )
 
     def on_mount(self) -> None:
+        # Paint the layout first, then fill in the figures
+        startup.mark("dashboard mounted")
+        self._changes.changed()
+        self.call_after_refresh(self._first_refresh)
+
+    def _first_refresh(self) -> None:
+        startup.mark("first dashboard frame")
         self._refresh_summary()
+        startup.mark("dashboard summary ready")
 
     def on_screen_resume(self) -> None:
-        self._refresh_summary()
+        if self._changes.changed():
+            self._refresh_summary()
 
     def _refresh_summary(self) -> None:
-        repo = AccountRepo(self.conn)
-        journal_repo = JournalRepo(self.conn)
-        balances = repo.get_balances()
+        from finadviser.db.ledger_cache import LedgerCache
+
+        self.query_one(NetWorthCard).refresh_data()
+        ledger = LedgerCache.for_connection(self.conn)
+        balances = ledger.account_balances()
         currency = self.config.currency_symbol
 
         # Monthly summary
@@ -89,10 +102,12 @@ class DashboardScreen(Screen):
         else:
             savings_widget.update("[dim]No income recorded[/dim]")
 
-        # Top categories from monthly spending
-        spending = journal_repo.get_monthly_spending()
+        # Top-level categories, each including its subcategories' spending
+        spending = ledger.monthly_spending(rollup=True)
         categories: dict[str, float] = {}
         for row in spending:
+            if row["parent_id"] is not None:
+                continue
             cat = row.get("category_name") or "Uncategorized"
             categories[cat] = categories.get(cat, 0) + abs(row.get("total", 0))
 
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import sqlite3
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from textual.app import ComposeResult
 from textual.containers import Vertical
@@ -14,9 +15,11 @@ from finadviser.config import AppConfig
 from finadviser.db.models import RawTransaction
 from finadviser.db.repositories import AccountRepo
 from finadviser.importing.bank_config import get_all_configs
-from finadviser.importing.import_pipeline import ImportPipeline
 from finadviser.utils.formatting import format_currency
 
+if TYPE_CHECKING:
+    from finadviser.importing.import_pipeline import ImportPipeline
+
 
 class ImportWizardScreen(Screen):
     """Multi-step import: select file -> choose bank -> select account -> preview -> confirm."""
@@ -25,9 +28,18 @@ class ImportWizardScreen(Screen):
         super().__init__(**kwargs)
         self.conn = conn
         self.config = config
-        self.pipeline = ImportPipeline(conn, config)
+        self._pipeline: ImportPipeline | None = None
         self.preview_data: list[RawTransaction] = []
 
+    @property
+    def pipeline(self) -> ImportPipeline:
+        """Import pipeline, built on first use since it pulls in pandas."""
+        if self._pipeline is None:
+            from finadviser.importing.import_pipeline import ImportPipeline
+
+            self._pipeline = ImportPipeline(self.conn, self.config)
+        return self._pipeline
+
     def compose(self) -> ComposeResult:
         configs = get_all_configs(self.config.bank_configs_dir)
         accounts = AccountRepo(self.conn).list_all()
@@ -166,6 +178,7 @@ class ImportWizardScreen(Screen):
             status.update(
                 f"[green]Import complete![/green] "
                 f"{result.imported_count} imported, {result.duplicate_count} duplicates skipped"
+                + (f", [yellow]{len(result.errors)} in closed periods skipped[/yellow]" if result.errors else "")
             )
             self.query_one("#confirm-btn", Button).disabled = True
         except Exception as e:
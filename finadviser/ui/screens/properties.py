@@ -8,11 +8,14 @@ from decimal import Decimal
 from textual.app import ComposeResult
 from textual.containers import Horizontal, Vertical
 from textual.screen import Screen
-from textual.widgets import Button, DataTable, Input, ListItem, ListView, Static
+from textual.widgets import Button, DataTable, Input, ListItem, ListView, Select, Static, TextArea
 
 from finadviser.config import AppConfig
+from finadviser.db.changes import ChangeTracker, mark_committed_elsewhere
 from finadviser.db.repositories import AccountRepo, PropertyRepo
 from finadviser.properties.equity_calculator import EquityCalculator
+from finadviser.properties.remortgage import RemortgageEngine, parse_products
+from finadviser.properties.snapshots import EquitySnapshots
 from finadviser.ui.widgets.equity_bar import EquityBar
 from finadviser.utils.formatting import format_currency
 
@@ -27,6 +30,7 @@ class PropertiesScreen(Screen):
         self.prop_repo = PropertyRepo(conn)
         self.equity_calc = EquityCalculator(conn)
         self._selected_property_id: int | None = None
+        self._changes = ChangeTracker(conn, ("properties",))
 
     def compose(self) -> ComposeResult:
         yield Horizontal(
@@ -41,12 +45,14 @@ class PropertiesScreen(Screen):
                 Static("Select a property to view details", id="property-info"),
                 Static("", id="equity-section"),
                 DataTable(id="ownership-table"),
+                DataTable(id="equity-history-table"),
                 Static("", id="mortgage-info"),
                 DataTable(id="valuation-table"),
                 Horizontal(
                     Button("Record Payment", id="record-payment-btn", variant="default"),
                     Button("Update Valuation", id="update-valuation-btn", variant="default"),
                     Button("Transfer Equity", id="transfer-equity-btn", variant="default"),
+                    Button("Compare Remortgage", id="remortgage-btn", variant="default"),
                     Button("AI Equity Report", id="ai-equity-btn", variant="primary"),
                 ),
                 id="property-detail",
@@ -55,10 +61,12 @@ class PropertiesScreen(Screen):
         )
 
     async def on_mount(self) -> None:
+        self._changes.changed()
         await self._refresh_property_list()
 
     async def on_screen_resume(self) -> None:
-        await self._refresh_property_list()
+        if self._changes.changed():
+            await self._refresh_property_list()
 
     async def _refresh_property_list(self) -> None:
         listview = self.query_one("#property-listview", ListView)
@@ -114,6 +122,8 @@ class PropertiesScreen(Screen):
         else:
             equity_section.update("[dim]No ownership data. Add owners to track equity.[/dim]")
 
+        self._show_equity_history(property_id)
+
         # Mortgage info
         mortgages = self.prop_repo.get_mortgages(property_id)
         mortgage_info = self.query_one("#mortgage-info", Static)
@@ -141,6 +151,60 @@ class PropertiesScreen(Screen):
                 v.get("source", "manual"),
             )
 
+    def _show_equity_history(self, property_id: int) -> None:
+        """Clear the history table and fill it from a worker once snapshots are refreshed."""
+        self.query_one("#equity-history-table", DataTable).clear(columns=True)
+        self.run_worker(
+            lambda: self._load_equity_history(property_id),
+            thread=True,
+            group="equity-history",
+            exclusive=True,
+        )
+
+    def _load_equity_history(self, property_id: int) -> None:
+        """Runs in a worker thread, on its own connection; refreshing can record many snapshots."""
+        from finadviser.db.archive import attach_archive
+        from finadviser.db.connection import get_connection
+
+        conn = get_connection(self.config.db_path)
+        try:
+            if self.config.archive_path.exists():
+                attach_archive(conn, self.config.archive_path)
+            snapshots = EquitySnapshots(conn, self.config.equity_snapshot_cadence)
+            recorded = snapshots.refresh()
+            history = snapshots.history(property_id=property_id, refresh=False)
+        except Exception as e:
+            self.app.call_from_thread(self.notify, f"Equity history failed: {e}", severity="error")
+            return
+        finally:
+            conn.close()
+        if recorded:
+            # Screens watching other tables need not reload for this commit
+            self.app.call_from_thread(mark_committed_elsewhere, self.conn, "equity_snapshots")
+        self.app.call_from_thread(self._fill_equity_history, property_id, history)
+
+    def _fill_equity_history(self, property_id: int, history: list[dict], points: int = 12) -> None:
+        """Owner equity at the most recent snapshot dates, newest first."""
+        if property_id != self._selected_property_id:
+            return
+        currency = self.config.currency_symbol
+        by_date: dict[str, dict[str, float]] = {}
+        for row in history:
+            by_date.setdefault(row["snapshot_date"], {})[row["owner_name"]] = row["equity_amount"]
+        owners = sorted({name for amounts in by_date.values() for name in amounts})
+
+        table = self.query_one("#equity-history-table", DataTable)
+        table.clear(columns=True)
+        if not by_date:
+            return
+        table.add_columns("Date", *owners)
+        for snapshot_date in sorted(by_date, reverse=True)[:points]:
+            amounts = by_date[snapshot_date]
+            table.add_row(
+                snapshot_date,
+                *(format_currency(amounts[o], currency) if o in amounts else "-" for o in owners),
+            )
+
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "add-property-btn":
             self.app.push_screen(AddPropertyModal(self.conn, self.config, self._refresh_property_list))
@@ -148,6 +212,8 @@ class PropertiesScreen(Screen):
             self.app.push_screen(
                 AddValuationModal(self.conn, self.config, self._selected_property_id, lambda: self._show_property_detail(self._selected_property_id))
             )
+        elif event.button.id == "remortgage-btn" and self._selected_property_id:
+            self.app.push_screen(RemortgageModal(self.conn, self.config, self._selected_property_id))
         elif event.button.id == "ai-equity-btn" and self._selected_property_id:
             self._run_ai_equity_report()
 
@@ -180,6 +246,7 @@ class AddPropertyModal(Screen):
             Input(placeholder="Address", id="prop-address"),
             Input(placeholder="Purchase date (YYYY-MM-DD)", id="prop-date"),
             Input(placeholder="Purchase price", id="prop-price"),
+            Input(placeholder="House price index region (optional)", id="prop-region"),
             Horizontal(
                 Button("Save", id="save-btn", variant="success"),
                 Button("Cancel", id="cancel-btn", variant="default"),
@@ -208,6 +275,7 @@ class AddPropertyModal(Screen):
             "address": self.query_one("#prop-address", Input).value.strip() or None,
             "purchase_date": self.query_one("#prop-date", Input).value.strip() or None,
             "purchase_price": price,
+            "region": self.query_one("#prop-region", Input).value.strip() or None,
         }
 
         repo = PropertyRepo(self.conn)
@@ -265,3 +333,70 @@ class AddValuationModal(Screen):
         if self.on_complete:
             self.on_complete()
         self.app.pop_screen()
+
+
+class RemortgageModal(Screen):
+    """Modal ranking remortgage products for one of a property's mortgages."""
+
+    PRODUCTS_HEADER = "name,rate,fixed_months,follow_on_rate,arrangement_fee,fee_added_to_loan,erc_pct\n"
+
+    def __init__(self, conn: sqlite3.Connection, config: AppConfig, property_id: int, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.conn = conn
+        self.config = config
+        self.property_id = property_id
+
+    def compose(self) -> ComposeResult:
+        mortgages = PropertyRepo(self.conn).get_mortgages(self.property_id)
+        yield Vertical(
+            Static("[bold]Compare Remortgage[/bold]", classes="section-title"),
+            Select(
+                [(f"{m['lender']} (from {m['start_date']})", m["id"]) for m in mortgages],
+                id="remortgage-mortgage",
+                prompt="Mortgage",
+            ),
+            TextArea(self.PRODUCTS_HEADER, id="remortgage-products"),
+            Input(placeholder="Early repayment charge on the current deal", id="remortgage-erc"),
+            Horizontal(
+                Button("Compare", id="compare-btn", variant="success"),
+                Button("Close", id="cancel-btn", variant="default"),
+            ),
+            Static("", id="modal-status"),
+            DataTable(id="remortgage-table"),
+            classes="wizard-step",
+        )
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "cancel-btn":
+            self.app.pop_screen()
+        elif event.button.id == "compare-btn":
+            self._compare()
+
+    def _compare(self) -> None:
+        status = self.query_one("#modal-status", Static)
+        mortgage_id = self.query_one("#remortgage-mortgage", Select).value
+        if mortgage_id == Select.BLANK:
+            status.update("[red]Choose a mortgage[/red]")
+            return
+
+        erc = self.query_one("#remortgage-erc", Input).value.strip() or "0"
+        try:
+            products = parse_products(self.query_one("#remortgage-products", TextArea).text)
+            result = RemortgageEngine(self.conn).compare(mortgage_id, products, current_erc=Decimal(erc))
+        except (ValueError, ArithmeticError) as e:
+            status.update(f"[red]{e}[/red]")
+            return
+
+        currency = self.config.currency_symbol
+        status.update(f"Over {len(result.dates)} months from {result.as_of}")
+        table = self.query_one("#remortgage-table", DataTable)
+        table.clear(columns=True)
+        table.add_columns("#", "Product", "Payment", "Interest", "Fees", "ERC", "Total Cost", "Equity")
+        for row in result.summary:
+            table.add_row(
+                str(row["rank"]),
+                row["name"],
+                *(format_currency(row[k], currency) for k in (
+                    "initial_payment", "interest", "fees", "erc", "total_cost", "end_equity",
+                )),
+            )
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import sqlite3
+from pathlib import Path
 
 from textual.app import ComposeResult
 from textual.containers import Vertical
@@ -50,7 +51,10 @@ class SettingsScreen(Screen):
                 Static(f"Bank Configs: {self.config.bank_configs_dir}"),
                 Static(f"Data Directory: {self.config.data_dir}"),
                 Button("Export Data (CSV)", id="export-csv-btn", variant="default"),
-                Button("Export Data (JSON)", id="export-json-btn", variant="default"),
+                Button("Export Data (NDJSON)", id="export-ndjson-btn", variant="default"),
+                Button("Export Data (CSV, gzip)", id="export-csv-gz-btn", variant="default"),
+                Static(f"Backups: {self.config.backup_dir} (keeping {self.config.backup_keep})"),
+                Button("Back Up Now", id="backup-btn", variant="default"),
                 classes="settings-group",
             ),
 
@@ -65,46 +69,56 @@ class SettingsScreen(Screen):
         )
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
-        if event.button.id == "export-csv-btn":
-            self._export_csv()
-        elif event.button.id == "export-json-btn":
-            self._export_json()
-
-    def _export_csv(self) -> None:
-        import csv
-        from pathlib import Path
-
-        from finadviser.db.repositories import JournalRepo
-
-        repo = JournalRepo(self.conn)
-        entries = repo.list_entries(limit=10000)
-
-        export_path = self.config.data_dir / "export.csv"
-        with open(export_path, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=["id", "date", "description", "category_name", "entries_summary"])
-            writer.writeheader()
-            for entry in entries:
-                writer.writerow({
-                    "id": entry.get("id"),
-                    "date": entry.get("date"),
-                    "description": entry.get("description"),
-                    "category_name": entry.get("category_name", ""),
-                    "entries_summary": entry.get("entries_summary", ""),
-                })
-
-        self.notify(f"Exported to {export_path}")
-
-    def _export_json(self) -> None:
-        import json
-        from pathlib import Path
-
-        from finadviser.db.repositories import JournalRepo
-
-        repo = JournalRepo(self.conn)
-        entries = repo.list_entries(limit=10000)
-
-        export_path = self.config.data_dir / "export.json"
-        with open(export_path, "w") as f:
-            json.dump(entries, f, indent=2, default=str)
-
-        self.notify(f"Exported to {export_path}")
+        filenames = {
+            "export-csv-btn": "export.csv",
+            "export-ndjson-btn": "export.ndjson",
+            "export-csv-gz-btn": "export.csv.gz",
+        }
+        if event.button.id in filenames:
+            export_path = self.config.data_dir / filenames[event.button.id]
+            self.notify("Export started")
+            self.run_worker(
+                lambda: self._export(export_path),
+                thread=True,
+                group="export",
+                exclusive=True,
+            )
+        elif event.button.id == "backup-btn":
+            self.notify("Backup started")
+            self.run_worker(self._backup, thread=True, group="backup", exclusive=True)
+
+    def _export(self, export_path: Path) -> None:
+        """Runs in a worker thread, on its own connection."""
+        from finadviser.db.archive import attach_archive
+        from finadviser.db.connection import get_connection
+        from finadviser.exporting.ledger_export import LedgerExporter
+
+        conn = get_connection(self.config.db_path)
+        try:
+            if self.config.archive_path.exists():
+                attach_archive(conn, self.config.archive_path)
+            count = LedgerExporter(conn).export(export_path)
+        except Exception as e:
+            self.app.call_from_thread(self.notify, f"Export failed: {e}", severity="error")
+            return
+        finally:
+            conn.close()
+        self.app.call_from_thread(self.notify, f"Exported {count} journals to {export_path}")
+
+    def _backup(self) -> None:
+        """Runs in a worker thread; the backup API copies a few pages at a time."""
+        from finadviser.db.archive import attach_archive
+        from finadviser.db.backup import BackupManager
+        from finadviser.db.connection import get_connection
+
+        conn = get_connection(self.config.db_path)
+        try:
+            if self.config.archive_path.exists():
+                attach_archive(conn, self.config.archive_path)
+            snapshot = BackupManager(self.config.backup_dir, keep=self.config.backup_keep).backup(conn)
+        except Exception as e:
+            self.app.call_from_thread(self.notify, f"Backup failed: {e}", severity="error")
+            return
+        finally:
+            conn.close()
+        self.app.call_from_thread(self.notify, f"Backed up to {snapshot.name}")
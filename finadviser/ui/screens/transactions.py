@@ -10,6 +10,7 @@ from textual.screen import Screen
 from textual.widgets import Input, Select, Static
 
 from finadviser.config import AppConfig
+from finadviser.db.changes import ChangeTracker
 from finadviser.db.repositories import AccountRepo, CategoryRepo
 from finadviser.ui.widgets.transaction_table import TransactionTable
 
@@ -21,6 +22,7 @@ class TransactionsScreen(Screen):
         super().__init__(**kwargs)
         self.conn = conn
         self.config = config
+        self._changes = ChangeTracker(conn, ("accounts", "categories", "journal_entries", "book_entries"))
 
     def compose(self) -> ComposeResult:
         yield Vertical(
@@ -40,29 +42,30 @@ class TransactionsScreen(Screen):
                 ),
                 id="filter-bar",
             ),
-            TransactionTable(self.conn, self.config.currency_symbol, id="main-txn-table"),
+            TransactionTable(self.conn, self.config.currency_symbol, show_balance=True, id="main-txn-table"),
             id="transactions-container",
         )
 
     def on_screen_resume(self) -> None:
+        if not self._changes.changed():
+            return
         table = self.query_one("#main-txn-table", TransactionTable)
         table.refresh_data()
 
     def on_input_submitted(self, event: Input.Submitted) -> None:
         if event.input.id == "search-bar":
-            table = self.query_one("#main-txn-table", TransactionTable)
-            query = event.value.strip()
-            if query:
-                table.refresh_data(search_query=query)
-            else:
-                table.refresh_data()
+            self._apply_filters()
 
     def on_select_changed(self, event: Select.Changed) -> None:
+        self._apply_filters()
+
+    def _apply_filters(self) -> None:
         table = self.query_one("#main-txn-table", TransactionTable)
+        query = self.query_one("#search-bar", Input).value.strip()
         cat_select = self.query_one("#category-filter", Select)
         acc_select = self.query_one("#account-filter", Select)
 
         cat_id = cat_select.value if cat_select.value != Select.BLANK else None
         acc_id = acc_select.value if acc_select.value != Select.BLANK else None
 
-        table.refresh_data(category_id=cat_id, account_id=acc_id)
+        table.refresh_data(category_id=cat_id, account_id=acc_id, search_query=query or None)
@@ -9,7 +9,6 @@ from textual.app import ComposeResult
 from textual.widgets import Static
 
 from finadviser.db.models import AccountType
-from finadviser.db.repositories import AccountRepo
 from finadviser.utils.formatting import format_currency
 
 
@@ -21,12 +20,10 @@ class NetWorthCard(Static):
         self.conn = conn
         self.currency = currency
 
-    def on_mount(self) -> None:
-        self.refresh_data()
-
     def refresh_data(self) -> None:
-        repo = AccountRepo(self.conn)
-        balances = repo.get_balances()
+        from finadviser.db.ledger_cache import LedgerCache
+
+        balances = LedgerCache.for_connection(self.conn).account_balances()
 
         assets = sum(
             (b.balance for b in balances if b.account_type == AccountType.ASSET),
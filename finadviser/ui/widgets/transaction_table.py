@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import sqlite3
 
+from textual.binding import Binding
 from textual.widgets import DataTable
 
 from finadviser.db.repositories import JournalRepo
@@ -13,14 +14,28 @@ from finadviser.utils.formatting import format_currency
 class TransactionTable(DataTable):
     """Displays a table of journal entries with their amounts."""
 
-    def __init__(self, conn: sqlite3.Connection, currency: str = "$", **kwargs) -> None:
+    BINDINGS = [
+        Binding("]", "next_page", "Older", show=True),
+        Binding("[", "prev_page", "Newer", show=True),
+    ]
+
+    def __init__(
+        self, conn: sqlite3.Connection, currency: str = "$", show_balance: bool = False, **kwargs
+    ) -> None:
         super().__init__(**kwargs)
         self.conn = conn
         self.currency = currency
+        self.show_balance = show_balance
         self.journal_repo = JournalRepo(conn)
+        self._filters: dict = {}
+        self._limit = 100
+        self._next_cursor: str | None = None
+        self._prev_cursor: str | None = None
 
     def on_mount(self) -> None:
         self.add_columns("Date", "Description", "Category", "Amount")
+        if self.show_balance:
+            self.add_column("Balance")
         self.refresh_data()
 
     def refresh_data(
@@ -32,46 +47,49 @@ class TransactionTable(DataTable):
         search_query: str | None = None,
         limit: int = 100,
     ) -> None:
-        self.clear()
+        self._next_cursor = self._prev_cursor = None
 
         if search_query:
-            entries = self.journal_repo.search(search_query, limit=limit)
-        else:
-            entries = self.journal_repo.list_entries(
-                start_date=start_date,
-                end_date=end_date,
-                category_id=category_id,
-                account_id=account_id,
-                limit=limit,
-            )
+            self._filters = {}
+            self._show(self.journal_repo.search(
+                search_query, limit=limit, category_id=category_id, account_id=account_id
+            ))
+            return
+
+        self._filters = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "category_id": category_id,
+            "account_id": account_id,
+        }
+        self._limit = limit
+        self._load_page(None)
+
+    def action_next_page(self) -> None:
+        if self._next_cursor:
+            self._load_page(self._next_cursor)
+
+    def action_prev_page(self) -> None:
+        if self._prev_cursor:
+            self._load_page(self._prev_cursor)
+
+    def _load_page(self, cursor: str | None) -> None:
+        page = self.journal_repo.list_entries_page(**self._filters, cursor=cursor, limit=self._limit)
+        self._next_cursor = page.next_cursor
+        self._prev_cursor = page.prev_cursor
+        self._show(page.entries)
+
+    def _show(self, entries: list[dict]) -> None:
+        self.clear()
 
         for entry in entries:
-            amount = self._extract_amount(entry.get("entries_summary", ""))
+            amount = entry.get("primary_amount")
             category = entry.get("category_name") or "Uncategorized"
             amount_str = format_currency(amount, self.currency) if amount else "-"
+            cells = [entry.get("date", ""), entry.get("description", ""), category, amount_str]
+
+            if self.show_balance:
+                balance = entry.get("running_balance")
+                cells.append(format_currency(balance, self.currency) if balance is not None else "-")
 
-            self.add_row(
-                entry.get("date", ""),
-                entry.get("description", ""),
-                category,
-                amount_str,
-                key=str(entry.get("id", "")),
-            )
-
-    def _extract_amount(self, entries_summary: str) -> float | None:
-        """Extract the primary amount from the entries summary.
-
-        The summary format is: "AccountName:amount|AccountName:amount"
-        We look for the ASSET account's amount as the display value.
-        """
-        if not entries_summary:
-            return None
-
-        for part in entries_summary.split("|"):
-            if ":" in part:
-                _, amt = part.rsplit(":", 1)
-                try:
-                    return float(amt)
-                except ValueError:
-                    continue
-        return None
+            self.add_row(*cells, key=str(entry.get("id", "")))
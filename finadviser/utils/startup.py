@@ -0,0 +1,41 @@
+"""Startup timing marks, reported by ``finadviser --startup-profile``."""
+
+from __future__ import annotations
+
+import sys
+import time
+
+# Modules worth keeping off the path to the first frame
+HEAVY_MODULES = ("numpy", "pandas", "anthropic", "yaml")
+
+_t0: float | None = None
+_marks: list[tuple[str, float, list[str]]] = []
+
+
+def enable(t0: float) -> None:
+    """Start recording; ``t0`` is a ``time.perf_counter()`` taken at launch."""
+    global _t0
+    _t0 = t0
+    _marks.clear()
+
+
+def mark(label: str) -> None:
+    """Record that startup reached ``label``. A no-op unless enabled."""
+    if _t0 is None:
+        return
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+    _marks.append((label, time.perf_counter() - _t0, loaded))
+
+
+def report() -> str:
+    lines = ["STARTUP PROFILE", f"{'ms':>8} {'+ms':>8}  milestone"]
+    previous = 0.0
+    for label, at, _ in _marks:
+        lines.append(f"{at * 1000:8.1f} {(at - previous) * 1000:8.1f}  {label}")
+        previous = at
+    if _marks:
+        label, _, loaded = next(
+            (m for m in _marks if m[0] == "first dashboard frame"), _marks[-1]
+        )
+        lines.append(f"Heavy modules loaded by '{label}': {', '.join(loaded) or 'none'}")
+    return "\n".join(lines)
@@ -0,0 +1,126 @@
+"""Tests for online backup and restore."""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from finadviser.db.archive import attach_archive
+from finadviser.db.backup import BackupManager, archive_snapshot
+from finadviser.db.connection import get_connection, initialize_database
+from finadviser.db.models import BookEntry, JournalEntry
+from finadviser.db.period_close import PeriodCloser
+from finadviser.db.repositories import AccountRepo, JournalRepo
+
+
+def _post(conn, when: date, amount: str) -> None:
+    accounts = [a.id for a in AccountRepo(conn).list_all()[:2]]
+    JournalRepo(conn).create_entry(
+        JournalEntry(date=when, description="Transfer"),
+        [
+            BookEntry(journal_entry_id=0, account_id=accounts[0], amount=Decimal(amount)),
+            BookEntry(journal_entry_id=0, account_id=accounts[1], amount=-Decimal(amount)),
+        ],
+    )
+
+
+@pytest.fixture
+def live(tmp_path):
+    conn = get_connection(tmp_path / "live.db")
+    initialize_database(conn)
+    for month in range(1, 13):
+        _post(conn, date(2024, month, 1), "10")
+    yield conn
+    conn.close()
+
+
+def _journal_count(path) -> int:
+    conn = get_connection(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_backup_while_open_and_restore(live, tmp_path):
+    manager = BackupManager(tmp_path / "backups", pages=1)
+    steps = []
+
+    snapshot = manager.backup(live, progress=lambda remaining, total: steps.append(remaining))
+
+    assert snapshot.exists() and not list(snapshot.parent.glob("*.partial*"))
+    assert len(steps) > 1 and steps[-1] == 0
+    manager.verify(snapshot)
+
+    _post(live, date(2025, 1, 1), "99")
+    live.close()
+    manager.restore(snapshot, tmp_path / "live.db")
+
+    assert _journal_count(tmp_path / "live.db") == 12
+
+
+def test_rotation_keeps_newest(live, tmp_path):
+    manager = BackupManager(tmp_path / "backups", keep=2)
+
+    taken = [manager.backup(live) for _ in range(4)]
+
+    assert manager.snapshots() == taken[-2:]
+
+
+def test_archive_snapshotted_alongside(live, tmp_path):
+    attach_archive(live, tmp_path / "archive.db")
+    PeriodCloser(live).close_year(2024)
+    manager = BackupManager(tmp_path / "backups")
+
+    snapshot = manager.backup(live)
+
+    assert archive_snapshot(snapshot).exists()
+    manager.verify(archive_snapshot(snapshot))
+
+
+def test_verify_rejects_corrupt_snapshot(tmp_path):
+    bad = tmp_path / "finadviser-bad.db"
+    bad.write_bytes(b"not a database" * 100)
+
+    with pytest.raises(ValueError):
+        BackupManager(tmp_path).verify(bad)
+    with pytest.raises(ValueError, match="No such snapshot"):
+        BackupManager(tmp_path).verify(tmp_path / "missing.db")
+
+
+def test_restore_without_archive_moves_the_live_one_aside(live, tmp_path):
+    manager = BackupManager(tmp_path / "backups", pages=1)
+    snapshot = manager.backup(live)
+    archive = tmp_path / "archive.db"
+    attach_archive(live, archive)
+    PeriodCloser(live).close_year(2024)
+    live.close()
+
+    steps = []
+    moved = manager.restore(snapshot, tmp_path / "live.db", archive_path=archive,
+                            progress=lambda remaining, total: steps.append((remaining, total)))
+
+    assert not archive.exists()
+    assert moved.exists() and moved.name.startswith("archive-before-restore-")
+    assert _journal_count(tmp_path / "live.db") == 12
+    assert steps[-1][0] == 0
+
+
+def test_progress_runs_across_main_and_archive(live, tmp_path):
+    attach_archive(live, tmp_path / "archive.db")
+    PeriodCloser(live).close_year(2024)
+    manager = BackupManager(tmp_path / "backups", pages=1)
+    backup_steps, restore_steps = [], []
+
+    snapshot = manager.backup(live, progress=lambda remaining, total: backup_steps.append((remaining, total)))
+    live.close()
+    manager.restore(snapshot, tmp_path / "live.db", archive_path=tmp_path / "archive.db",
+                    progress=lambda remaining, total: restore_steps.append((remaining, total)))
+
+    for steps in (backup_steps, restore_steps):
+        done = [total - remaining for remaining, total in steps]
+        assert done == sorted(done)
+        assert len({total for _, total in steps}) == 1
+        assert steps[-1][0] == 0
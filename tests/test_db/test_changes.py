@@ -0,0 +1,82 @@
+"""Tests for change tracking."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+from finadviser.db.changes import ChangeTracker, mark_committed_elsewhere
+from finadviser.db.connection import get_connection, initialize_database
+from finadviser.db.models import BookEntry, JournalEntry
+from finadviser.db.repositories import AccountRepo, ConversationRepo, JournalRepo
+
+
+def _post(conn: sqlite3.Connection) -> None:
+    accounts = [a.id for a in AccountRepo(conn).list_all()[:2]]
+    JournalRepo(conn).create_entry(
+        JournalEntry(date=date(2025, 1, 1), description="Coffee"),
+        [
+            BookEntry(journal_entry_id=0, account_id=accounts[0], amount=Decimal("3")),
+            BookEntry(journal_entry_id=0, account_id=accounts[1], amount=Decimal("-3")),
+        ],
+    )
+
+
+def test_own_writes_to_watched_tables(db: sqlite3.Connection):
+    ledger = ChangeTracker(db, ("journal_entries", "book_entries"))
+    chats = ChangeTracker(db, ("ai_conversations",))
+    assert ledger.changed() and chats.changed()
+    assert not ledger.changed() and not chats.changed()
+
+    _post(db)
+
+    assert ledger.changed()
+    assert not chats.changed()
+
+    ConversationRepo(db).create_conversation("Budget")
+
+    assert chats.changed()
+    assert not ledger.changed()
+
+
+def test_commits_from_other_connections(tmp_path):
+    path = tmp_path / "shared.db"
+    app = get_connection(path)
+    initialize_database(app)
+    tracker = ChangeTracker(app, ("journal_entries",))
+    tracker.changed()
+
+    cli = get_connection(path)
+    _post(cli)
+    cli.close()
+
+    assert tracker.changed()
+    assert not tracker.changed()
+    app.close()
+
+
+def test_claimed_commits_from_a_worker_connection(tmp_path):
+    path = tmp_path / "shared.db"
+    app = get_connection(path)
+    initialize_database(app)
+    ledger = ChangeTracker(app, ("journal_entries",))
+    snapshots = ChangeTracker(app, ("equity_snapshots",))
+    ledger.changed(), snapshots.changed()
+
+    worker = get_connection(path)
+    worker.execute("DELETE FROM equity_snapshots")
+    worker.commit()
+    worker.close()
+    mark_committed_elsewhere(app, "equity_snapshots")
+
+    assert snapshots.changed()
+    assert not ledger.changed()
+    app.close()
+
+
+def test_plain_connection_always_changed():
+    conn = sqlite3.connect(":memory:")
+    tracker = ChangeTracker(conn, ("journal_entries",))
+
+    assert tracker.changed() and tracker.changed()
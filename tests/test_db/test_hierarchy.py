@@ -0,0 +1,151 @@
+"""Tests for account and category closure tables."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from finadviser.analysis.data_preparer import DataPreparer
+from finadviser.config import AppConfig
+from finadviser.db.ledger_cache import LedgerCache
+from finadviser.db.models import Account, AccountType, BookEntry, Category, JournalEntry
+from finadviser.db.repositories import AccountRepo, CategoryRepo, JournalRepo
+from finadviser.db.schema import MIGRATIONS
+
+
+def _closure(db: sqlite3.Connection, table: str) -> set[tuple]:
+    return set(map(tuple, db.execute(f"SELECT ancestor_id, descendant_id, depth FROM {table}")))
+
+
+@pytest.fixture
+def housing(db: sqlite3.Connection) -> dict[str, int]:
+    """Housing > (Utilities > Energy, Repairs), with spending in each."""
+    categories = CategoryRepo(db)
+    ids = {"Housing": categories.create(Category(name="Housing"))}
+    ids["Bills"] = categories.create(Category(name="Bills", parent_id=ids["Housing"]))
+    ids["Energy"] = categories.create(Category(name="Energy", parent_id=ids["Bills"]))
+    ids["Repairs"] = categories.create(Category(name="Repairs", parent_id=ids["Housing"]))
+
+    accounts = AccountRepo(db)
+    bank = accounts.get_by_name("Bank").id
+    expense = accounts.get_by_name("Uncategorized Expense").id
+    for name, amount in [("Housing", "100"), ("Bills", "20"), ("Energy", "75"), ("Repairs", "40")]:
+        JournalRepo(db).create_entry(
+            JournalEntry(date=date(2025, 4, 1), description=name, category_id=ids[name]),
+            [
+                BookEntry(journal_entry_id=0, account_id=expense, amount=Decimal(amount)),
+                BookEntry(journal_entry_id=0, account_id=bank, amount=-Decimal(amount)),
+            ],
+        )
+    return ids
+
+
+def test_category_subtree_and_rollup(db: sqlite3.Connection, housing):
+    categories = CategoryRepo(db)
+    journals = JournalRepo(db)
+
+    assert [c.name for c in categories.get_subtree(housing["Housing"])] == ["Housing", "Bills", "Repairs", "Energy"]
+    assert [c.name for c in categories.get_ancestors(housing["Energy"])] == ["Housing", "Bills"]
+
+    totals = {r["category_name"]: r["total"] for r in journals.get_category_rollup()}
+    assert totals["Housing"] == 235
+    assert totals["Bills"] == 95
+    assert totals["Energy"] == 75
+
+    listed = journals.list_entries(category_id=housing["Bills"])
+    assert {e["description"] for e in listed} == {"Bills", "Energy"}
+
+
+def test_move_rewires_subtree(db: sqlite3.Connection, housing):
+    categories = CategoryRepo(db)
+    utilities = categories.get_by_name("Utilities").id
+
+    categories.move(housing["Bills"], utilities)
+
+    assert [c.name for c in categories.get_ancestors(housing["Energy"])] == ["Utilities", "Bills"]
+    totals = {r["category_name"]: r["total"] for r in JournalRepo(db).get_category_rollup()}
+    assert totals["Housing"] == 140
+    assert totals["Utilities"] == 95
+
+    with pytest.raises(sqlite3.IntegrityError, match="under itself"):
+        categories.move(utilities, housing["Energy"])
+    with pytest.raises(sqlite3.IntegrityError, match="under itself"):
+        categories.move(utilities, utilities)
+
+
+def test_account_rollup_balances(db: sqlite3.Connection):
+    accounts = AccountRepo(db)
+    savings = accounts.create(Account(name="Savings", account_type=AccountType.ASSET))
+    isa = accounts.create(Account(name="ISA", account_type=AccountType.ASSET, parent_id=savings))
+    bank = accounts.get_by_name("Bank").id
+    accounts.move(bank, savings)
+    income = accounts.get_by_name("Uncategorized Income").id
+
+    for when, account, amount in [(date(2025, 1, 5), bank, "300"), (date(2025, 2, 5), isa, "200")]:
+        JournalRepo(db).create_entry(
+            JournalEntry(date=when, description="Pay"),
+            [
+                BookEntry(journal_entry_id=0, account_id=account, amount=Decimal(amount)),
+                BookEntry(journal_entry_id=0, account_id=income, amount=-Decimal(amount)),
+            ],
+        )
+
+    rollup = {b.account_id: b.balance for b in accounts.get_rollup_balances()}
+    assert rollup[savings] == Decimal("500")
+    assert rollup[isa] == Decimal("200")
+    assert accounts.get_subtree_balance(savings) == Decimal("500")
+    assert accounts.get_subtree_balance(savings, as_of=date(2025, 1, 31)) == Decimal("300")
+
+
+def test_ledger_cache_rollups_match_sql(db: sqlite3.Connection, housing):
+    accounts = AccountRepo(db)
+    savings = accounts.create(Account(name="Savings", account_type=AccountType.ASSET))
+    accounts.move(accounts.get_by_name("Bank").id, savings)
+    cache = LedgerCache(db)
+
+    def by_key(rows):
+        return {(r["month"], r["category_id"]): round(r["total"], 2) for r in rows}
+
+    rollup = by_key(cache.monthly_spending(rollup=True))
+    assert rollup == by_key(JournalRepo(db).get_monthly_spending(rollup=True))
+    assert rollup[("2025-04", housing["Housing"])] == 235
+    assert {b.account_id: b.balance for b in cache.account_balances(rollup=True)} == {
+        b.account_id: b.balance for b in accounts.get_rollup_balances()
+    }
+
+
+def test_data_preparer_reports_rollups(db: sqlite3.Connection, housing, config: AppConfig):
+    context = DataPreparer(db, config).prepare_context("What am I spending on?")
+
+    assert "    Housing: $235.00" in context
+    assert "    Bills: $95.00" in context
+
+
+async def test_dashboard_ranks_top_level_categories(db: sqlite3.Connection, housing, config: AppConfig):
+    from textual.app import App
+    from textual.widgets import Static
+
+    from finadviser.ui.screens.dashboard import DashboardScreen
+
+    class _Harness(App):
+        def on_mount(self) -> None:
+            self.push_screen(DashboardScreen(db, config))
+
+    app = _Harness()
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        top = str(app.screen.query_one("#top-categories", Static).render())
+
+    assert top.splitlines() == ["Housing: $235.00"]
+
+
+def test_migration_backfills_existing_rows(db: sqlite3.Connection, housing):
+    expected = _closure(db, "category_closure")
+    db.execute("DELETE FROM category_closure")
+
+    db.executescript(MIGRATIONS[3])
+
+    assert _closure(db, "category_closure") == expected
@@ -0,0 +1,141 @@
+"""Tests for the columnar ledger cache."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from finadviser.db.archive import attach_archive
+from finadviser.db.changes import mark_written
+from finadviser.db.ledger_cache import LedgerCache
+from finadviser.db.models import Account, AccountType, BookEntry, JournalEntry
+from finadviser.db.period_close import PeriodCloser
+from finadviser.db.repositories import AccountRepo, CategoryRepo, JournalRepo
+
+
+@pytest.fixture
+def ledger(db: sqlite3.Connection):
+    accounts = AccountRepo(db)
+    bank = accounts.create(Account(name="Test Bank", account_type=AccountType.ASSET))
+    food = accounts.create(Account(name="Test Food", account_type=AccountType.EXPENSE))
+    travel = accounts.create(Account(name="Test Travel", account_type=AccountType.EXPENSE))
+    categories = [c.id for c in CategoryRepo(db).list_all()[:3]] + [None]
+
+    for n in range(60):
+        expense = food if n % 3 else travel
+        amount = Decimal(n * 7 % 90) + Decimal("0.15")
+        _post(db, date(2024, 11, 1) + timedelta(days=n * 5), expense, bank, amount, categories[n % 4])
+    return {"bank": bank, "food": food, "travel": travel}
+
+
+def _post(db, when, debit, credit, amount, category_id=None) -> int:
+    return JournalRepo(db).create_entry(
+        JournalEntry(date=when, description="Spend", category_id=category_id),
+        [
+            BookEntry(journal_entry_id=0, account_id=debit, amount=amount),
+            BookEntry(journal_entry_id=0, account_id=credit, amount=-amount),
+        ],
+    )
+
+
+def _by_id(balances) -> dict[int, Decimal]:
+    return {b.account_id: Decimal(str(round(float(b.balance), 2))) for b in balances}
+
+
+def _spending(rows) -> dict:
+    return {(r["month"], r["category_name"]): round(r["total"], 2) for r in rows}
+
+
+def test_matches_sql_reports(db: sqlite3.Connection, ledger):
+    cache = LedgerCache(db)
+
+    assert _by_id(cache.account_balances()) == _by_id(AccountRepo(db).get_balances())
+    assert _spending(cache.monthly_spending()) == _spending(JournalRepo(db).get_monthly_spending())
+
+
+def test_incremental_refresh(db: sqlite3.Connection, ledger):
+    cache = LedgerCache(db)
+    assert cache.refresh() == 120
+    assert cache.refresh() == 0
+
+    _post(db, date(2025, 12, 1), ledger["food"], ledger["bank"], Decimal("12.34"))
+
+    assert cache.refresh() == 2
+    assert cache.sum_by_account()[ledger["bank"]] == int(AccountRepo(db).get_balance(ledger["bank"]) * 100)
+
+
+def test_reload_after_delete(db: sqlite3.Connection, ledger):
+    cache = LedgerCache(db)
+    cache.refresh()
+
+    db.execute("DELETE FROM journal_entries WHERE id = (SELECT MIN(id) FROM journal_entries)")
+    mark_written(db, "journal_entries", "book_entries")
+    db.commit()
+
+    assert cache.refresh() == 118
+    assert _by_id(cache.account_balances()) == _by_id(AccountRepo(db).get_balances())
+
+
+def test_reload_after_in_place_edit(db: sqlite3.Connection, ledger):
+    cache = LedgerCache.for_connection(db)
+    cache.refresh()
+
+    db.execute(
+        "UPDATE book_entries SET account_id = ? WHERE account_id = ? AND id = (SELECT MIN(id) FROM book_entries)",
+        (ledger["travel"], ledger["food"]),
+    )
+    db.execute("UPDATE book_entries SET amount = amount * 2 WHERE journal_entry_id = 2")
+    db.execute("UPDATE journal_entries SET category_id = NULL WHERE id = 3")
+    mark_written(db, "journal_entries", "book_entries")
+    db.commit()
+
+    assert cache.refresh() == 120
+    assert _by_id(cache.account_balances()) == _by_id(AccountRepo(db).get_balances())
+    assert _spending(cache.monthly_spending()) == _spending(JournalRepo(db).get_monthly_spending())
+    assert cache.refresh() == 0
+
+
+def test_cumulative_balance_matches_as_of(db: sqlite3.Connection, ledger):
+    cache = LedgerCache(db)
+    cache.refresh()
+    repo = AccountRepo(db)
+
+    days, balances = cache.cumulative_balance(ledger["bank"])
+
+    assert len(days) == 60
+    for day, balance in list(zip(days.tolist(), balances.tolist()))[::7]:
+        assert Decimal(balance).scaleb(-2) == repo.get_balance(ledger["bank"], as_of=day)
+    assert cache.sum_by_account(as_of=date(2025, 1, 1))[ledger["bank"]] == int(
+        repo.get_balance(ledger["bank"], as_of=date(2025, 1, 1)) * 100
+    )
+
+
+def test_covers_archived_history(db: sqlite3.Connection, ledger, tmp_path):
+    attach_archive(db, tmp_path / "archive.db")
+    cache = LedgerCache(db)
+    before = _spending(cache.monthly_spending())
+
+    PeriodCloser(db).close_year(2024)
+
+    assert _spending(cache.monthly_spending()) == before
+    assert _by_id(cache.account_balances()) == _by_id(AccountRepo(db).get_balances())
+
+
+def test_balances_at_matches_as_of(db: sqlite3.Connection, ledger):
+    cache = LedgerCache(db)
+    cache.refresh()
+    repo = AccountRepo(db)
+    days = np.arange("2024-10-15", "2025-10-15", 17, dtype="datetime64[D]")
+    ids = [ledger["bank"], ledger["travel"], 999_999]
+
+    matrix = cache.balances_at(ids, days)
+
+    assert matrix.shape == (3, len(days))
+    assert not matrix[2].any()
+    for row, account_id in enumerate(ids[:2]):
+        for col, day in enumerate(days.tolist()):
+            assert Decimal(int(matrix[row, col])).scaleb(-2) == repo.get_balance(account_id, as_of=day)
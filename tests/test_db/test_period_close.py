@@ -0,0 +1,157 @@
+"""Tests for year-end close into the archive database."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from finadviser.db.archive import attach_archive
+from finadviser.db.models import Account, AccountType, BookEntry, JournalEntry, TransactionFingerprint
+from finadviser.db.period_close import PeriodCloser
+from finadviser.db.repositories import AccountRepo, FingerprintRepo, JournalRepo, PropertyRepo
+from finadviser.properties.equity_calculator import EquityCalculator
+from finadviser.properties.transfer_engine import TransferEngine
+
+
+@pytest.fixture
+def books(db: sqlite3.Connection, tmp_path):
+    """Three years of spending plus an equity transfer, with an archive attached."""
+    accounts = AccountRepo(db)
+    journals = JournalRepo(db)
+    props = PropertyRepo(db)
+
+    bank = accounts.create(Account(name="Test Bank", account_type=AccountType.ASSET))
+    food = accounts.create(Account(name="Test Food", account_type=AccountType.EXPENSE))
+    funding = accounts.get_or_create("Funding", AccountType.EQUITY)
+
+    for year in (2023, 2024, 2025):
+        for month in (1, 6, 12):
+            journal_id = journals.create_entry(
+                JournalEntry(date=date(year, month, 15), description=f"Groceries {year}-{month}"),
+                [
+                    BookEntry(journal_entry_id=0, account_id=food, amount=Decimal("42.50")),
+                    BookEntry(journal_entry_id=0, account_id=bank, amount=Decimal("-42.50")),
+                ],
+            )
+            FingerprintRepo(db).create(TransactionFingerprint(
+                fingerprint=f"fp-{year}-{month}", account_id=bank, journal_entry_id=journal_id,
+            ))
+
+    owner = props.create_owner("Alice")
+    capital = {}
+    for name in ("Flat", "House"):
+        prop_id = props.create_property({
+            "name": name, "address": name, "purchase_date": "2023-01-01", "purchase_price": 100000,
+        })
+        capital[prop_id] = accounts.create(Account(name=f"Capital - {name}", account_type=AccountType.EQUITY))
+        props.add_ownership(prop_id, owner, capital[prop_id])
+        props.add_valuation(prop_id, 120000, "2023-01-01")
+    flat, house = capital
+    journals.create_entry(
+        JournalEntry(date=date(2023, 1, 1), description="Deposit"),
+        [
+            BookEntry(journal_entry_id=0, account_id=capital[flat], amount=Decimal("30000")),
+            BookEntry(journal_entry_id=0, account_id=funding.id, amount=Decimal("-30000")),
+        ],
+    )
+    transfer_id = TransferEngine(db).transfer_equity(flat, house, owner, Decimal("5000"), date(2023, 6, 1))
+
+    attach_archive(db, tmp_path / "archive.db")
+    return {"bank": bank, "food": food, "properties": (flat, house), "transfer_id": transfer_id}
+
+
+def _snapshot(db: sqlite3.Connection, books) -> dict:
+    return {
+        "balances": {b.account_id: b.balance for b in AccountRepo(db).get_balances()},
+        "spending": JournalRepo(db).get_monthly_spending(),
+        "equity": EquityCalculator(db).calculate_all(),
+    }
+
+
+def test_close_preserves_balances_and_reports(db: sqlite3.Connection, books):
+    before = _snapshot(db, books)
+    closer = PeriodCloser(db)
+
+    first = closer.close_year(2023)
+    second = closer.close_year(2024)
+
+    assert first["journal_count"] == 4  # three groceries and the deposit; the transfer is pinned
+    assert second["journal_count"] == 3
+    assert closer.closed_through() == "2024-12-31"
+    assert _snapshot(db, books) == before
+
+    live = db.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0]
+    archived = db.execute("SELECT COUNT(*) FROM archive.journal_entries").fetchone()[0]
+    assert (live, archived) == (5, 7)  # 2025, the pinned transfer and the opening journal
+    assert JournalRepo(db).get_entry(books["transfer_id"]) is not None
+
+
+def test_as_of_balance_reads_archive(db: sqlite3.Connection, books):
+    repo = AccountRepo(db)
+    expected = {d: repo.get_balance(books["bank"], as_of=d) for d in (date(2023, 7, 1), date(2024, 12, 31))}
+
+    PeriodCloser(db).close_year(2024)
+
+    for as_of, balance in expected.items():
+        assert repo.get_balance(books["bank"], as_of=as_of) == balance
+    assert repo.get_balance(books["bank"]) == Decimal("-382.50")
+
+
+def test_closed_period_rejects_backdated_entries(db: sqlite3.Connection, books):
+    PeriodCloser(db).close_year(2023)
+
+    with pytest.raises(sqlite3.IntegrityError, match="closed period"):
+        JournalRepo(db).create_entry(
+            JournalEntry(date=date(2023, 3, 1), description="Late receipt"),
+            [
+                BookEntry(journal_entry_id=0, account_id=books["food"], amount=Decimal("5")),
+                BookEntry(journal_entry_id=0, account_id=books["bank"], amount=Decimal("-5")),
+            ],
+        )
+    with pytest.raises(ValueError, match="already closed"):
+        PeriodCloser(db).close_year(2023)
+
+
+def test_closed_period_rejects_redating(db: sqlite3.Connection, books):
+    PeriodCloser(db).close_year(2023)
+    live = db.execute("SELECT id FROM journal_entries WHERE date = '2024-01-15'").fetchone()["id"]
+
+    with pytest.raises(sqlite3.IntegrityError, match="closed period"):
+        db.execute("UPDATE journal_entries SET date = '2023-12-01' WHERE id = ?", (live,))
+    db.execute("UPDATE journal_entries SET date = '2024-02-01' WHERE id = ?", (live,))
+
+
+def test_fingerprints_found_in_archive(db: sqlite3.Connection, books):
+    PeriodCloser(db).close_year(2024)
+
+    fingerprints = FingerprintRepo(db)
+    assert fingerprints.exists("fp-2023-6", books["bank"])
+    assert fingerprints.exists("fp-2025-6", books["bank"])
+    assert not fingerprints.exists("fp-2026-1", books["bank"])
+
+
+def test_close_requires_archive(db: sqlite3.Connection):
+    with pytest.raises(ValueError, match="Attach the archive"):
+        PeriodCloser(db).close_year(2023)
+
+
+def test_multi_leg_journal_balances(db: sqlite3.Connection):
+    accounts = AccountRepo(db)
+    ids = [
+        accounts.create(Account(name=f"Leg {n}", account_type=AccountType.ASSET))
+        for n in range(3)
+    ]
+
+    JournalRepo(db).create_entry(
+        JournalEntry(date=date(2025, 1, 1), description="Split"),
+        [
+            BookEntry(journal_entry_id=0, account_id=ids[0], amount=Decimal("-100")),
+            BookEntry(journal_entry_id=0, account_id=ids[1], amount=Decimal("60")),
+            BookEntry(journal_entry_id=0, account_id=ids[2], amount=Decimal("40")),
+        ],
+    )
+
+    assert [accounts.get_balance(i) for i in ids] == [Decimal("-100"), Decimal("60"), Decimal("40")]
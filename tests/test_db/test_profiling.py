@@ -0,0 +1,69 @@
+"""Tests for SQL profiling."""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from finadviser.db import profiling
+from finadviser.db.connection import Connection, get_connection, initialize_database
+from finadviser.db.models import BookEntry, JournalEntry
+from finadviser.db.profiling import ProfilingConnection, normalize_sql
+from finadviser.db.repositories import AccountRepo, JournalRepo
+
+
+@pytest.fixture
+def profiled(monkeypatch, tmp_path):
+    monkeypatch.setenv("FINADVISER_PROFILE_SQL", str(tmp_path / "profile.txt"))
+    monkeypatch.setenv("FINADVISER_SLOW_QUERY_MS", "0")
+    monkeypatch.setattr(profiling, "_profiler", None)
+    monkeypatch.setattr(profiling.atexit, "register", lambda *args: None)
+    conn = get_connection()
+    initialize_database(conn)
+    yield conn
+    conn.close()
+
+
+def test_off_by_default(monkeypatch):
+    monkeypatch.delenv("FINADVISER_PROFILE_SQL", raising=False)
+    conn = get_connection()
+    assert type(conn) is Connection
+
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT *  FROM t\n WHERE a = 'x' AND b IN (1, 2, 3) AND c > 4.5") == (
+        "SELECT * FROM t WHERE a = ? AND b IN (?, ...) AND c > ?"
+    )
+
+
+def test_records_statements_and_slow_plans(profiled, tmp_path):
+    assert isinstance(profiled, ProfilingConnection)
+    accounts = [a.id for a in AccountRepo(profiled).list_all()[:2]]
+    for n in range(3):
+        JournalRepo(profiled).create_entry(
+            JournalEntry(date=date(2025, 1, n + 1), description="Lunch"),
+            [
+                BookEntry(journal_entry_id=0, account_id=accounts[0], amount=Decimal("8")),
+                BookEntry(journal_entry_id=0, account_id=accounts[1], amount=Decimal("-8")),
+            ],
+        )
+    JournalRepo(profiled).list_entries(limit=10)
+
+    stats = profiled.profiler.stats
+    insert = next(s for s in stats.values() if s.sql.startswith("INSERT INTO book_entries"))
+    # One executemany per journal, covering both legs
+    assert insert.calls == 3
+    assert insert.rows == 6
+    assert any("repositories.py" in site and "create_entries" in site for site in insert.sites)
+
+    listing = next(s for s in stats.values() if "primary_amount" in s.sql)
+    assert listing.rows == 3
+
+    report = profiled.profiler.report()
+    assert "SLOW QUERIES" in report
+    assert "PLAN SCAN" in report or "PLAN SEARCH" in report
+
+    profiled.profiler.write_report(tmp_path / "profile.txt")
+    assert (tmp_path / "profile.txt").read_text() == report
@@ -0,0 +1,320 @@
+"""Tests for repository query APIs."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from finadviser.db.connection import apply_migrations, get_connection, initialize_database, unit_of_work
+from finadviser.db.models import Account, AccountType, BookEntry, JournalEntry
+from finadviser.db.repositories import AccountRepo, JournalRepo
+from finadviser.db.schema import MIGRATIONS
+
+
+@pytest.fixture
+def ledger(db: sqlite3.Connection) -> sqlite3.Connection:
+    """25 expense journals on consecutive days, two per day on even days."""
+    account_repo = AccountRepo(db)
+    journal_repo = JournalRepo(db)
+    bank = account_repo.get_by_name("Bank")
+    expense = account_repo.get_by_name("Uncategorized Expense")
+
+    start = date(2025, 1, 1)
+    for i in range(25):
+        journal_repo.create_entry(
+            JournalEntry(date=start + timedelta(days=i // 2), description=f"Txn {i}"),
+            [
+                BookEntry(journal_entry_id=0, account_id=bank.id, amount=Decimal(-(i + 1))),
+                BookEntry(journal_entry_id=0, account_id=expense.id, amount=Decimal(i + 1)),
+            ],
+        )
+    return db
+
+
+def test_keyset_pages_match_offset_listing(ledger: sqlite3.Connection):
+    repo = JournalRepo(ledger)
+    expected = [e["id"] for e in repo.list_entries(limit=100)]
+
+    seen = []
+    page = repo.list_entries_page(limit=10)
+    assert page.prev_cursor is None
+    while True:
+        seen.extend(e["id"] for e in page.entries)
+        if page.next_cursor is None:
+            break
+        page = repo.list_entries_page(cursor=page.next_cursor, limit=10)
+
+    assert seen == expected
+
+
+def test_keyset_prev_cursor_returns_previous_page(ledger: sqlite3.Connection):
+    repo = JournalRepo(ledger)
+    first = repo.list_entries_page(limit=10)
+    second = repo.list_entries_page(cursor=first.next_cursor, limit=10)
+    back = repo.list_entries_page(cursor=second.prev_cursor, limit=10)
+
+    assert [e["id"] for e in back.entries] == [e["id"] for e in first.entries]
+    assert back.prev_cursor is None
+    assert back.next_cursor is not None
+
+
+def test_keyset_prev_cursor_near_the_top_returns_a_full_page(ledger: sqlite3.Connection):
+    repo = JournalRepo(ledger)
+    top = repo.list_entries_page(limit=4)
+    second = repo.list_entries_page(cursor=top.next_cursor, limit=10)
+    back = repo.list_entries_page(cursor=second.prev_cursor, limit=10)
+
+    first = repo.list_entries_page(limit=10)
+    assert [e["id"] for e in back.entries] == [e["id"] for e in first.entries]
+    assert back.prev_cursor is None
+
+
+def test_keyset_respects_filters(ledger: sqlite3.Connection):
+    repo = JournalRepo(ledger)
+    page = repo.list_entries_page(start_date=date(2025, 1, 11), limit=3)
+    assert all(e["date"] >= "2025-01-11" for e in page.entries)
+    nxt = repo.list_entries_page(start_date=date(2025, 1, 11), cursor=page.next_cursor, limit=3)
+    assert all(e["date"] >= "2025-01-11" for e in nxt.entries)
+    assert nxt.next_cursor is None
+
+
+def test_invalid_cursor_rejected(ledger: sqlite3.Connection):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        JournalRepo(ledger).list_entries_page(cursor="not-a-cursor")
+
+
+@pytest.fixture
+def searchable(db: sqlite3.Connection) -> sqlite3.Connection:
+    account_repo = AccountRepo(db)
+    journal_repo = JournalRepo(db)
+    bank = account_repo.get_by_name("Bank")
+    cash = account_repo.get_by_name("Cash")
+    expense = account_repo.get_by_name("Uncategorized Expense")
+
+    for desc, ref, account in [
+        ("TESCO EXPRESS 1234", None, bank),
+        ("TESCO STORES", "card 99", cash),
+        ("AMAZON.CO.UK MARKETPLACE", "order 55", bank),
+        ("AMAZON PRIME", None, bank),
+        ("Express delivery refund", None, bank),
+        ("Card payment fee", None, bank),
+    ]:
+        journal_repo.create_entry(
+            JournalEntry(date=date(2025, 2, 1), description=desc, reference=ref),
+            [
+                BookEntry(journal_entry_id=0, account_id=account.id, amount=Decimal("-10")),
+                BookEntry(journal_entry_id=0, account_id=expense.id, amount=Decimal("10")),
+            ],
+        )
+    return db
+
+
+def _descriptions(rows: list[dict]) -> set[str]:
+    return {r["description"] for r in rows}
+
+
+def test_search_prefix_phrase_and_boolean(searchable: sqlite3.Connection):
+    repo = JournalRepo(searchable)
+
+    assert _descriptions(repo.search("tes")) == {"TESCO EXPRESS 1234", "TESCO STORES"}
+    assert _descriptions(repo.search('"tesco express"')) == {"TESCO EXPRESS 1234"}
+    assert _descriptions(repo.search("amazon NOT prime")) == {"AMAZON.CO.UK MARKETPLACE"}
+    assert _descriptions(repo.search("prime OR stores")) == {"AMAZON PRIME", "TESCO STORES"}
+    assert _descriptions(repo.search("amazon.co.uk")) == {"AMAZON.CO.UK MARKETPLACE"}
+    assert _descriptions(repo.search("order")) == {"AMAZON.CO.UK MARKETPLACE"}
+
+
+def test_search_ranks_and_filters(searchable: sqlite3.Connection):
+    repo = JournalRepo(searchable)
+    cash = AccountRepo(searchable).get_by_name("Cash")
+
+    assert _descriptions(repo.search("tesco", account_id=cash.id)) == {"TESCO STORES"}
+    # Description hits outrank reference-only hits
+    assert [r["description"] for r in repo.search("card")] == ["Card payment fee", "TESCO STORES"]
+    # Malformed boolean syntax degrades to a plain term match
+    assert _descriptions(repo.search("OR tesco AND")) == {"TESCO EXPRESS 1234", "TESCO STORES"}
+    assert repo.search("NOT ( )") == []
+
+
+def test_search_does_not_hide_database_errors(searchable: sqlite3.Connection):
+    searchable.execute("DROP TABLE journal_fts")
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        JournalRepo(searchable).search("OR tesco AND")
+
+
+def test_search_index_follows_updates(searchable: sqlite3.Connection):
+    repo = JournalRepo(searchable)
+    searchable.execute("UPDATE journal_entries SET description = 'SAINSBURYS' WHERE description = 'TESCO STORES'")
+    assert _descriptions(repo.search("sainsbury")) == {"SAINSBURYS"}
+    assert _descriptions(repo.search("tesco")) == {"TESCO EXPRESS 1234"}
+
+
+def test_unit_of_work_commits_once(db: sqlite3.Connection):
+    repo = AccountRepo(db)
+    with unit_of_work(db):
+        repo.create(Account(name="Savings", account_type=AccountType.ASSET))
+        assert db.in_transaction
+        repo.create(Account(name="ISA", account_type=AccountType.ASSET))
+    assert not db.in_transaction
+    assert repo.get_by_name("ISA") is not None
+
+
+def test_unit_of_work_rolls_back_on_error(db: sqlite3.Connection):
+    repo = AccountRepo(db)
+    with pytest.raises(RuntimeError):
+        with unit_of_work(db):
+            repo.create(Account(name="Savings", account_type=AccountType.ASSET))
+            raise RuntimeError("boom")
+    assert repo.get_by_name("Savings") is None
+
+
+def test_nested_unit_of_work_rolls_back_inner_scope_only(db: sqlite3.Connection):
+    repo = AccountRepo(db)
+    with unit_of_work(db):
+        repo.create(Account(name="Outer", account_type=AccountType.ASSET))
+        with pytest.raises(RuntimeError):
+            with unit_of_work(db):
+                repo.create(Account(name="Inner", account_type=AccountType.ASSET))
+                raise RuntimeError("boom")
+    assert repo.get_by_name("Outer") is not None
+    assert repo.get_by_name("Inner") is None
+
+
+def test_failed_migration_is_rolled_back(monkeypatch):
+    conn = get_connection()
+    initialize_database(conn)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    monkeypatch.setattr(
+        "finadviser.db.connection.MIGRATIONS",
+        [*MIGRATIONS, "CREATE TABLE half_done (id INTEGER); INSERT INTO no_such_table VALUES (1);"],
+    )
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        apply_migrations(conn)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == version
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'").fetchone() is None
+    assert not conn.in_transaction
+    conn.close()
+
+
+def test_immediate_unit_of_work_takes_the_write_lock(tmp_path):
+    path = tmp_path / "lock.db"
+    conn, other = get_connection(path), get_connection(path)
+    initialize_database(conn)
+    other.execute("PRAGMA busy_timeout=0")
+    with unit_of_work(conn, immediate=True):
+        # No write has happened yet, but another writer is already shut out
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("BEGIN IMMEDIATE")
+    other.execute("BEGIN IMMEDIATE")
+    other.rollback()
+    conn.close()
+    other.close()
+
+
+def test_immediate_unit_of_work_refuses_an_open_transaction(db: sqlite3.Connection):
+    db.execute("INSERT INTO owners (name) VALUES ('Pending')")
+    assert db.in_transaction
+    with pytest.raises(ValueError, match="immediate"):
+        with unit_of_work(db, immediate=True):
+            pass
+    db.rollback()
+
+    with unit_of_work(db):
+        with pytest.raises(ValueError, match="immediate"):
+            with unit_of_work(db, immediate=True):
+                pass
+    with unit_of_work(db, immediate=True):
+        with unit_of_work(db, immediate=True):
+            db.execute("INSERT INTO owners (name) VALUES ('Nested')")
+    assert db.execute("SELECT COUNT(*) FROM owners WHERE name = 'Nested'").fetchone()[0] == 1
+    assert not db.uow_immediate
+
+
+def _ledger_balance(conn: sqlite3.Connection, account_id: int, as_of: str) -> Decimal:
+    row = conn.execute(
+        """SELECT COALESCE(SUM(be.amount), 0) FROM book_entries be
+           JOIN journal_entries je ON je.id = be.journal_entry_id
+           WHERE be.account_id = ? AND je.date <= ?""",
+        (account_id, as_of),
+    ).fetchone()
+    return Decimal(str(round(row[0], 2)))
+
+
+def test_balance_as_of_matches_ledger(ledger: sqlite3.Connection):
+    repo = AccountRepo(ledger)
+    bank = repo.get_by_name("Bank")
+
+    for day in range(0, 16):
+        as_of = date(2024, 12, 31) + timedelta(days=day)
+        assert repo.get_balance(bank.id, as_of=as_of) == _ledger_balance(ledger, bank.id, as_of.isoformat())
+    assert repo.get_balance(bank.id) == Decimal(-sum(range(1, 26)))
+
+
+def test_checkpoints_follow_backdating_redating_and_deletes(ledger: sqlite3.Connection):
+    repo = AccountRepo(ledger)
+    journal_repo = JournalRepo(ledger)
+    bank = repo.get_by_name("Bank")
+    expense = repo.get_by_name("Uncategorized Expense")
+
+    journal_repo.create_entry(
+        JournalEntry(date=date(2024, 12, 15), description="Backdated"),
+        [
+            BookEntry(journal_entry_id=0, account_id=bank.id, amount=Decimal("1000")),
+            BookEntry(journal_entry_id=0, account_id=expense.id, amount=Decimal("-1000")),
+        ],
+    )
+    ledger.execute("UPDATE journal_entries SET date = '2025-01-20' WHERE description = 'Txn 3'")
+    ledger.execute("UPDATE journal_entries SET date = '2024-12-01' WHERE description = 'Txn 20'")
+    ledger.execute("DELETE FROM journal_entries WHERE description = 'Txn 7'")
+    ledger.execute("UPDATE book_entries SET amount = amount * 2 WHERE journal_entry_id = 12")
+
+    for day in range(-40, 30):
+        as_of = date(2025, 1, 1) + timedelta(days=day)
+        for account in (bank, expense):
+            assert repo.get_balance(account.id, as_of=as_of) == _ledger_balance(ledger, account.id, as_of.isoformat())
+
+
+def test_running_balance_in_listing(ledger: sqlite3.Connection):
+    journal_repo = JournalRepo(ledger)
+    bank = AccountRepo(ledger).get_by_name("Bank")
+
+    page = journal_repo.list_entries_page(account_id=bank.id, limit=5)
+    page = journal_repo.list_entries_page(account_id=bank.id, cursor=page.next_cursor, limit=5)
+    for entry in page.entries:
+        expected = ledger.execute(
+            """SELECT SUM(be.amount) FROM book_entries be
+               JOIN journal_entries je ON je.id = be.journal_entry_id
+               WHERE be.account_id = ? AND (je.date < ? OR (je.date = ? AND je.id <= ?))""",
+            (bank.id, entry["date"], entry["date"], entry["id"]),
+        ).fetchone()[0]
+        assert entry["running_balance"] == pytest.approx(expected)
+
+    assert all(e["running_balance"] is None for e in journal_repo.list_entries(limit=5))
+
+
+def test_primary_leg_prefers_balance_sheet_account(db: sqlite3.Connection):
+    account_repo = AccountRepo(db)
+    journal_repo = JournalRepo(db)
+    bank = account_repo.get_by_name("Bank")
+    expense = account_repo.get_by_name("Uncategorized Expense")
+    income = account_repo.get_or_create("Test Income", AccountType.INCOME)
+
+    for desc, legs in [
+        ("Groceries", [(expense, "25.50"), (bank, "-25.50")]),
+        ("Reclass", [(income, "-5"), (expense, "5")]),
+    ]:
+        journal_repo.create_entry(
+            JournalEntry(date=date(2025, 3, 1), description=desc),
+            [BookEntry(journal_entry_id=0, account_id=a.id, amount=Decimal(amt)) for a, amt in legs],
+        )
+
+    listed = {e["description"]: e for e in journal_repo.list_entries(limit=10)}
+    assert (listed["Groceries"]["primary_account_id"], listed["Groceries"]["primary_amount"]) == (bank.id, -25.5)
+    assert (listed["Reclass"]["primary_account_name"], listed["Reclass"]["primary_amount"]) == ("Test Income", -5)
+
+    [found] = journal_repo.search("groceries")
+    assert (found["primary_account_name"], found["primary_amount"]) == ("Bank", -25.5)
+    assert "entries_summary" not in found
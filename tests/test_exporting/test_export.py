@@ -0,0 +1,93 @@
+"""Tests for streaming ledger export."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import sqlite3
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from finadviser.db.archive import attach_archive
+from finadviser.db.models import Account, AccountType, BookEntry, JournalEntry
+from finadviser.db.period_close import PeriodCloser
+from finadviser.db.repositories import AccountRepo, JournalRepo
+from finadviser.exporting.ledger_export import LedgerExporter, detect_format
+
+
+@pytest.fixture
+def ledger(db: sqlite3.Connection):
+    accounts = AccountRepo(db)
+    bank = accounts.create(Account(name="Test Bank", account_type=AccountType.ASSET))
+    rent = accounts.create(Account(name="Test Rent", account_type=AccountType.INCOME))
+    fees = accounts.create(Account(name="Test Fees", account_type=AccountType.EXPENSE))
+    for n in range(25):
+        JournalRepo(db).create_entry(
+            JournalEntry(date=date(2024, 12, 20) + timedelta(days=n // 2), description=f"Rent {n}"),
+            [
+                BookEntry(journal_entry_id=0, account_id=bank, amount=Decimal("950.10")),
+                BookEntry(journal_entry_id=0, account_id=fees, amount=Decimal("49.90")),
+                BookEntry(journal_entry_id=0, account_id=rent, amount=Decimal("-1000")),
+            ],
+        )
+    return db
+
+
+def test_detect_format():
+    assert detect_format(Path("ledger.csv")) == ("csv", False)
+    assert detect_format(Path("ledger.ndjson.gz")) == ("ndjson", True)
+    assert detect_format(Path("ledger.jsonl")) == ("ndjson", False)
+
+
+def test_ndjson_streams_every_journal_across_chunks(ledger, tmp_path):
+    path = tmp_path / "ledger.ndjson"
+    progress = []
+
+    count = LedgerExporter(ledger, chunk_size=4).export(path, progress=progress.append)
+
+    journals = [json.loads(line) for line in path.read_text().splitlines()]
+    assert count == len(journals) == 25
+    assert [j["description"] for j in journals] == [f"Rent {n}" for n in range(25)]
+    assert [e["amount"] for e in journals[0]["entries"]] == [950.1, 49.9, -1000.0]
+    assert progress[-1] == 25
+
+
+def test_gzip_csv_has_one_row_per_book_entry(ledger, tmp_path):
+    path = tmp_path / "ledger.csv.gz"
+
+    LedgerExporter(ledger, chunk_size=7).export(path)
+
+    with gzip.open(path, "rt", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 75
+    assert rows[1]["account"] == "Test Fees"
+    assert rows[1]["amount"] == "49.90"
+    assert sum(Decimal(r["amount"]) for r in rows) == 0
+
+
+def test_includes_archived_years(ledger, tmp_path):
+    attach_archive(ledger, tmp_path / "archive.db")
+    PeriodCloser(ledger).close_year(2024)
+    path = tmp_path / "ledger.ndjson"
+
+    count = LedgerExporter(ledger, chunk_size=5).export(path)
+
+    journals = [json.loads(line) for line in path.read_text().splitlines()]
+    assert count == 25
+    assert [j["description"] for j in journals] == [f"Rent {n}" for n in range(25)]
+
+
+def test_journal_without_legs_does_not_end_the_export(ledger, tmp_path):
+    ledger.execute("INSERT INTO journal_entries (date, description) VALUES ('2024-12-20', 'Empty')")
+    ledger.commit()
+    path = tmp_path / "ledger.ndjson"
+
+    count = LedgerExporter(ledger, chunk_size=4).export(path)
+
+    journals = [json.loads(line) for line in path.read_text().splitlines()]
+    assert count == len(journals) == 26
+    assert [j["entries"] for j in journals if j["description"] == "Empty"] == [[]]
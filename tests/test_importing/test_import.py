@@ -10,7 +10,9 @@ from pathlib import Path
 import pytest
 
 from finadviser.config import AppConfig
+from finadviser.db.archive import attach_archive
 from finadviser.db.connection import get_connection, initialize_database
+from finadviser.db.period_close import PeriodCloser
 from finadviser.db.repositories import AccountRepo, JournalRepo
 from finadviser.importing.bank_config import BankConfig, ColumnMapping, load_bank_config
 from finadviser.importing.categorizer import RuleCategorizer
@@ -136,6 +138,25 @@ def test_import_dedup(db: sqlite3.Connection, config_with_bank):
     assert result2.duplicate_count == 13
 
 
+def test_import_skips_rows_in_closed_period(db: sqlite3.Connection, config_with_bank, tmp_path):
+    rows = (FIXTURES / "sample_transactions.csv").read_text().splitlines()
+    rows[1:3] = [row.replace("/01/2025", "/12/2024") for row in rows[1:3]]
+    csv_path = tmp_path / "straddling.csv"
+    csv_path.write_text("\n".join(rows) + "\n")
+    attach_archive(db, tmp_path / "archive.db")
+    PeriodCloser(db).close_year(2024)
+
+    result = ImportPipeline(db, config_with_bank).run(
+        csv_path,
+        bank_config_name="test-bank",
+        account_name="Bank",
+    )
+
+    assert result.imported_count == 11
+    assert len(result.errors) == 2
+    assert result.errors[0].startswith("2024-12-01 SALARY DEPOSIT")
+
+
 def test_import_preview(db: sqlite3.Connection, config_with_bank):
     """Test preview mode doesn't write to DB."""
     pipeline = ImportPipeline(db, config_with_bank)
@@ -0,0 +1,100 @@
+"""Tests for the mortgage amortization engine."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from finadviser.db.models import Account, AccountType, BookEntry, JournalEntry
+from finadviser.db.repositories import AccountRepo, JournalRepo, PropertyRepo
+from finadviser.properties.amortization import AmortizationEngine, payment_dates
+from finadviser.properties.mortgage_tracker import MortgageTracker
+
+
+@pytest.fixture
+def loans(db: sqlite3.Connection) -> dict:
+    """Two repayment mortgages on one property, one with a rate change."""
+    accounts = AccountRepo(db)
+    props = PropertyRepo(db)
+    prop_id = props.create_property({"name": "Semi", "purchase_date": "2024-01-15", "purchase_price": 300000})
+    owner = props.create_owner("Alice")
+    props.add_ownership(prop_id, owner, accounts.create(Account(name="Capital - Semi", account_type=AccountType.EQUITY)))
+
+    ids = {}
+    for lender, amount, rates in [("Fixed", 100000, [(5.0, "2024-01-15")]), ("Tracker", 50000, [(3.0, "2024-01-15"), (6.0, "2025-01-15")])]:
+        liability = accounts.create(Account(name=f"Mortgage - {lender}", account_type=AccountType.LIABILITY))
+        ids[lender] = props.create_mortgage({
+            "property_id": prop_id, "lender": lender, "original_amount": amount,
+            "start_date": "2024-01-15", "term_months": 300, "liability_account_id": liability,
+        })
+        for rate, effective in rates:
+            props.add_mortgage_rate(ids[lender], rate, effective)
+        JournalRepo(db).create_entry(
+            JournalEntry(date=date(2024, 1, 15), description=f"Draw - {lender}"),
+            [
+                BookEntry(journal_entry_id=0, account_id=liability, amount=Decimal(-amount)),
+                BookEntry(journal_entry_id=0, account_id=accounts.get_by_name("Bank").id, amount=Decimal(amount)),
+            ],
+        )
+    return {"owner": owner, **ids}
+
+
+def test_payment_dates_clip_to_month_end():
+    assert [str(d) for d in payment_dates(date(2024, 1, 31), 3)] == ["2024-02-29", "2024-03-31", "2024-04-30"]
+
+
+def test_fixed_rate_schedule(db: sqlite3.Connection, loans):
+    schedule = AmortizationEngine(db).schedules()[loans["Fixed"]]
+
+    assert len(schedule) == 300
+    assert schedule.payment[0] == pytest.approx(584.59)
+    assert schedule.balance[-1] == 0
+    assert schedule.payoff_date == date(2049, 1, 15)
+    assert float(schedule.principal.sum()) == pytest.approx(100000)
+    assert schedule.expected_split(date(2024, 2, 12)) == (Decimal("167.92"), Decimal("416.67"))
+
+
+def test_rate_change_relevels_payment(db: sqlite3.Connection, loans):
+    schedule = AmortizationEngine(db).schedules([loans["Tracker"]])[loans["Tracker"]]
+
+    assert schedule.rate[11] == 3.0 and schedule.rate[12] == 6.0
+    assert schedule.payment[12] > schedule.payment[11]
+    assert schedule.balance[-1] == 0 and len(schedule) == 300
+
+
+def test_overpayment_shortens_term(db: sqlite3.Connection, loans):
+    engine = AmortizationEngine(db)
+    base = engine.schedules()[loans["Fixed"]]
+    faster = engine.schedules(overpayments={loans["Fixed"]: [(date(2025, 6, 1), Decimal("20000"))]})[loans["Fixed"]]
+
+    assert faster.overpayment.sum() == 20000
+    assert faster.payoff_date < base.payoff_date
+    assert faster.total_interest < base.total_interest
+
+
+def test_record_payment_splits_from_schedule(db: sqlite3.Connection, loans):
+    bank = AccountRepo(db).get_by_name("Bank").id
+    schedule = AmortizationEngine(db).schedules()[loans["Fixed"]]
+
+    MortgageTracker(db).record_payment(
+        loans["Fixed"], date(2024, 2, 15), Decimal("584.59"), None, None, loans["owner"], bank,
+    )
+
+    interest = AccountRepo(db).get_by_name("Mortgage Interest")
+    assert AccountRepo(db).get_balance(interest.id) == Decimal("416.67")
+    variance = AmortizationEngine(db).variance({loans["Fixed"]: schedule}, as_of=date(2024, 3, 31))[loans["Fixed"]]
+    assert variance["variance"].tolist() == pytest.approx([0.0, schedule.principal[1]])
+
+
+def test_mortgage_without_a_rate_has_no_schedule(db: sqlite3.Connection, loans):
+    db.execute("DELETE FROM mortgage_rate_history WHERE mortgage_id = ?", (loans["Tracker"],))
+    bank = AccountRepo(db).get_by_name("Bank").id
+    tracker = MortgageTracker(db)
+
+    assert set(AmortizationEngine(db).schedules()) == {loans["Fixed"]}
+    with pytest.raises(ValueError, match="Mortgage .* \\(Tracker\\) has no recorded interest rate"):
+        tracker.record_payment(loans["Tracker"], date(2024, 2, 15), Decimal("300"), None, None, loans["owner"], bank)
+    assert tracker.find_imported_payments(date(2024, 1, 1), date(2024, 12, 31)) == []
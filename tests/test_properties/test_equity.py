@@ -8,7 +8,7 @@ from decimal import Decimal
 
 import pytest
 
-from finadviser.db.models import Account, AccountType, BookEntry, JournalEntry
+from finadviser.db.models import Account, AccountType, BookEntry, JournalEntry, PropertyTransfer
 from finadviser.db.repositories import AccountRepo, JournalRepo, PropertyRepo
 from finadviser.properties.equity_calculator import EquityCalculator
 from finadviser.properties.transfer_engine import TransferEngine
@@ -213,6 +213,53 @@ def test_cross_property_transfer(db: sqlite3.Connection, property_setup):
     assert transfers[0]["amount"] == 20000
 
 
+def test_batch_transfers_validate_together(db: sqlite3.Connection, property_setup):
+    """A batch is checked against running balances and applied all or nothing."""
+    account_repo = AccountRepo(db)
+    prop_repo = PropertyRepo(db)
+    alice, bob = property_setup["owner_a"], property_setup["owner_b"]
+    main = property_setup["property_id"]
+    oak = prop_repo.create_property({"name": "456 Oak Ave"})
+    caps = {}
+    for owner, name in ((alice, "Alice"), (bob, "Bob")):
+        caps[owner] = account_repo.create(Account(name=f"Capital - {name} - 456 Oak Ave", account_type=AccountType.EQUITY))
+        prop_repo.add_ownership(oak, owner, caps[owner])
+
+    def transfer(owner: int, amount: str, source: int = main, dest: int = oak) -> PropertyTransfer:
+        return PropertyTransfer(from_property_id=source, to_property_id=dest, owner_id=owner,
+                                amount=Decimal(amount), transfer_date=date(2025, 6, 1))
+
+    engine = TransferEngine(db)
+    # Each transfer fits Alice's 60k alone, but not both together
+    with pytest.raises(ValueError, match="Insufficient equity: 25000"):
+        engine.transfer_equities([transfer(alice, "35000"), transfer(bob, "10000"), transfer(alice, "35000")])
+    assert not db.in_transaction
+    assert db.execute("SELECT COUNT(*) FROM property_transfers").fetchone()[0] == 0
+    assert account_repo.get_balance(property_setup["cap_a_id"]) == Decimal("60000")
+
+    # Later transfers may spend equity moved in earlier in the batch
+    journal_ids = engine.transfer_equities([
+        transfer(alice, "35000"), transfer(bob, "10000"), transfer(alice, "5000", source=oak, dest=main),
+    ])
+    assert len(journal_ids) == 3
+    assert account_repo.get_balance(property_setup["cap_a_id"]) == Decimal("30000")
+    assert account_repo.get_balance(caps[alice]) == Decimal("30000")
+    assert account_repo.get_balance(caps[bob]) == Decimal("10000")
+    history = engine.get_transfers(owner_id=alice)
+    assert {t["journal_entry_id"] for t in history} == {journal_ids[0], journal_ids[2]}
+    assert {t["description"] for t in history} == {
+        "Equity transfer: 123 Main St -> 456 Oak Ave", "Equity transfer: 456 Oak Ave -> 123 Main St",
+    }
+
+    with pytest.raises(ValueError, match="does not own"):
+        engine.transfer_equity(main, oak, prop_repo.create_owner("Carol"), Decimal("1"), date(2025, 6, 1))
+
+    plan = db.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM property_transfers WHERE from_property_id = ? OR to_property_id = ?", (1, 1),
+    ).fetchall()
+    assert any("idx_property_transfers_from" in row["detail"] for row in plan)
+
+
 def test_calculate_all_properties(db: sqlite3.Connection, property_setup):
     """Test calculating equity for all properties."""
     calc = EquityCalculator(db)
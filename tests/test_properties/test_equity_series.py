@@ -0,0 +1,70 @@
+"""Tests for the vectorized equity and net-worth series."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+
+import numpy as np
+import pytest
+
+from finadviser.db.models import AccountType
+from finadviser.db.repositories import AccountRepo, PropertyRepo
+from finadviser.properties.equity_series import EquitySeriesEngine, series_dates
+from finadviser.properties.portfolio import PortfolioEquity
+from finadviser.seed_properties import seed_properties
+
+
+@pytest.fixture
+def seeded_db(db: sqlite3.Connection) -> sqlite3.Connection:
+    seed_properties(db)
+    return db
+
+
+def test_series_dates():
+    monthly = series_dates(date(2024, 1, 15), date(2024, 4, 30))
+    assert monthly.tolist() == [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)]
+    assert len(series_dates(date(2024, 1, 1), date(2024, 12, 31), "daily")) == 366
+    with pytest.raises(ValueError, match="frequency"):
+        series_dates(date(2024, 1, 1), date(2024, 2, 1), "yearly")
+
+
+def test_owner_equity_matches_portfolio_as_of(seeded_db: sqlite3.Connection):
+    series = EquitySeriesEngine(seeded_db).compute(date(2019, 1, 1), date(2026, 6, 30))
+    portfolio = PortfolioEquity(seeded_db)
+
+    for col, day in list(enumerate(series.dates.tolist()))[::9]:
+        for prop in portfolio.properties(as_of=day):
+            for owner in prop["equity"]:
+                row = series.owners[(prop["id"], owner["owner_id"])]
+                assert row["pct"][col] == pytest.approx(owner["equity_pct"])
+                assert row["equity"][col] == pytest.approx(float(owner["equity_amount"]), abs=0.01)
+
+
+def test_net_worth_components(seeded_db: sqlite3.Connection):
+    series = EquitySeriesEngine(seeded_db).compute(date(2022, 1, 1), date(2025, 12, 31), "daily")
+    accounts = AccountRepo(seeded_db)
+    day = date(2024, 9, 30)
+    col = int(np.flatnonzero(series.dates == np.datetime64(day))[0])
+
+    liabilities = sum(abs(accounts.get_balance(a.id, as_of=day)) for a in accounts.list_by_type(AccountType.LIABILITY))
+    assert series.liabilities[col] == pytest.approx(float(liabilities))
+    assert series.net_worth[col] == pytest.approx(
+        series.assets[col] - series.liabilities[col] + series.property_value[col]
+    )
+    assert series.property_value[col] == pytest.approx(
+        sum(float(p["valuation"]["valuation"]) for p in PortfolioEquity(seeded_db).properties(as_of=day))
+    )
+
+
+def test_same_day_valuations_match_latest_valuation(db: sqlite3.Connection):
+    props = PropertyRepo(db)
+    home = props.create_property({"name": "Home", "purchase_date": "2024-01-01", "purchase_price": 250000})
+    props.add_valuation(home, 260000, "2024-03-01")
+    props.add_valuation(home, 310000, "2024-06-01")
+    props.add_valuation(home, 300000, "2024-06-01")
+
+    series = EquitySeriesEngine(db).compute(date(2024, 1, 1), date(2024, 7, 31))
+
+    assert series.properties[home]["valuation"].tolist() == [0, 0, 260000, 260000, 260000, 300000, 300000]
+    assert props.get_latest_valuation(home)["valuation"] == 300000
@@ -0,0 +1,143 @@
+"""Tests for matching imported bank debits to mortgage payments."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from finadviser.db.ledger_cache import LedgerCache
+from finadviser.db.models import Account, AccountType, BookEntry, ImportBatch, JournalEntry
+from finadviser.db.repositories import AccountRepo, ImportBatchRepo, JournalRepo, PropertyRepo
+from finadviser.properties.amortization import AmortizationEngine
+from finadviser.properties.mortgage_tracker import MortgageTracker
+
+
+@pytest.fixture
+def imported(db: sqlite3.Connection) -> dict:
+    """A 5% repayment mortgage (584.59 a month) and a batch of imported debits."""
+    accounts = AccountRepo(db)
+    props = PropertyRepo(db)
+    prop_id = props.create_property({"name": "Flat", "purchase_date": "2024-01-15", "purchase_price": 200000})
+    owner = props.create_owner("Alice")
+    props.add_ownership(prop_id, owner, accounts.create(Account(name="Capital - Flat", account_type=AccountType.EQUITY)))
+    liability = accounts.create(Account(name="Mortgage - Acme", account_type=AccountType.LIABILITY))
+    mortgage = props.create_mortgage({
+        "property_id": prop_id, "lender": "Acme", "original_amount": 100000, "start_date": "2024-01-15",
+        "term_months": 300, "liability_account_id": liability, "payee_pattern": r"acme.*mtg",
+    })
+    props.add_mortgage_rate(mortgage, 5.0, "2024-01-15")
+
+    bank = accounts.get_by_name("Bank").id
+    expense = accounts.get_by_name("Uncategorized Expense").id
+    batch = ImportBatchRepo(db).create(ImportBatch(filename="may.csv", bank_config="test", account_id=bank))
+    journals = {}
+    for when, description, amount in [
+        (date(2024, 2, 16), "ACME BANK MTG 123", "584.59"),
+        (date(2024, 3, 14), "Acme Bank Mtg 123", "584.59"),
+        (date(2024, 3, 17), "ACME BANK MTG 123", "584.59"),  # a second debit for the March instalment
+        (date(2024, 3, 20), "TESCO STORES", "584.59"),
+        (date(2024, 4, 15), "ACME BANK MTG 123", "900.00"),
+    ]:
+        journals[(when, description)] = JournalRepo(db).create_entry(
+            JournalEntry(date=when, description=description, import_batch_id=batch),
+            [
+                BookEntry(journal_entry_id=0, account_id=bank, amount=-Decimal(amount)),
+                BookEntry(journal_entry_id=0, account_id=expense, amount=Decimal(amount)),
+            ],
+        )
+    return {"mortgage": mortgage, "liability": liability, "prop_id": prop_id, "journals": journals}
+
+
+def test_ingest_repoints_matched_debits(db: sqlite3.Connection, imported):
+    tracker = MortgageTracker(db)
+    accounts = AccountRepo(db)
+    journal_count = db.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0]
+
+    posted = tracker.ingest_imported_payments(date(2024, 1, 1), date(2024, 6, 30))
+
+    assert [p["payment_date"] for p in posted] == [date(2024, 2, 16), date(2024, 3, 14)]
+    assert posted[0]["interest_amount"] == Decimal("416.67")
+    assert posted[0]["journal_entry_id"] == imported["journals"][(date(2024, 2, 16), "ACME BANK MTG 123")]
+    # Only the capital journals are new; the bank journals were re-pointed in place
+    assert db.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0] == journal_count + 2
+    legs = {e.account_id: e.amount for e in JournalRepo(db).get_book_entries(posted[0]["journal_entry_id"])}
+    assert legs[imported["liability"]] == Decimal("167.92")
+
+    assert accounts.get_balance(accounts.get_by_name("Uncategorized Expense").id) == Decimal("2069.18")
+    assert tracker.get_interest_to_date(imported["mortgage"]) == sum(p["interest_amount"] for p in posted)
+    assert tracker.ingest_imported_payments(date(2024, 1, 1), date(2024, 6, 30)) == []
+
+
+def test_ledger_cache_sees_ingested_payments(db: sqlite3.Connection, imported):
+    cache = LedgerCache.for_connection(db)
+    cache.refresh()
+
+    MortgageTracker(db).ingest_imported_payments(date(2024, 1, 1), date(2024, 6, 30))
+
+    cached = {b.account_name: b.balance for b in cache.account_balances()}
+    ledger = {b.account_name: b.balance for b in AccountRepo(db).get_balances()}
+    for name in ("Mortgage - Acme", "Uncategorized Expense", "Mortgage Interest", "Bank"):
+        assert cached[name] == pytest.approx(ledger[name], abs=0.005)
+    assert cached["Mortgage - Acme"] == Decimal("336.54")
+
+
+def test_ingest_needs_payer_for_shared_property(db: sqlite3.Connection, imported):
+    props = PropertyRepo(db)
+    bob = props.create_owner("Bob")
+    props.add_ownership(
+        imported["prop_id"], bob, AccountRepo(db).create(Account(name="Capital - Bob", account_type=AccountType.EQUITY)),
+    )
+
+    with pytest.raises(ValueError, match="2 owners"):
+        MortgageTracker(db).ingest_imported_payments(date(2024, 1, 1), date(2024, 6, 30))
+    assert db.execute("SELECT COUNT(*) FROM mortgage_payments").fetchone()[0] == 0
+
+    posted = MortgageTracker(db).ingest_imported_payments(date(2024, 1, 1), date(2024, 6, 30), payer_owner_id=bob)
+    assert {p["mortgage_id"] for p in posted} == {imported["mortgage"]}
+    assert db.execute("SELECT COUNT(*) FROM mortgage_payments WHERE payer_owner_id = ?", (bob,)).fetchone()[0] == 2
+
+
+def test_payer_only_pays_for_properties_they_hold(db: sqlite3.Connection, imported):
+    accounts = AccountRepo(db)
+    props = PropertyRepo(db)
+    bob = props.create_owner("Bob")
+    props.add_ownership(imported["prop_id"], bob, accounts.create(Account(name="Capital - Bob", account_type=AccountType.EQUITY)))
+    cottage = props.create_property({"name": "Cottage", "purchase_date": "2024-01-15", "purchase_price": 150000})
+    carol = props.create_owner("Carol")
+    props.add_ownership(cottage, carol, accounts.create(Account(name="Capital - Cottage", account_type=AccountType.EQUITY)))
+    other = props.create_mortgage({
+        "property_id": cottage, "lender": "Zeta", "original_amount": 50000, "start_date": "2024-01-15",
+        "term_months": 300, "liability_account_id": accounts.create(Account(name="Mortgage - Zeta", account_type=AccountType.LIABILITY)),
+    })
+    props.add_mortgage_rate(other, 5.0, "2024-01-15")
+    payment = AmortizationEngine(db).schedules([other])[other].payment[0]
+    batch = ImportBatchRepo(db).create(ImportBatch(filename="feb.csv", bank_config="test", account_id=accounts.get_by_name("Bank").id))
+    JournalRepo(db).create_entry(
+        JournalEntry(date=date(2024, 2, 15), description="ZETA HOME LOANS", import_batch_id=batch),
+        [
+            BookEntry(journal_entry_id=0, account_id=accounts.get_by_name("Bank").id, amount=-Decimal(str(payment))),
+            BookEntry(journal_entry_id=0, account_id=accounts.get_by_name("Uncategorized Expense").id, amount=Decimal(str(payment))),
+        ],
+    )
+
+    posted = MortgageTracker(db).ingest_imported_payments(date(2024, 1, 1), date(2024, 6, 30), payer_owner_id=bob)
+
+    assert {p["mortgage_id"] for p in posted} == {imported["mortgage"], other}
+    payers = dict(db.execute("SELECT mortgage_id, MAX(payer_owner_id) FROM mortgage_payments GROUP BY mortgage_id"))
+    assert payers == {imported["mortgage"]: bob, other: carol}
+
+
+def test_invalid_payee_pattern(db: sqlite3.Connection, imported):
+    props = PropertyRepo(db)
+    with pytest.raises(ValueError, match="Invalid payee pattern"):
+        props.create_mortgage({
+            "property_id": imported["prop_id"], "lender": "Broken", "original_amount": 1000, "start_date": "2024-01-15",
+            "term_months": 12, "liability_account_id": imported["liability"], "payee_pattern": "acme(",
+        })
+
+    db.execute("UPDATE mortgages SET payee_pattern = 'acme(' WHERE id = ?", (imported["mortgage"],))
+    with pytest.raises(ValueError, match="'Acme' has an invalid payee pattern"):
+        MortgageTracker(db).find_imported_payments(date(2024, 1, 1), date(2024, 6, 30))
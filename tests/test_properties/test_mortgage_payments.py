@@ -0,0 +1,117 @@
+"""Tests for the mortgage_payments link table."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from finadviser.db.models import Account, AccountType, BookEntry, JournalEntry
+from finadviser.db.repositories import AccountRepo, JournalRepo, PropertyRepo
+from finadviser.db.schema import MIGRATIONS
+from finadviser.properties.mortgage_tracker import MortgageTracker
+
+
+@pytest.fixture
+def paid(db: sqlite3.Connection) -> dict:
+    """Two lenders on one property, each with payments recorded by the tracker."""
+    accounts = AccountRepo(db)
+    props = PropertyRepo(db)
+    prop_id = props.create_property({"name": "Terrace", "purchase_date": "2024-01-01", "purchase_price": 250000})
+    owner = props.create_owner("Alice")
+    props.add_ownership(prop_id, owner, accounts.create(Account(name="Capital - Terrace", account_type=AccountType.EQUITY)))
+    bank = accounts.get_by_name("Bank").id
+
+    ids = {"owner": owner}
+    for lender in ("Acme", "Acme Plus"):
+        liability = accounts.create(Account(name=f"Mortgage - {lender}", account_type=AccountType.LIABILITY))
+        ids[lender] = props.create_mortgage({
+            "property_id": prop_id, "lender": lender, "original_amount": 100000,
+            "start_date": "2024-01-01", "term_months": 300, "liability_account_id": liability,
+        })
+
+    tracker = MortgageTracker(db)
+    for month in (2, 3, 4):
+        tracker.record_payment(ids["Acme"], date(2024, month, 1), Decimal("600"), Decimal("180"), Decimal("420"), owner, bank)
+    tracker.record_payment(ids["Acme Plus"], date(2024, 2, 1), Decimal("500"), Decimal("100"), Decimal("400"), owner, bank)
+    return ids
+
+
+def test_history_and_totals_use_link_rows(db: sqlite3.Connection, paid):
+    tracker = MortgageTracker(db)
+
+    history = tracker.get_payment_history(paid["Acme"])
+    assert [p["payment_date"] for p in history] == [date(2024, 4, 1), date(2024, 3, 1), date(2024, 2, 1)]
+    assert all(p["capital_journal_id"] and p["payer_owner_id"] == paid["owner"] for p in history)
+    # "Acme" is a prefix of "Acme Plus"; the old description scan mixed them up
+    assert len(tracker.get_payment_history(paid["Acme Plus"])) == 1
+
+    assert tracker.get_interest_to_date(paid["Acme"]) == Decimal("1260")
+    assert tracker.get_principal_to_date(paid["Acme"], as_of=date(2024, 3, 15)) == Decimal("360")
+    ranged = tracker.get_payment_history(paid["Acme"], start=date(2024, 3, 1), end=date(2024, 3, 31))
+    assert [p["payment_date"] for p in ranged] == [date(2024, 3, 1)]
+
+
+def test_migration_backfills_existing_payments(db: sqlite3.Connection, paid):
+    columns = "mortgage_id, payment_date, journal_entry_id, capital_journal_id, payer_owner_id, principal_amount, interest_amount"
+    expected = db.execute(f"SELECT {columns} FROM mortgage_payments ORDER BY journal_entry_id").fetchall()
+    db.execute("DELETE FROM mortgage_payments")
+
+    db.executescript(MIGRATIONS[4])
+
+    assert db.execute(f"SELECT {columns} FROM mortgage_payments ORDER BY journal_entry_id").fetchall() == expected
+
+
+def test_backfill_skips_journals_without_a_liability_leg(db: sqlite3.Connection, paid):
+    accounts = AccountRepo(db)
+    JournalRepo(db).create_entry(
+        JournalEntry(date=date(2024, 5, 1), description="Mortgage payment - Acme"),
+        [
+            BookEntry(journal_entry_id=0, account_id=accounts.get_by_name("Bank").id, amount=Decimal("-10")),
+            BookEntry(journal_entry_id=0, account_id=accounts.get_by_name("Uncategorized Expense").id, amount=Decimal("10")),
+        ],
+    )
+    db.execute("DELETE FROM mortgage_payments")
+
+    db.executescript(MIGRATIONS[4])
+
+    assert db.execute("SELECT COUNT(*) FROM mortgage_payments").fetchone()[0] == 4
+
+
+def test_backfill_pairs_same_day_payments_in_order(db: sqlite3.Connection, paid):
+    accounts = AccountRepo(db)
+    journals = JournalRepo(db)
+    bank = accounts.get_by_name("Bank").id
+    liability = PropertyRepo(db).get_mortgages(1)[0]["liability_account_id"]
+    capital = accounts.get_by_name("Capital - Terrace").id
+    tracking = accounts.get_by_name("Equity Contributions - Acme").id
+    # Both payments posted before either capital journal, as a batch would
+    payments = [
+        journals.create_entry(
+            JournalEntry(date=date(2024, 6, 1), description="Mortgage payment - Acme"),
+            [
+                BookEntry(journal_entry_id=0, account_id=bank, amount=-principal),
+                BookEntry(journal_entry_id=0, account_id=liability, amount=principal),
+            ],
+        )
+        for principal in (Decimal("180"), Decimal("50"))
+    ]
+    capitals = [
+        journals.create_entry(
+            JournalEntry(date=date(2024, 6, 1), description="Capital contribution via mortgage principal - Acme"),
+            [
+                BookEntry(journal_entry_id=0, account_id=capital, amount=principal),
+                BookEntry(journal_entry_id=0, account_id=tracking, amount=-principal),
+            ],
+        )
+        for principal in (Decimal("180"), Decimal("50"))
+    ]
+
+    db.executescript(MIGRATIONS[4])
+
+    linked = dict(db.execute(
+        "SELECT journal_entry_id, capital_journal_id FROM mortgage_payments WHERE payment_date = '2024-06-01'"
+    ).fetchall())
+    assert linked == dict(zip(payments, capitals))
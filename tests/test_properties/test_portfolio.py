@@ -0,0 +1,63 @@
+"""Tests for set-based portfolio equity."""
+
+from __future__ import annotations
+
+import sqlite3
+from decimal import Decimal
+
+from finadviser.db.repositories import PropertyRepo
+from finadviser.properties.equity_calculator import EquityCalculator
+from finadviser.properties.portfolio import PortfolioEquity
+from finadviser.seed_properties import seed_properties
+
+
+class _CountingConnection:
+    """Counts statements sent through a connection."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.statements = 0
+
+    def execute(self, *args):
+        self.statements += 1
+        return self.conn.execute(*args)
+
+
+def test_matches_per_property_calculation(db: sqlite3.Connection):
+    seed_properties(db)
+    calc = EquityCalculator(db)
+    props = PropertyRepo(db).list_properties()
+    assert len(props) >= 2
+
+    expected = {p["id"]: calc.calculate(p["id"]) for p in props}
+
+    assert PortfolioEquity(db).calculate_all() == expected
+    for owner in PropertyRepo(db).list_owners():
+        total = sum(
+            (e["equity_amount"] for rows in expected.values() for e in rows if e["owner_id"] == owner["id"]),
+            Decimal("0"),
+        )
+        assert calc.get_owner_total_equity(owner["id"]) == total
+
+
+def test_query_count_is_fixed(db: sqlite3.Connection):
+    seed_properties(db)
+    counting = _CountingConnection(db)
+
+    properties = PortfolioEquity(counting).properties()
+
+    assert counting.statements == 5
+    assert all("valuation" in p and "mortgages" in p and "equity" in p for p in properties)
+
+
+def test_same_day_valuations_agree(db: sqlite3.Connection):
+    props = PropertyRepo(db)
+    home = props.create_property({"name": "Home", "purchase_date": "2024-01-01", "purchase_price": 250000})
+    props.add_valuation(home, 310000, "2024-06-01")
+    props.add_valuation(home, 300000, "2024-06-01")
+
+    latest = props.get_latest_valuation(home)
+    (prop,) = PortfolioEquity(db).properties()
+    assert latest["valuation"] == 300000
+    assert prop["valuation"]["id"] == latest["id"]
+    assert props.get_valuations(home)[0]["id"] == latest["id"]
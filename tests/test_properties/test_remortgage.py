@@ -0,0 +1,114 @@
+"""Tests for the remortgage product comparison."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from finadviser.db.models import Account, AccountType, BookEntry, JournalEntry, MortgageProduct
+from finadviser.db.repositories import AccountRepo, JournalRepo, PropertyRepo
+from finadviser.properties.amortization import AmortizationEngine
+from finadviser.properties.remortgage import RemortgageEngine, parse_products
+
+
+@pytest.fixture
+def mortgage(db: sqlite3.Connection) -> int:
+    """A 200k, 25-year mortgage at 5% drawn on 2025-01-15 against a home valued at 300k."""
+    props = PropertyRepo(db)
+    home = props.create_property({"name": "Home", "purchase_date": "2025-01-15", "purchase_price": 280000})
+    props.add_valuation(home, 300000, "2025-01-15")
+    liability = AccountRepo(db).create(Account(name="Mortgage - Home", account_type=AccountType.LIABILITY))
+    mortgage_id = props.create_mortgage({
+        "property_id": home, "lender": "Acme", "original_amount": 200000, "start_date": "2025-01-15",
+        "term_months": 300, "liability_account_id": liability,
+    })
+    props.add_mortgage_rate(mortgage_id, 5.0, "2025-01-15")
+    JournalRepo(db).create_entry(
+        JournalEntry(date=date(2025, 1, 15), description="Draw"),
+        [
+            BookEntry(journal_entry_id=0, account_id=liability, amount=Decimal("-200000")),
+            BookEntry(journal_entry_id=0, account_id=AccountRepo(db).get_by_name("Bank").id, amount=Decimal("200000")),
+        ],
+    )
+    return mortgage_id
+
+
+def test_staying_matches_the_amortization_schedule(db: sqlite3.Connection, mortgage):
+    result = RemortgageEngine(db).compare(mortgage, [], as_of=date(2025, 1, 15), horizon_months=24)
+
+    schedule = AmortizationEngine(db).schedules()[mortgage]
+    stay = result.summary[0]
+    assert stay["name"] == "Stay"
+    assert stay["initial_payment"] == Decimal(str(round(float(schedule.payment[0]), 2)))
+    np.testing.assert_allclose(result.balance[0, 1:], schedule.balance[:24])
+    assert stay["interest"] == Decimal(str(round(float(schedule.interest[:24].sum()), 2)))
+    assert stay["end_equity"] == Decimal(str(round(300000 - float(schedule.balance[23]), 2)))
+
+
+def test_products_ranked_by_total_cost(db: sqlite3.Connection, mortgage):
+    products = [
+        MortgageProduct(name="Cheap rate, big fee", rate=3.5, fixed_months=24, arrangement_fee=Decimal("5000")),
+        MortgageProduct(name="Fee added", rate=3.5, fixed_months=24, arrangement_fee=Decimal("5000"), fee_added_to_loan=True),
+        MortgageProduct(name="No fee", rate=4.0, fixed_months=24, follow_on_rate=7.0, cashback=Decimal("250")),
+    ]
+    result = RemortgageEngine(db).compare(mortgage, products, as_of=date(2025, 1, 15), current_erc=Decimal("1000"))
+
+    assert len(result.dates) == 24
+    ranked = {row["name"]: row for row in result.summary}
+    assert [row["rank"] for row in result.summary] == [1, 2, 3, 4]
+    assert result.best["name"] == "No fee"
+    # Borrowing the fee costs interest on it and leaves a larger balance
+    assert ranked["Fee added"]["interest"] > ranked["Cheap rate, big fee"]["interest"]
+    assert ranked["Fee added"]["end_balance"] > ranked["Cheap rate, big fee"]["end_balance"]
+    assert ranked["Fee added"]["end_equity"] < ranked["Cheap rate, big fee"]["end_equity"]
+    # Only switching pays the current deal's charge
+    assert ranked["Stay"]["erc"] == 0
+    assert ranked["No fee"]["erc"] == Decimal("1000")
+    assert ranked["No fee"]["fees"] == Decimal("-250")
+    total = ranked["No fee"]["interest"] + ranked["No fee"]["fees"] + ranked["No fee"]["erc"]
+    assert ranked["No fee"]["total_cost"] == total
+
+
+def test_erc_due_when_leaving_inside_the_fixed_period(db: sqlite3.Connection, mortgage):
+    products = [MortgageProduct(name="Five year fix", rate=4.0, fixed_months=60, erc_pct=[5, 4, 3, 2, 1])]
+    engine = RemortgageEngine(db)
+
+    early = engine.compare(mortgage, products, as_of=date(2025, 1, 15), horizon_months=30, include_current=False)
+    row = early.best
+    assert row["erc"] == Decimal(str(round(float(row["end_balance"]) * 0.03, 2)))
+
+    full = engine.compare(mortgage, products, as_of=date(2025, 1, 15), include_current=False)
+    assert len(full.dates) == 60
+    assert full.best["erc"] == 0
+
+
+def test_parse_products():
+    products = parse_products(
+        "name,rate,fixed_months,arrangement_fee,fee_added_to_loan,erc_pct\n"
+        "Two year fix,4.1,24,999,true,3;2\n"
+        "Tracker,4.6,,,,\n"
+    )
+    assert [p.name for p in products] == ["Two year fix", "Tracker"]
+    assert products[0].erc_pct == [3.0, 2.0]
+    assert products[0].fee_added_to_loan is True
+    assert products[1].fixed_months == 0
+
+    with pytest.raises(ValueError, match="Line 3: rate"):
+        parse_products("name,rate\nFix,4.1\nBroken,lots\n")
+    with pytest.raises(ValueError, match="No products"):
+        parse_products("name,rate\n")
+
+
+def test_survey_beats_index_estimate_on_the_same_day(db: sqlite3.Connection, mortgage):
+    home = PropertyRepo(db).list_properties()[0]["id"]
+    PropertyRepo(db).add_valuation(home, 320000, "2025-01-15", source="survey")
+    PropertyRepo(db).add_valuation(home, 350000, "2025-01-15", source="index")
+
+    result = RemortgageEngine(db).compare(mortgage, [], as_of=date(2025, 1, 15), horizon_months=12)
+
+    schedule = AmortizationEngine(db).schedules()[mortgage]
+    assert result.summary[0]["end_equity"] == Decimal(str(round(320000 - float(schedule.balance[11]), 2)))
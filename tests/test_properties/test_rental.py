@@ -0,0 +1,148 @@
+"""Tests for rental income and expense allocation."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from finadviser.db.connection import apply_migrations, get_connection
+from finadviser.db.models import Account, AccountType, PropertyEvent, PropertyEventKind
+from finadviser.db.repositories import AccountRepo, JournalRepo, PropertyRepo
+from finadviser.db.schema import MIGRATIONS, SCHEMA_SQL
+from finadviser.properties.allocations import AllocationIndex
+from finadviser.properties.rental_tracker import RentalTracker
+
+
+@pytest.fixture
+def let(db: sqlite3.Connection) -> dict:
+    """A let property owned by Alice and Bob, with a 70/30 rule for repairs."""
+    accounts = AccountRepo(db)
+    props = PropertyRepo(db)
+    prop_id = props.create_property({"name": "Let", "purchase_date": "2024-01-01", "purchase_price": 300000})
+    ids = {"property": prop_id}
+    for name in ("Alice", "Bob"):
+        ids[name] = props.create_owner(name)
+        ids[f"cap_{name}"] = accounts.create(Account(name=f"Capital - {name} - Let", account_type=AccountType.EQUITY))
+        props.add_ownership(prop_id, ids[name], ids[f"cap_{name}"])
+    props.set_allocation_rule(prop_id, ids["Alice"], 70, "repairs")
+    props.set_allocation_rule(prop_id, ids["Bob"], 30, "repairs")
+    return ids
+
+
+def test_post_events_writes_one_compound_journal_each(db: sqlite3.Connection, let):
+    accounts = AccountRepo(db)
+    events = [
+        PropertyEvent(property_id=let["property"], kind=PropertyEventKind.INCOME,
+                      event_date=date(2024, month, 1), amount=Decimal("1000"))
+        for month in range(1, 13)
+    ]
+    events += [
+        PropertyEvent(property_id=let["property"], kind=PropertyEventKind.EXPENSE, event_date=date(2024, 6, 3),
+                      amount=Decimal("500"), description="Boiler", expense_type="repairs"),
+        PropertyEvent(property_id=let["property"], kind=PropertyEventKind.EXPENSE, event_date=date(2024, 7, 1),
+                      amount=Decimal("200"), description="Insurance"),
+    ]
+
+    journal_ids = RentalTracker(db).post_events(events)
+
+    assert len(journal_ids) == 14
+    assert db.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0] == 14
+    legs = JournalRepo(db).get_book_entries(journal_ids[12])
+    assert len(legs) == 5
+    assert JournalRepo(db).get_entry(journal_ids[12]).description == "Boiler"
+
+    assert accounts.get_balance(let["cap_Alice"]) == Decimal("6000") - Decimal("350") - Decimal("100")
+    assert accounts.get_balance(let["cap_Bob"]) == Decimal("6000") - Decimal("150") - Decimal("100")
+    assert accounts.get_balance(accounts.get_by_name("Bank").id) == Decimal("11300")
+
+
+def test_single_event_methods_and_rollback(db: sqlite3.Connection, let):
+    tracker = RentalTracker(db)
+    journal_id = tracker.record_rental_income(let["property"], Decimal("900"), date(2024, 1, 1))
+    assert {e.account_id: e.amount for e in JournalRepo(db).get_book_entries(journal_id)}[let["cap_Bob"]] == Decimal("450")
+
+    empty = PropertyRepo(db).create_property({"name": "Empty"})
+    with pytest.raises(ValueError, match="No owners"):
+        tracker.post_events([
+            PropertyEvent(property_id=let["property"], kind=PropertyEventKind.INCOME,
+                          event_date=date(2024, 2, 1), amount=Decimal("900")),
+            PropertyEvent(property_id=empty, kind=PropertyEventKind.INCOME,
+                          event_date=date(2024, 2, 1), amount=Decimal("900")),
+        ])
+    assert db.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0] == 1
+
+
+def test_rolled_back_accounts_are_not_reused(db: sqlite3.Connection, let):
+    tracker = RentalTracker(db)
+    empty = PropertyRepo(db).create_property({"name": "Empty"})
+    income = PropertyEvent(property_id=let["property"], kind=PropertyEventKind.INCOME,
+                           event_date=date(2024, 2, 1), amount=Decimal("900"))
+    with pytest.raises(ValueError, match="No owners"):
+        tracker.post_events([income, income.model_copy(update={"property_id": empty})])
+    assert AccountRepo(db).get_by_name("Rental Income") is None
+
+    (journal_id,) = tracker.post_events([income])
+    assert len(JournalRepo(db).get_book_entries(journal_id)) == 5
+
+
+def test_dated_rules_resolve_by_event_date(db: sqlite3.Connection, let):
+    props = PropertyRepo(db)
+    props.set_allocation_rule(let["property"], let["Alice"], 50)
+    props.set_allocation_rule(let["property"], let["Bob"], 50)
+    props.set_allocation_rule(let["property"], let["Alice"], 80, effective_from=date(2024, 7, 1))
+    props.set_allocation_rule(let["property"], let["Bob"], 20, effective_from=date(2024, 7, 1))
+
+    alice = [r for r in props.get_allocation_rules(let["property"]) if r["owner_id"] == let["Alice"] and r["expense_type"] == "all"]
+    assert [(r["effective_from"], r["effective_to"], r["allocation_pct"]) for r in alice] == [
+        ("0001-01-01", "2024-07-01", 50), ("2024-07-01", None, 80),
+    ]
+    assert len(props.get_allocation_rules(let["property"], as_of=date(2024, 3, 1))) == 4
+
+    index = AllocationIndex([let["Alice"], let["Bob"]], props.get_allocation_rules(let["property"]))
+    assert index.split("all", date(2024, 6, 30)) == {let["Alice"]: 50, let["Bob"]: 50}
+    assert index.split("insurance", date(2024, 7, 1)) == {let["Alice"]: 80, let["Bob"]: 20}
+    assert index.split("repairs", date(2024, 7, 1)) == {let["Alice"]: 70, let["Bob"]: 30}
+
+    tracker = RentalTracker(db)
+    tracker.record_rental_income(let["property"], Decimal("1000"), date(2024, 1, 1))
+    tracker.record_rental_income(let["property"], Decimal("1000"), date(2024, 8, 1))
+    assert AccountRepo(db).get_balance(let["cap_Alice"]) == Decimal("1300")
+
+
+def test_reallocate_applies_backdated_rule(db: sqlite3.Connection, let):
+    tracker = RentalTracker(db)
+    tracker.post_events([
+        PropertyEvent(property_id=let["property"], kind=PropertyEventKind.INCOME,
+                      event_date=date(2024, month, 1), amount=Decimal("1000"))
+        for month in range(1, 13)
+    ])
+    assert AccountRepo(db).get_balance(let["cap_Alice"]) == Decimal("6000")
+
+    PropertyRepo(db).set_allocation_rule(let["property"], let["Alice"], 100, effective_from=date(2024, 10, 1))
+
+    assert tracker.reallocate(let["property"], start=date(2024, 1, 1)) == 3
+    assert AccountRepo(db).get_balance(let["cap_Alice"]) == Decimal("7500")
+    assert AccountRepo(db).get_balance(let["cap_Bob"]) == Decimal("4500")
+    assert tracker.reallocate(let["property"]) == 0
+
+
+def test_migration_keeps_undated_rules():
+    conn = get_connection()
+    conn.executescript(SCHEMA_SQL)
+    for script in MIGRATIONS[:6]:
+        conn.executescript(script)
+    props = conn.execute("INSERT INTO properties (name) VALUES ('Old')").lastrowid
+    owner = conn.execute("INSERT INTO owners (name) VALUES ('Alice')").lastrowid
+    conn.execute(
+        "INSERT INTO expense_allocation_rules (property_id, owner_id, allocation_pct) VALUES (?, ?, 60)", (props, owner),
+    )
+    conn.execute("PRAGMA user_version = 6")
+
+    apply_migrations(conn)
+
+    rule = conn.execute("SELECT * FROM expense_allocation_rules").fetchone()
+    assert (rule["allocation_pct"], rule["effective_from"], rule["effective_to"]) == (60, "0001-01-01", None)
+    conn.close()
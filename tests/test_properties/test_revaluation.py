@@ -0,0 +1,89 @@
+"""Tests for house-price-index revaluation."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+
+import pytest
+
+from finadviser.db.repositories import PropertyRepo
+from finadviser.properties.equity_series import EquitySeriesEngine
+from finadviser.properties.portfolio import PortfolioEquity
+from finadviser.properties.revaluation import INDEX_SOURCE, HousePriceIndex, RevaluationJob
+
+
+@pytest.fixture
+def index_csv(tmp_path):
+    path = tmp_path / "hpi.csv"
+    path.write_text(
+        "region,month,index\n"
+        "London,2020-01,100\n"
+        "London,2024-01-01,120\n"
+        "London,2025-06,132\n"
+        "North West,2020-01,100\n"
+        "North West,2025-06,150\n"
+    )
+    return path
+
+
+def test_index_lookup_uses_latest_published_month(index_csv):
+    index = HousePriceIndex.from_csv(index_csv)
+    assert index.level("london", "2024-01") == 120
+    assert index.level("London", "2025-03-15") == 120
+    assert index.level("London", "2026-01") == 132
+    assert index.level("London", "2019-12") is None
+    assert index.level("Wales", "2025-06") is None
+
+
+def test_bad_index_file(tmp_path):
+    path = tmp_path / "hpi.csv"
+    path.write_text("region,index\nLondon,100\n")
+    with pytest.raises(ValueError, match="missing columns: month"):
+        HousePriceIndex.from_csv(path)
+    path.write_text("region,month,index\nLondon,2020-01,high\n")
+    with pytest.raises(ValueError, match="line 2"):
+        HousePriceIndex.from_csv(path)
+
+
+def test_revaluation_projects_from_last_survey(db: sqlite3.Connection, index_csv):
+    props = PropertyRepo(db)
+    surveyed = props.create_property({"name": "Surveyed", "purchase_date": "2020-01-10",
+                                      "purchase_price": 400000, "region": "London"})
+    props.add_valuation(surveyed, 480000, "2024-01-20")
+    bought = props.create_property({"name": "Bought", "purchase_date": "2020-01-10", "purchase_price": 200000})
+    props.set_region(bought, "North West")
+    unplaced = props.create_property({"name": "Unplaced", "purchase_date": "2020-01-10", "purchase_price": 300000})
+    props.create_property({"name": "No price", "region": "London"})
+
+    job = RevaluationJob(db, HousePriceIndex.from_csv(index_csv))
+    estimates = job.run(date(2025, 7, 1))
+
+    assert {e["name"]: e["valuation"] for e in estimates} == {"Surveyed": 528000.0, "Bought": 300000.0}
+    latest = props.get_latest_valuation(surveyed)
+    assert (latest["valuation"], latest["valuation_date"], latest["source"]) == (528000, "2025-07-01", "index")
+
+    # Re-running replaces the estimates rather than stacking them, and still
+    # projects from the survey rather than from the previous estimate
+    props.add_valuation(surveyed, 500000, "2024-01-20")
+    estimates = job.run(date(2025, 7, 1), default_region="London")
+    assert {e["name"]: e["valuation"] for e in estimates} == {
+        "Surveyed": 550000.0, "Bought": 300000.0, "Unplaced": 396000.0,
+    }
+    assert len(props.get_valuations(surveyed)) == 3
+    assert db.execute("SELECT COUNT(*) FROM property_valuations WHERE source = 'index'").fetchone()[0] == 3
+    assert props.get_valuations(unplaced)[0]["valuation"] == 396000
+
+
+def test_survey_beats_index_estimate_on_the_same_day(db: sqlite3.Connection):
+    props = PropertyRepo(db)
+    home = props.create_property({"name": "Home", "purchase_date": "2020-01-10", "purchase_price": 400000})
+    props.add_valuation(home, 510000, "2025-07-01", source="survey")
+    props.add_valuation(home, 560000, "2025-07-01", source=INDEX_SOURCE)
+    assert [v["source"] for v in props.get_valuations(home)] == ["survey", INDEX_SOURCE]
+
+    series = EquitySeriesEngine(db).compute(date(2025, 7, 1), date(2025, 7, 31))
+    (prop,) = PortfolioEquity(db).properties()
+    assert props.get_latest_valuation(home)["valuation"] == 510000
+    assert prop["valuation"]["valuation"] == 510000
+    assert series.properties[home]["valuation"].tolist() == [510000]
@@ -0,0 +1,94 @@
+"""Tests for the Monte Carlo portfolio simulation."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from finadviser.db.models import Account, AccountType, BookEntry, JournalEntry
+from finadviser.db.repositories import AccountRepo, JournalRepo, PropertyRepo
+from finadviser.properties.amortization import AmortizationEngine
+from finadviser.properties.rental_tracker import RentalTracker
+from finadviser.properties.simulation import MonteCarloEngine, SimulationAssumptions
+
+FLAT = SimulationAssumptions(price_growth=0.0, price_volatility=0.0, rate_volatility=0.0, rent_growth=0.0, rent_volatility=0.0)
+
+
+@pytest.fixture
+def portfolio(db: sqlite3.Connection) -> dict:
+    """A home owned 75/25 with a mortgage drawn on 2025-01-15, and a let with a year of rent."""
+    accounts = AccountRepo(db)
+    props = PropertyRepo(db)
+    alice, bob = props.create_owner("Alice"), props.create_owner("Bob")
+    home = props.create_property({"name": "Home", "purchase_date": "2024-01-15", "purchase_price": 400000})
+    let = props.create_property({"name": "Let", "purchase_date": "2020-01-01", "purchase_price": 200000})
+    props.add_valuation(let, 250000, "2024-06-01")
+    contributions = accounts.get_or_create("Deposit Contributions", AccountType.EQUITY).id
+    for prop, name, owner, deposit in [(home, "Home", alice, "75000"), (home, "Home", bob, "25000"), (let, "Let", alice, "0")]:
+        capital = accounts.create(Account(name=f"Capital - {owner} - {name}", account_type=AccountType.EQUITY))
+        props.add_ownership(prop, owner, capital)
+        if deposit != "0":
+            JournalRepo(db).create_entry(
+                JournalEntry(date=date(2024, 1, 15), description="Deposit"),
+                [
+                    BookEntry(journal_entry_id=0, account_id=capital, amount=Decimal(deposit)),
+                    BookEntry(journal_entry_id=0, account_id=contributions, amount=-Decimal(deposit)),
+                ],
+            )
+
+    liability = accounts.create(Account(name="Mortgage - Home", account_type=AccountType.LIABILITY))
+    mortgage = props.create_mortgage({
+        "property_id": home, "lender": "Acme", "original_amount": 300000, "start_date": "2025-01-15",
+        "term_months": 300, "liability_account_id": liability,
+    })
+    props.add_mortgage_rate(mortgage, 5.0, "2025-01-15")
+    JournalRepo(db).create_entry(
+        JournalEntry(date=date(2025, 1, 15), description="Draw"),
+        [
+            BookEntry(journal_entry_id=0, account_id=liability, amount=Decimal("-300000")),
+            BookEntry(journal_entry_id=0, account_id=contributions, amount=Decimal("300000")),
+        ],
+    )
+    for month in range(1, 13):
+        RentalTracker(db).record_rental_income(let, Decimal("1000"), date(2024, month, 20))
+    return {"home": home, "let": let, "alice": alice, "bob": bob, "mortgage": mortgage}
+
+
+def test_flat_assumptions_follow_the_schedule(db: sqlite3.Connection, portfolio):
+    result = MonteCarloEngine(db).run(50, 2, FLAT, as_of=date(2025, 1, 15), seed=1)
+
+    # With no randomness every percentile agrees
+    assert np.ptp(result.net_worth, axis=0).max() == pytest.approx(0)
+    schedule = AmortizationEngine(db).schedules()[portfolio["mortgage"]]
+    expected_ltv = float(schedule.balance_at(date(2026, 1, 15))) / 400000
+    assert result.ltv[portfolio["home"]][2, 1] == pytest.approx(expected_ltv, abs=1e-4)
+    assert result.ltv[portfolio["let"]][2, 1] == 0
+    assert result.owner_equity[portfolio["bob"]][2, 0] == pytest.approx(25000)
+    assert result.owner_equity[portfolio["alice"]][2, 0] == pytest.approx(75000 + 250000)
+
+    # Rent accrues as cash; the mortgage costs its interest
+    interest = float(schedule.interest[:12].sum())
+    assert result.net_worth[2, 1] - result.net_worth[2, 0] == pytest.approx(12000 - interest, abs=5)
+
+
+def test_results_do_not_depend_on_workers(db: sqlite3.Connection, portfolio):
+    engine = MonteCarloEngine(db)
+    serial = engine.run(400, 3, as_of=date(2025, 1, 15), seed=7, chunk_size=100)
+    pooled = engine.run(400, 3, as_of=date(2025, 1, 15), seed=7, chunk_size=100, workers=2)
+
+    np.testing.assert_allclose(serial.net_worth, pooled.net_worth)
+    assert serial.net_worth.shape == (5, 4)
+    assert [str(d) for d in serial.dates[:2]] == ["2025-01-15", "2026-01-15"]
+    assert (np.diff(serial.owner_equity[portfolio["alice"]], axis=0) >= 0).all()
+    assert 0 <= serial.negative_equity[portfolio["home"]].max() <= 1
+
+
+def test_mortgage_without_a_rate_is_an_error(db: sqlite3.Connection, portfolio):
+    db.execute("DELETE FROM mortgage_rate_history")
+
+    with pytest.raises(ValueError, match="\\(Acme\\) has no recorded interest rate"):
+        MonteCarloEngine(db).run(10, 1, FLAT, as_of=date(2025, 1, 15), seed=1)
@@ -0,0 +1,113 @@
+"""Tests for the equity snapshot cache."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from finadviser.db.models import Account, AccountType, BookEntry, JournalEntry
+from finadviser.db.repositories import AccountRepo, JournalRepo, PropertyRepo
+from finadviser.properties.portfolio import PortfolioEquity
+from finadviser.properties.snapshots import EquitySnapshots, snapshot_dates
+
+THROUGH = date(2025, 6, 30)
+
+
+@pytest.fixture
+def flat(db: sqlite3.Connection) -> dict:
+    accounts = AccountRepo(db)
+    props = PropertyRepo(db)
+    prop_id = props.create_property({"name": "Flat", "purchase_date": "2025-01-10", "purchase_price": 200000})
+    owners = {name: props.create_owner(name) for name in ("Alice", "Bob")}
+    capital = {}
+    for name, owner_id in owners.items():
+        capital[name] = accounts.create(Account(name=f"Capital - {name}", account_type=AccountType.EQUITY))
+        props.add_ownership(prop_id, owner_id, capital[name])
+    props.add_valuation(prop_id, 200000, "2025-01-10")
+    _contribute(db, capital["Alice"], "30000", date(2025, 1, 10))
+    _contribute(db, capital["Bob"], "10000", date(2025, 1, 10))
+    return {"property_id": prop_id, "owners": owners, "capital": capital}
+
+
+def _contribute(db: sqlite3.Connection, capital_id: int, amount: str, when: date) -> None:
+    funding = AccountRepo(db).get_or_create("Funding", AccountType.EQUITY)
+    JournalRepo(db).create_entry(
+        JournalEntry(date=when, description="Contribution"),
+        [
+            BookEntry(journal_entry_id=0, account_id=capital_id, amount=Decimal(amount)),
+            BookEntry(journal_entry_id=0, account_id=funding.id, amount=-Decimal(amount)),
+        ],
+    )
+
+
+def _stored_dates(db: sqlite3.Connection) -> list[str]:
+    return [r[0] for r in db.execute("SELECT DISTINCT snapshot_date FROM equity_snapshots ORDER BY 1")]
+
+
+def test_snapshot_dates():
+    assert snapshot_dates(date(2025, 1, 10), date(2025, 3, 31)) == [
+        date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31),
+    ]
+    assert snapshot_dates(date(2025, 1, 1), date(2025, 1, 14), "weekly") == [date(2025, 1, 5), date(2025, 1, 12)]
+    assert len(snapshot_dates(date(2025, 1, 1), date(2025, 1, 14), "daily")) == 14
+    with pytest.raises(ValueError, match="cadence"):
+        snapshot_dates(date(2025, 1, 1), date(2025, 1, 14), "hourly")
+
+
+def test_refresh_matches_as_of_equity(db: sqlite3.Connection, flat):
+    snapshots = EquitySnapshots(db)
+
+    assert snapshots.refresh(THROUGH) == 6
+    assert snapshots.refresh(THROUGH) == 0
+
+    history = snapshots.history(owner_id=flat["owners"]["Alice"], end=THROUGH)
+    assert [r["snapshot_date"] for r in history][:2] == ["2025-01-31", "2025-02-28"]
+    assert history[0]["equity_percentage"] == pytest.approx(75.0)
+    expected = PortfolioEquity(db).owner_totals(as_of=date(2025, 3, 31))[flat["owners"]["Alice"]]
+    assert history[2]["equity_amount"] == pytest.approx(float(expected))
+
+
+def test_backdated_changes_invalidate_later_snapshots(db: sqlite3.Connection, flat):
+    snapshots = EquitySnapshots(db)
+    snapshots.refresh(THROUGH)
+
+    _contribute(db, flat["capital"]["Bob"], "20000", date(2025, 4, 15))
+    assert _stored_dates(db) == ["2025-01-31", "2025-02-28", "2025-03-31"]
+    assert snapshots.refresh(THROUGH) == 3
+
+    PropertyRepo(db).add_valuation(flat["property_id"], 260000, "2025-06-01")
+    assert _stored_dates(db)[-1] == "2025-05-31"
+    assert snapshots.refresh(THROUGH) == 1
+
+    june = {r["owner_name"]: r for r in snapshots.history(start=THROUGH, end=THROUGH)}
+    assert june["Bob"]["equity_percentage"] == pytest.approx(50.0)
+    assert june["Bob"]["equity_amount"] == pytest.approx(130000)
+
+
+def test_unrelated_entries_keep_snapshots(db: sqlite3.Connection, flat):
+    snapshots = EquitySnapshots(db)
+    snapshots.refresh(THROUGH)
+    accounts = AccountRepo(db)
+    bank = accounts.get_by_name("Bank").id
+    food = accounts.create(Account(name="Test Food", account_type=AccountType.EXPENSE))
+
+    JournalRepo(db).create_entry(
+        JournalEntry(date=date(2025, 2, 1), description="Groceries"),
+        [
+            BookEntry(journal_entry_id=0, account_id=food, amount=Decimal("40")),
+            BookEntry(journal_entry_id=0, account_id=bank, amount=Decimal("-40")),
+        ],
+    )
+
+    assert snapshots.refresh(THROUGH) == 0
+
+
+def test_history_can_read_without_refreshing(db: sqlite3.Connection, flat, config):
+    from finadviser.analysis.data_preparer import DataPreparer
+
+    assert EquitySnapshots(db).history(refresh=False) == []
+    assert "EQUITY HISTORY" not in DataPreparer(db, config).prepare_context("How is my property equity?")
+    assert _stored_dates(db) == []